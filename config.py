@@ -11,6 +11,26 @@ load_dotenv()
 # Токен Telegram-бота (заменить на реальный токен при запуске)
 TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "YOUR_TELEGRAM_BOT_TOKEN")
 
+# Telegram ID администраторов бота через запятую (служебные команды, например /profile)
+ADMIN_USER_IDS = {
+    int(user_id) for user_id in os.getenv("ADMIN_USER_IDS", "").split(",") if user_id.strip()
+}
+
+# Транспорт обновлений: "polling" (по умолчанию) или "webhook" (utils.webhook)
+BOT_MODE = os.getenv("BOT_MODE", "polling").lower()
+# Публичный URL, который регистрируется в Telegram (https://bot.example.com);
+# если пуст, set_webhook не вызывается — удобно для локальной отправки тестовых Update
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "").rstrip("/")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/telegram")
+WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080"))
+# Секрет, который Telegram присылает в заголовке X-Telegram-Bot-Api-Secret-Token
+WEBHOOK_SECRET_TOKEN = os.getenv("WEBHOOK_SECRET_TOKEN", "")
+
+# Сколько обновлений обрабатывается одновременно (разные пользователи параллельно,
+# обновления одного пользователя — строго по порядку; 1 — последовательная обработка)
+UPDATE_CONCURRENCY = int(os.getenv("UPDATE_CONCURRENCY", "32"))
+
 # Настройки для хранения данных
 DATA_DIR = "data/users"
 
@@ -184,9 +204,56 @@ TIME_FORMAT = "%H:%M:%S"
 # Максимальное количество категорий для отображения на графиках
 MAX_CATEGORIES_ON_CHART = 8
 
+# Максимум расходов в одном многострочном сообщении (по одному на строку)
+MAX_BATCH_EXPENSES = 50
+
 # Настройки логирования
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 LOG_FILE = os.getenv("LOG_FILE", None)  # Путь к файлу логов (если None - только консоль)
+# Максимальный размер очереди логов; при переполнении записи отбрасываются (метрика log_records_dropped_total)
+LOG_QUEUE_MAX_SIZE = int(os.getenv("LOG_QUEUE_MAX_SIZE", "10000"))
+
+# Сэмплирование и ограничение частоты шумных событий логов (utils.logger.log_event):
+# sample_rate — доля сохраняемых событий, max_per_second — потолок событий в секунду.
+# Подавленные события считаются в метрике log_events_suppressed_total.
+LOG_EVENT_LIMITS = {
+    "permission_check_debug": {"sample_rate": 0.01},
+    "permission_check_result": {"sample_rate": 0.01},
+    "permission_granted": {"sample_rate": 0.1},
+    "get_user_role_in_project_debug": {"sample_rate": 0.01},
+    "database_operation": {"max_per_second": 50},
+}
+
+# Порог (секунды), после которого измеряемая операция (utils.logger.measure_time) логируется как медленная
+SLOW_OPERATION_SECONDS = float(os.getenv("SLOW_OPERATION_SECONDS", "2.0"))
+
+# Число запросов к БД за один update, начиная с которого update логируется как подозрительный (N+1)
+UPDATE_DB_QUERY_WARNING_THRESHOLD = int(os.getenv("UPDATE_DB_QUERY_WARNING_THRESHOLD", "15"))
 
 # Пороги производительности для логирования БД операций
 SLOW_DB_QUERY_THRESHOLD = 0.01  # Секунды - для INSERT/UPDATE на служебных таблицах
+
+# Мониторинг event loop и пула рендеринга (utils.runtime_monitor)
+EVENT_LOOP_MONITOR_INTERVAL = float(os.getenv("EVENT_LOOP_MONITOR_INTERVAL", "0.5"))  # Секунды между замерами
+EVENT_LOOP_LAG_WARNING_SECONDS = float(os.getenv("EVENT_LOOP_LAG_WARNING_SECONDS", "0.2"))
+RENDER_EXECUTOR_MAX_WORKERS = int(os.getenv("RENDER_EXECUTOR_MAX_WORKERS", "4"))
+
+# Очередь исходящих уведомлений фоновых задач (utils.notification_queue)
+NOTIFY_SENDERS = int(os.getenv("NOTIFY_SENDERS", "4"))  # Параллельных отправителей
+NOTIFY_QUEUE_MAXSIZE = int(os.getenv("NOTIFY_QUEUE_MAXSIZE", "10000"))  # Сверх этого сообщения отбрасываются
+NOTIFY_GLOBAL_RATE = float(os.getenv("NOTIFY_GLOBAL_RATE", "25"))  # Сообщений в секунду на весь бот (лимит Telegram ~30)
+NOTIFY_CHAT_RATE = float(os.getenv("NOTIFY_CHAT_RATE", "1"))  # Сообщений в секунду в один чат
+NOTIFY_CHAT_BURST = float(os.getenv("NOTIFY_CHAT_BURST", "3"))  # Допустимая пачка сообщений в один чат
+NOTIFY_MAX_RETRIES = int(os.getenv("NOTIFY_MAX_RETRIES", "3"))  # Повторов после RetryAfter/сетевой ошибки
+NOTIFY_DRAIN_TIMEOUT = float(os.getenv("NOTIFY_DRAIN_TIMEOUT", "10"))  # Секунды на досылку очереди при остановке
+
+# Outbox уведомлений фоновых задач (utils.notification_outbox)
+NOTIFY_OUTBOX_POLL_SECONDS = float(os.getenv("NOTIFY_OUTBOX_POLL_SECONDS", "5"))  # Опрос таблицы, если задачи не будили drainer
+NOTIFY_OUTBOX_BATCH_SIZE = int(os.getenv("NOTIFY_OUTBOX_BATCH_SIZE", "100"))  # Строк за одну выборку
+NOTIFY_OUTBOX_LEASE_SECONDS = float(os.getenv("NOTIFY_OUTBOX_LEASE_SECONDS", "300"))  # Аренда выданной строки до повторной выдачи
+NOTIFY_OUTBOX_RETRY_SECONDS = float(os.getenv("NOTIFY_OUTBOX_RETRY_SECONDS", "60"))  # Пауза перед повтором неудачной отправки
+NOTIFY_OUTBOX_MAX_ATTEMPTS = int(os.getenv("NOTIFY_OUTBOX_MAX_ATTEMPTS", "5"))  # После стольких неудач строка остаётся для разбора
+
+# Планировщик постоянных расходов и доходов (utils.recurring_scheduler)
+RECURRING_SCHEDULER_MAX_SLEEP_SECONDS = float(os.getenv("RECURRING_SCHEDULER_MAX_SLEEP_SECONDS", "3600"))  # Сверка с БД, даже если правил нет
+RECURRING_SCHEDULER_RETRY_SECONDS = float(os.getenv("RECURRING_SCHEDULER_RETRY_SECONDS", "300"))  # Повтор просроченных правил
@@ -18,15 +18,24 @@ from handlers.income_menu import register_income_menu_handlers
 from handlers.income import register_income_handlers
 from handlers.income_category import register_income_category_handlers
 from handlers.recurring_income import register_recurring_income_handlers
+from handlers.admin import register_admin_handlers
+from handlers.menu_router import MenuRouter, menu_router
+from telegram.ext import ConversationHandler
+from metrics import instrument_callback
 
 def register_all_handlers(application):
     """
     Регистрирует все обработчики команд
     """
+    # Кнопки меню диспетчеризуются одним обработчиком по точному тексту;
+    # создаём его первым, модули ниже добавляют в него свои кнопки
+    menu_router(application)
+
     register_project_handlers(application)
     register_invitation_handlers(application)  # Register before start handlers
     register_project_management_handlers(application)  # Register management UI
     register_start_handlers(application)
+    register_admin_handlers(application)
 
     # Важный порядок! Кнопки меню — до expense.text_handler (который ловит любой текст)
     register_analysis_handlers(application)    # Подменю «Анализ» — до дочерних обработчиков
@@ -41,3 +50,35 @@ def register_all_handlers(application):
     register_budget_handlers(application)      # Бюджет — до expense (expense ловит любой текст)
     register_recurring_handlers(application)   # Постоянные расходы — до expense
     register_expense_handlers(application)     # ПОСЛЕДНИМ: ловит любой текст
+
+    instrument_handlers(application)
+
+
+def _instrument_handler(handler) -> None:
+    """Оборачивает callback обработчика; для ConversationHandler — все вложенные обработчики"""
+    if isinstance(handler, ConversationHandler):
+        nested = list(handler.entry_points) + list(handler.fallbacks)
+        for state_handlers in handler.states.values():
+            nested.extend(state_handlers)
+        for inner in nested:
+            _instrument_handler(inner)
+        return
+
+    if isinstance(handler, MenuRouter):
+        for text, callback in handler.routes.items():
+            handler.routes[text] = instrument_callback(callback)
+        return
+
+    callback = getattr(handler, 'callback', None)
+    if callback is not None:
+        handler.callback = instrument_callback(callback)
+
+
+def instrument_handlers(application) -> None:
+    """
+    Подключает метрики (гистограмма задержек, in-flight, исход) ко всем
+    зарегистрированным обработчикам, включая состояния ConversationHandler
+    """
+    for group_handlers in application.handlers.values():
+        for handler in group_handlers:
+            _instrument_handler(handler)
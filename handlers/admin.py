@@ -0,0 +1,79 @@
+"""
+Служебные команды администратора (config.ADMIN_USER_IDS).
+
+/profile [секунды]     — сэмплирующий профиль всех потоков, collapsed-stack файл
+                         (flamegraph.pl, speedscope.app)
+/profile mem [секунды] — diff снимков tracemalloc за интервал
+"""
+
+import datetime
+
+from telegram import Update
+from telegram.ext import ContextTypes, CommandHandler
+
+import config
+from utils import profiler
+from utils.logger import get_logger, log_event, log_error
+
+logger = get_logger("handlers.admin")
+
+DEFAULT_PROFILE_SECONDS = 10
+
+
+def _is_admin(user_id: int) -> bool:
+    return user_id in config.ADMIN_USER_IDS
+
+
+def _parse_profile_args(args: list) -> tuple:
+    """Возвращает (mode, seconds) из аргументов /profile"""
+    mode = 'cpu'
+    seconds = DEFAULT_PROFILE_SECONDS
+    for arg in args:
+        if arg.lower() in ('cpu', 'mem'):
+            mode = arg.lower()
+        else:
+            try:
+                seconds = float(arg)
+            except ValueError:
+                pass
+    return mode, min(max(seconds, 1), profiler.MAX_PROFILE_SECONDS)
+
+
+async def profile_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    user_id = update.effective_user.id
+    if not _is_admin(user_id):
+        # Для остальных пользователей команды не существует
+        return
+
+    if profiler.is_running():
+        await update.message.reply_text("⏳ Профилирование уже выполняется.")
+        return
+
+    mode, seconds = _parse_profile_args(context.args or [])
+    log_event(logger, "profile_started", user_id=user_id, mode=mode, seconds=seconds)
+    await update.message.reply_text(f"⏱ Профилирование ({mode}) на {seconds:.0f} с…")
+
+    stamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+    try:
+        if mode == 'mem':
+            report = await profiler.memory_diff(seconds)
+            filename = f"tracemalloc_{stamp}.txt"
+            caption = "🧠 Прирост памяти по строкам кода"
+        else:
+            result = await profiler.profile_cpu(seconds)
+            report = result.collapsed()
+            filename = f"profile_{stamp}.collapsed"
+            caption = f"🔥 {result.samples} сэмплов, формат collapsed stacks (speedscope / flamegraph.pl)"
+
+        await update.message.reply_document(
+            document=report.encode('utf-8'), filename=filename, caption=caption
+        )
+        log_event(logger, "profile_sent", user_id=user_id, mode=mode, seconds=seconds,
+                  size_bytes=len(report))
+    except Exception as e:
+        log_error(logger, e, "profile_error", user_id=user_id, mode=mode)
+        await update.message.reply_text("❌ Не удалось выполнить профилирование.")
+
+
+def register_admin_handlers(application):
+    application.add_handler(CommandHandler("profile", profile_command))
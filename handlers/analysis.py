@@ -4,10 +4,12 @@
 """
 
 from telegram import Update
-from telegram.ext import ContextTypes, MessageHandler, filters
+from telegram.ext import ContextTypes
 
-from utils.helpers import get_analysis_menu_keyboard, main_menu_button_regex
+from utils.helpers import get_analysis_menu_keyboard
 from utils.logger import get_logger, log_event
+import config
+from handlers.menu_router import add_menu_button
 
 logger = get_logger("handlers.analysis")
 
@@ -24,9 +26,4 @@ async def analysis_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -
 
 
 def register_analysis_handlers(application) -> None:
-    application.add_handler(
-        MessageHandler(
-            filters.Regex(main_menu_button_regex("analysis")),
-            analysis_command,
-        )
-    )
+    add_menu_button(application, config.MAIN_MENU_BUTTONS["analysis"], analysis_command)
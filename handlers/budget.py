@@ -10,6 +10,7 @@
 """
 
 import datetime
+import functools
 from telegram import Update, ReplyKeyboardMarkup, ReplyKeyboardRemove
 from telegram.ext import (
     ContextTypes,
@@ -25,6 +26,7 @@ from utils.permissions import Permission, has_permission
 from utils.helpers import get_main_menu_keyboard, main_menu_button_regex
 from utils.logger import get_logger, log_event, log_error
 import config
+from handlers.menu_router import add_menu_button
 
 logger = get_logger("handlers.budget")
 
@@ -43,6 +45,7 @@ logger = get_logger("handlers.budget")
 # Вспомогательные функции
 # ---------------------------------------------------------------------------
 
+@functools.lru_cache(maxsize=None)
 def _budget_menu_keyboard(notify_enabled: bool = False) -> ReplyKeyboardMarkup:
     """
     Клавиатура меню бюджета.
@@ -604,37 +607,18 @@ def register_budget_handlers(application) -> None:
     application.add_handler(edit_notify_conv)
 
     # Вход в меню бюджета
-    application.add_handler(
-        MessageHandler(filters.Regex(main_menu_button_regex("budget")), budget_menu)
-    )
+    btn = config.BUDGET_MENU_BUTTONS
+    add_menu_button(application, config.MAIN_MENU_BUTTONS["budget"], budget_menu)
 
     # Статус бюджета
-    application.add_handler(
-        MessageHandler(filters.Regex(_budget_menu_button_regex("status")), budget_status)
-    )
-
-    # Отключить уведомления
-    application.add_handler(
-        MessageHandler(
-            filters.Regex(_budget_menu_button_regex("disable_notify")),
-            disable_notifications_handler,
-        )
-    )
+    add_menu_button(application, btn["status"], budget_status)
 
-    # Включить уведомления
-    application.add_handler(
-        MessageHandler(
-            filters.Regex(_budget_menu_button_regex("enable_notify")),
-            enable_notifications_handler,
-        )
-    )
+    # Отключить / включить уведомления
+    add_menu_button(application, btn["disable_notify"], disable_notifications_handler)
+    add_menu_button(application, btn["enable_notify"], enable_notifications_handler)
 
     # Кнопка «⬅️ Главное меню» внутри бюджет-меню
-    application.add_handler(
-        MessageHandler(
-            filters.Regex(_budget_menu_button_regex("back")),
-            lambda u, c: u.message.reply_text(
-                "Главное меню", reply_markup=get_main_menu_keyboard()
-            ),
-        )
+    add_menu_button(
+        application, btn["back"],
+        lambda u, c: u.message.reply_text("Главное меню", reply_markup=get_main_menu_keyboard()),
     )
@@ -5,9 +5,10 @@
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup
 from telegram.ext import ContextTypes, CommandHandler, CallbackQueryHandler, ConversationHandler, MessageHandler, filters
 from utils import categories, helpers, projects
-from utils.helpers import main_menu_button_regex, category_menu_button_regex
+from utils.helpers import category_menu_button_regex
 from utils.logger import get_logger, log_event, log_error
 import config
+from handlers.menu_router import add_menu_button
 
 logger = get_logger("handlers.category")
 
@@ -570,20 +571,11 @@ def register_category_handlers(application):
     Регистрирует обработчики команд для управления категориями
     """
     # Меню категорий (кнопка из главного меню)
-    application.add_handler(MessageHandler(
-        filters.Regex(main_menu_button_regex("categories")), 
-        categories_menu
-    ))
-    
+    add_menu_button(application, config.MAIN_MENU_BUTTONS["categories"], categories_menu)
+
     # Кнопки меню категорий (list и back - простые, add и delete в ConversationHandler)
-    application.add_handler(MessageHandler(
-        filters.Regex(category_menu_button_regex("list")),
-        category_list_button
-    ))
-    application.add_handler(MessageHandler(
-        filters.Regex(category_menu_button_regex("back")),
-        category_back_button
-    ))
+    add_menu_button(application, config.CATEGORY_MENU_BUTTONS["list"], category_list_button)
+    add_menu_button(application, config.CATEGORY_MENU_BUTTONS["back"], category_back_button)
     
     # Conversation для создания категории
     create_conv_handler = ConversationHandler(
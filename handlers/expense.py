@@ -9,7 +9,7 @@ from telegram.ext import ContextTypes, CommandHandler, filters, MessageHandler,
 from utils import excel, helpers, projects, categories
 from utils.helpers import main_menu_button_regex
 from utils.budget_notifier import check_user_budget_now
-from utils.logger import get_logger, log_command, log_event, log_error
+from utils.logger import get_logger, log_command, log_event, log_error, measure_time
 import config
 from metrics import (
     track_command,
@@ -28,13 +28,12 @@ logger = get_logger("handlers.expense")
 ENTERING_AMOUNT, CHOOSING_CATEGORY, ENTERING_DESCRIPTION, CREATING_CATEGORY = range(4)
 
 
+@measure_time("text_handler", logger=logger, slow_threshold=config.SLOW_OPERATION_SECONDS)
 async def text_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
     Обрабатывает текстовые сообщения, пытаясь распознать добавление расхода
     """
-    import time
-    start_time = time.time()
-    
+    timer = measure_time.current()
     user_id = update.effective_user.id
     message_text = update.message.text
     request_id = context.user_data.get('request_id')
@@ -42,6 +41,12 @@ async def text_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     log_event(logger, "text_message_processing", request_id=request_id, 
              user_id=user_id, text_preview=message_text[:100], text_length=len(message_text))
 
+    # Несколько расходов в одном сообщении — по одному на строку
+    batch = helpers.parse_expense_lines(message_text) if '\n' in message_text else None
+    if batch:
+        await _add_expense_batch(update, context, batch, request_id)
+        return
+
     # Пытаемся распарсить как команду добавления расхода
     expense_data = helpers.parse_add_command(message_text)
 
@@ -83,7 +88,7 @@ async def text_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
         )
 
         if not success:
-            duration_ms = (time.time() - start_time) * 1000
+            duration_ms = timer.elapsed * 1000
             log_error(logger, Exception("Failed to add expense from text"), 
                      "expense_add_failed_from_text", request_id=request_id,
                      duration_ms=duration_ms, user_id=user_id,
@@ -110,19 +115,19 @@ async def text_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
                 project = await projects.get_project_by_id(user_id, project_id)
                 if project:
                     confirmation += f"\n📁 Проект: {project['project_name']}"
-                    duration_ms = (time.time() - start_time) * 1000
+                    duration_ms = timer.elapsed * 1000
                     log_event(logger, "expense_added_from_text", request_id=request_id,
                              status="success", duration_ms=duration_ms, user_id=user_id,
                              amount=expense_data['amount'], category_id=category_found['category_id'],
                              category_name=category_found['name'],
                              project_id=project_id, project_name=project['project_name'])
             except Exception as e:
-                duration_ms = (time.time() - start_time) * 1000
+                duration_ms = timer.elapsed * 1000
                 log_error(logger, e, "get_project_error_in_text_handler", request_id=request_id,
                          duration_ms=duration_ms, user_id=user_id, project_id=project_id)
         else:
             confirmation += f"\n📊 Общие расходы"
-            duration_ms = (time.time() - start_time) * 1000
+            duration_ms = timer.elapsed * 1000
             log_event(logger, "expense_added_from_text", request_id=request_id,
                      status="success", duration_ms=duration_ms, user_id=user_id,
                      amount=expense_data['amount'], category_id=category_found['category_id'],
@@ -135,6 +140,78 @@ async def text_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
                  status="skipped", user_id=user_id, 
                  text_preview=message_text[:50], reason="parse_failed")
 
+async def _add_expense_batch(update: Update, context: ContextTypes.DEFAULT_TYPE, batch: list, request_id) -> None:
+    """
+    Добавляет несколько расходов из одного сообщения: одна проверка прав,
+    один поиск категорий, одна вставка, одна проверка бюджета и одно подтверждение.
+    """
+    user_id = update.effective_user.id
+    if len(batch) > config.MAX_BATCH_EXPENSES:
+        await update.message.reply_text(
+            f"❌ За один раз можно добавить не больше {config.MAX_BATCH_EXPENSES} расходов."
+        )
+        return
+
+    project_id = await helpers.get_active_project_id(user_id, context)
+
+    from utils.permissions import Permission, has_permission
+    if not await has_permission(user_id, project_id, Permission.ADD_EXPENSE):
+        await update.message.reply_text(
+            "❌ У вас нет прав на добавление расходов в этом проекте."
+        )
+        return
+
+    found = await categories.get_categories_by_names(
+        user_id, {expense['category'] for expense in batch}, project_id
+    )
+    expenses, unknown = [], []
+    for expense in batch:
+        category = found.get(expense['category'])
+        if category:
+            expenses.append({**expense, 'category': category})
+        elif expense['category'] not in unknown:
+            unknown.append(expense['category'])
+
+    if not expenses:
+        log_event(logger, "invalid_categories_in_batch", request_id=request_id, user_id=user_id,
+                  categories=unknown, lines=len(batch))
+        await update.message.reply_text(f"❌ Категории не найдены: {', '.join(unknown)}")
+        return
+
+    if not await excel.add_expenses(user_id, expenses, project_id):
+        log_error(logger, Exception("Failed to add expense batch from text"),
+                  "expense_batch_add_failed", request_id=request_id, user_id=user_id,
+                  count=len(expenses), project_id=project_id)
+        await update.message.reply_text("❌ Ошибка при добавлении расходов. Попробуйте еще раз.")
+        return
+
+    total = sum(expense['amount'] for expense in expenses)
+    lines = [f"✅ Добавлено расходов: {len(expenses)} на сумму {total}"]
+    for expense in expenses:
+        name = expense['category']['name']
+        line = f"{config.DEFAULT_CATEGORIES.get(name, '📦')} {name.title()}: {expense['amount']}"
+        if expense['description']:
+            line += f" — {expense['description']}"
+        lines.append(line)
+
+    if project_id is not None:
+        project = await projects.get_project_by_id(user_id, project_id)
+        if project:
+            lines.append(f"📁 Проект: {project['project_name']}")
+    else:
+        lines.append("📊 Общие расходы")
+
+    if unknown:
+        lines.append(f"⚠️ Пропущены строки с неизвестными категориями: {', '.join(unknown)}")
+
+    log_event(logger, "expense_batch_added_from_text", request_id=request_id, status="success",
+              user_id=user_id, count=len(expenses), skipped=len(batch) - len(expenses),
+              total=total, project_id=project_id)
+
+    await update.message.reply_text("\n".join(lines))
+    await check_user_budget_now(context.bot, user_id, project_id)
+
+
 async def add_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """
     Обрабатывает команду /add для начала диалога добавления расхода
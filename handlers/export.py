@@ -6,15 +6,19 @@ import config
 from utils.export import get_month_name
 
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
-from telegram.ext import ContextTypes, CommandHandler, CallbackQueryHandler, MessageHandler, filters
+from telegram.ext import ContextTypes, CommandHandler, CallbackQueryHandler
 from utils import excel, projects, db
 import os
 import tempfile
 import shutil
-import pandas as pd
 import datetime
-from utils.logger import get_logger, log_event, log_error
-from utils.helpers import main_menu_button_regex
+from typing import TYPE_CHECKING
+from utils.logger import get_logger, log_event, log_error, measure_time
+from handlers.menu_router import add_menu_button
+from utils.runtime_monitor import render_executor
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 logger = get_logger("handlers.export")
 
@@ -158,8 +162,15 @@ async def export_stats_command(update: Update, context: ContextTypes.DEFAULT_TYP
         )
 
 
-def _build_excel_file(expenses_df: pd.DataFrame, tmp_path: str, month: int) -> None:
+@measure_time("export_build_excel")
+def _build_excel_file(expenses_df: "pd.DataFrame", tmp_path: str, month: int) -> None:
     """Синхронная генерация Excel-файла. Вызывается через run_in_executor."""
+    import pandas as pd
+
+    # Конвертируем amount в numeric, если это необходимо
+    if 'amount' in expenses_df.columns:
+        expenses_df = expenses_df.assign(amount=pd.to_numeric(expenses_df['amount'], errors='coerce'))
+
     with pd.ExcelWriter(tmp_path, engine='openpyxl') as writer:
         expenses_df.to_excel(writer, sheet_name='Все расходы', index=False)
 
@@ -196,13 +207,13 @@ def _build_excel_file(expenses_df: pd.DataFrame, tmp_path: str, month: int) -> N
             summary_stats.to_excel(writer, sheet_name='Общая статистика', index=False)
 
 
+@measure_time("perform_export", logger=logger, slow_threshold=config.SLOW_OPERATION_SECONDS)
 async def perform_export(update: Update, user_id: int, project_id: int, year: int = None, month: int = None) -> None:
     """
     Выполняет экспорт данных в Excel файл
     """
-    import time
-    start_time = time.time()
-
+    timer = measure_time.current()
+    timer.log_fields.update(user_id=user_id, project_id=project_id)
     log_event(logger, "export_start", user_id=user_id, project_id=project_id, year=year, month=month)
 
     # Определяем, откуда пришел запрос - из сообщения или callback query
@@ -222,10 +233,6 @@ async def perform_export(update: Update, user_id: int, project_id: int, year: in
             await message.reply_text("❌ У вас пока нет данных о расходах.")
         return
 
-    # Конвертируем amount в numeric, если это необходимо
-    if 'amount' in expenses_df.columns:
-        expenses_df['amount'] = pd.to_numeric(expenses_df['amount'], errors='coerce')
-
     # Фильтруем по месяцу, если указан
     if month:
         expenses_df = expenses_df[expenses_df['month'] == month]
@@ -241,7 +248,7 @@ async def perform_export(update: Update, user_id: int, project_id: int, year: in
 
         # Генерируем Excel в отдельном потоке — не блокируем event loop
         loop = asyncio.get_event_loop()
-        await loop.run_in_executor(None, _build_excel_file, expenses_df, tmp_path, month)
+        await loop.run_in_executor(render_executor(), _build_excel_file, expenses_df, tmp_path, month)
 
         # Отправляем файл
         with open(tmp_path, 'rb') as file:
@@ -275,14 +282,13 @@ async def perform_export(update: Update, user_id: int, project_id: int, year: in
         # Удаляем временный файл
         os.unlink(tmp_path)
         
-        duration = time.time() - start_time
         log_event(logger, "export_success", user_id=user_id, project_id=project_id, 
-                 year=year, month=month, duration=duration, export_filename=filename)
+                 year=year, month=month, duration=timer.elapsed, export_filename=filename)
         
     except Exception as e:
-        duration = time.time() - start_time
+        timer.status = 'error'
         log_error(logger, e, "export_error", user_id=user_id, project_id=project_id, 
-                 year=year, month=month, duration=duration)
+                 year=year, month=month, duration=timer.elapsed)
         await message.reply_text(f"❌ Ошибка при создании статистики: {str(e)}")
         # Очищаем временный файл в случае ошибки
         if 'tmp_path' in locals():
@@ -374,5 +380,5 @@ def register_export_handlers(application):
     Регистрирует обработчики команд для экспорта
     """
     application.add_handler(CommandHandler("export", export_stats_command))
-    application.add_handler(MessageHandler(filters.Regex(main_menu_button_regex("export")), export_stats_command))
+    add_menu_button(application, config.MAIN_MENU_BUTTONS["export"], export_stats_command)
     application.add_handler(CallbackQueryHandler(handle_export_callback, pattern="^export:"))
\ No newline at end of file
@@ -1,18 +1,21 @@
 """Обработчики управления категориями доходов."""
 
+import functools
+
 from telegram import Update, ReplyKeyboardMarkup, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, ConversationHandler, CommandHandler, MessageHandler, CallbackQueryHandler, filters
 
 import config
 from utils import helpers, income_categories, projects
-from utils.helpers import income_menu_button_regex
 from utils.logger import get_logger
+from handlers.menu_router import add_menu_button
 
 logger = get_logger("handlers.income_category")
 
 ENTERING_NAME, CHOOSING_CATEGORY = range(2)
 
 
+@functools.lru_cache(maxsize=None)
 def _category_menu_keyboard() -> ReplyKeyboardMarkup:
     keyboard = [
         ["➕ Добавить категорию", "📋 Список категорий"],
@@ -158,7 +161,7 @@ async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
 
 def register_income_category_handlers(application):
     """Регистрирует хендлеры категорий доходов."""
-    application.add_handler(MessageHandler(filters.Regex(income_menu_button_regex("categories")), income_categories_menu))
+    add_menu_button(application, config.INCOME_MENU_BUTTONS["categories"], income_categories_menu)
 
     add_conv = ConversationHandler(
         entry_points=[MessageHandler(filters.Regex(r"^➕ Добавить категорию$"), add_start)],
@@ -171,7 +174,7 @@ def register_income_category_handlers(application):
     )
     application.add_handler(add_conv)
 
-    application.add_handler(MessageHandler(filters.Regex(r"^📋 Список категорий$"), list_categories))
+    add_menu_button(application, "📋 Список категорий", list_categories)
 
     deactivate_conv = ConversationHandler(
         entry_points=[MessageHandler(filters.Regex(r"^🗑️ Удалить категорию$"), deactivate_start)],
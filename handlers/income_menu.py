@@ -1,10 +1,12 @@
 """Обработчик подменю «Доходы»."""
 
 from telegram import Update
-from telegram.ext import ContextTypes, MessageHandler, filters
+from telegram.ext import ContextTypes
 
-from utils.helpers import get_income_menu_keyboard, main_menu_button_regex, income_menu_button_regex, get_main_menu_keyboard
+from utils.helpers import get_income_menu_keyboard, get_main_menu_keyboard
 from utils.logger import get_logger, log_event
+import config
+from handlers.menu_router import add_menu_button
 
 logger = get_logger("handlers.income_menu")
 
@@ -27,5 +29,5 @@ async def income_menu_back(update: Update, context: ContextTypes.DEFAULT_TYPE) -
 
 def register_income_menu_handlers(application):
     """Регистрация обработчиков подменю доходов."""
-    application.add_handler(MessageHandler(filters.Regex(main_menu_button_regex("incomes")), income_menu))
-    application.add_handler(MessageHandler(filters.Regex(income_menu_button_regex("back")), income_menu_back))
+    add_menu_button(application, config.MAIN_MENU_BUTTONS["incomes"], income_menu)
+    add_menu_button(application, config.INCOME_MENU_BUTTONS["back"], income_menu_back)
@@ -0,0 +1,110 @@
+"""
+Маршрутизатор кнопок reply-меню.
+
+Вместо цепочки MessageHandler(filters.Regex("^<кнопка>$")) — один обработчик,
+который ищет точный текст сообщения в словаре «текст кнопки → callback».
+Стоимость диспетчеризации не зависит от числа кнопок, а обычный текст
+(суммы расходов) проходит мимо за один поиск в словаре.
+
+Кнопки, открывающие ConversationHandler, остаются точками входа диалогов.
+Маршрутизатор стоит в группе 0 раньше диалогов, поэтому кнопка меню
+срабатывает и посреди диалога; тогда активные диалоги пользователя в этом
+чате завершаются (END), иначе следующий обычный текст (например, строка
+расхода) был бы принят как ввод в оставленном состоянии.
+"""
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from telegram import Update
+from telegram.ext import BaseHandler, ConversationHandler
+
+from utils.logger import get_logger, log_event
+
+logger = get_logger("handlers.menu_router")
+
+MenuCallback = Callable[[Update, Any], Awaitable[Any]]
+
+
+class MenuRouter(BaseHandler):
+    """Обработчик, который диспетчеризует кнопки меню по точному тексту сообщения"""
+
+    __slots__ = ("routes",)
+
+    def __init__(self):
+        super().__init__(self._unrouted)
+        self.routes: Dict[str, MenuCallback] = {}
+
+    @staticmethod
+    async def _unrouted(update, context):
+        # callback самого обработчика не вызывается: handle_update берёт callback маршрута
+        return None
+
+    def add(self, text: str, callback: MenuCallback) -> None:
+        """
+        Регистрирует кнопку. Как и с цепочкой MessageHandler, при совпадении
+        текстов побеждает кнопка, зарегистрированная первой.
+        """
+        if text in self.routes:
+            log_event(logger, "menu_button_shadowed", level=logging.DEBUG, button=text,
+                      callback=getattr(callback, "__name__", repr(callback)))
+            return
+        self.routes[text] = callback
+
+    def check_update(self, update: object) -> Optional[MenuCallback]:
+        if not isinstance(update, Update) or update.message is None:
+            return None
+        text = update.message.text
+        if text is None:
+            return None
+        return self.routes.get(text)
+
+    async def handle_update(self, update, application, check_result, context):
+        self.collect_additional_context(context, update, application, check_result)
+        if application is not None:
+            end_conversations(application, update)
+        return await check_result(update, context)
+
+
+def _end_conversation(handler: ConversationHandler, update: Update) -> None:
+    try:
+        key = handler._get_key(update)
+    except RuntimeError:
+        # Диалог ведётся по callback-сообщениям (per_message) — к тексту не относится
+        return
+    for child in handler._child_conversations:
+        _end_conversation(child, update)
+    if key not in handler._conversations:
+        return
+    handler._update_state(ConversationHandler.END, key)
+    job = handler.timeout_jobs.pop(key, None)
+    if job is not None:
+        job.schedule_removal()
+    log_event(logger, "conversation_ended_by_menu", level=logging.DEBUG,
+              conversation=handler.name, key=str(key))
+
+
+def end_conversations(application, update: Update) -> None:
+    """Завершает активные диалоги всех ConversationHandler приложения для отправителя update"""
+    for group_handlers in application.handlers.values():
+        for handler in group_handlers:
+            if isinstance(handler, ConversationHandler):
+                _end_conversation(handler, update)
+
+
+def menu_router(application) -> MenuRouter:
+    """
+    Возвращает маршрутизатор приложения (группа 0), при отсутствии создаёт его.
+    register_all_handlers создаёт его первым, чтобы кнопки меню проверялись
+    раньше состояний диалогов и expense.text_handler.
+    """
+    for handler in application.handlers.get(0, []):
+        if isinstance(handler, MenuRouter):
+            return handler
+    router = MenuRouter()
+    application.add_handler(router)
+    return router
+
+
+def add_menu_button(application, text: str, callback: MenuCallback) -> None:
+    """Регистрирует кнопку reply-меню с точным текстом text"""
+    menu_router(application).add(text, callback)
@@ -9,6 +9,7 @@ from utils import projects, helpers
 from utils.helpers import project_menu_button_regex
 from utils.logger import get_logger, log_command, log_event, log_error
 import config
+from handlers.menu_router import add_menu_button
 import time
 
 logger = get_logger("handlers.project")
@@ -653,17 +654,17 @@ def register_project_handlers(application):
     application.add_handler(create_conv_handler)
 
     # Обработчик выбора проекта через кнопку (показывает меню)
-    application.add_handler(MessageHandler(filters.Regex(project_menu_button_regex("select")), button_project_select_start))
+    add_menu_button(application, config.PROJECT_MENU_BUTTONS["select"], button_project_select_start)
     
     # Callback handler для выбора проекта из списка
     application.add_handler(CallbackQueryHandler(handle_project_selection_callback, pattern=r'^select_proj_(none|\d+)$'))
 
     # Простые кнопки (без ввода)
-    application.add_handler(MessageHandler(filters.Regex(project_menu_button_regex("list")), project_list_command))
-    application.add_handler(MessageHandler(filters.Regex(project_menu_button_regex("all_expenses")), project_main_command))
-    application.add_handler(MessageHandler(filters.Regex(project_menu_button_regex("info")), project_info_command))
+    add_menu_button(application, config.PROJECT_MENU_BUTTONS["list"], project_list_command)
+    add_menu_button(application, config.PROJECT_MENU_BUTTONS["all_expenses"], project_main_command)
+    add_menu_button(application, config.PROJECT_MENU_BUTTONS["info"], project_info_command)
     
     # Settings button - imported from project_management
     from handlers.project_management import project_settings_menu
-    application.add_handler(MessageHandler(filters.Regex(project_menu_button_regex("settings")), project_settings_menu))
+    add_menu_button(application, config.PROJECT_MENU_BUTTONS["settings"], project_settings_menu)
 
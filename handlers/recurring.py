@@ -38,7 +38,9 @@ from utils import categories as cat_utils
 from utils import recurring as rec_utils
 from utils import pattern_detector as pd_utils
 from utils.helpers import get_main_menu_keyboard, main_menu_button_regex
-from utils.logger import get_logger, log_event, log_error
+from utils.logger import get_logger, log_event
+from utils.notification_queue import send_notification
+from handlers.menu_router import add_menu_button
 
 logger = get_logger("handlers.recurring")
 
@@ -808,21 +810,20 @@ async def suggest_recurring_if_pattern(
         ),
     ]])
 
-    try:
-        await bot.send_message(
-            chat_id=user_id,
-            text=(
-                f"💡 Замечен регулярный расход:\n"
-                f"💰 {pattern['amount']} — {comment}\n"
-                f"📅 ~{freq_text}\n\n"
-                "Сделать постоянным расходом?"
-            ),
-            reply_markup=keyboard,
-        )
-        log_event(logger, "rec_pattern_suggested",
-                  user_id=user_id, category_id=category_id, comment=comment)
-    except Exception as e:
-        log_error(logger, e, "rec_suggest_send_error", user_id=user_id)
+    await send_notification(
+        bot,
+        user_id,
+        (
+            f"💡 Замечен регулярный расход:\n"
+            f"💰 {pattern['amount']} — {comment}\n"
+            f"📅 ~{freq_text}\n\n"
+            "Сделать постоянным расходом?"
+        ),
+        source="recurring_suggestion",
+        reply_markup=keyboard,
+    )
+    log_event(logger, "rec_pattern_suggested",
+              user_id=user_id, category_id=category_id, comment=comment)
 
 
 def _freq_display(pattern: dict) -> str:
@@ -1018,10 +1019,7 @@ def register_recurring_handlers(application) -> None:
     application.add_handler(edit_conv)
 
     # Главный экран (кнопка в меню)
-    application.add_handler(MessageHandler(
-        filters.Regex(main_menu_button_regex("recurring")),
-        recurring_menu,
-    ))
+    add_menu_button(application, config.MAIN_MENU_BUTTONS["recurring"], recurring_menu)
 
     # Inline-действия: пауза / возобновление / удаление
     application.add_handler(CallbackQueryHandler(
@@ -10,7 +10,8 @@ import config
 from utils import income_categories
 from utils import recurring_incomes
 from utils import recurring as recurring_utils
-from utils.helpers import income_menu_button_regex, get_main_menu_keyboard
+from utils.helpers import get_main_menu_keyboard
+from handlers.menu_router import add_menu_button
 
 (
     REC_ENTERING_AMOUNT,
@@ -316,7 +317,7 @@ async def rin_cancel(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
 
 
 def register_recurring_income_handlers(application):
-    application.add_handler(MessageHandler(filters.Regex(income_menu_button_regex("recurring")), recurring_income_menu))
+    add_menu_button(application, config.INCOME_MENU_BUTTONS["recurring"], recurring_income_menu)
 
     conv = ConversationHandler(
         entry_points=[CallbackQueryHandler(rin_add_start, pattern=r"^rin_add$")],
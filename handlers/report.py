@@ -6,14 +6,19 @@ import os
 import logging
 
 from telegram import Update
-from telegram.ext import ContextTypes, MessageHandler, filters
+from telegram.ext import ContextTypes
 
-from utils.helpers import main_menu_button_regex, get_main_menu_keyboard
+from utils.helpers import get_main_menu_keyboard
 from utils.logger import get_logger, log_event, log_error
-from utils import report_generator
+from utils.lazy_import import lazy_import
+import config
+from handlers.menu_router import add_menu_button
 
 logger = get_logger("handlers.report")
 
+# matplotlib/seaborn загружаются при первом отчёте, а не при старте бота
+report_generator = lazy_import("utils.report_generator")
+
 
 async def report_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     user_id = update.effective_user.id
@@ -64,6 +69,4 @@ async def report_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 
 
 def register_report_handlers(application):
-    application.add_handler(
-        MessageHandler(filters.Regex(main_menu_button_regex("report")), report_command)
-    )
+    add_menu_button(application, config.MAIN_MENU_BUTTONS["report"], report_command)
@@ -2,12 +2,14 @@
 Обработчики команды /start и справки
 """
 
+import functools
+
 from telegram import Update, ReplyKeyboardMarkup
-from telegram.ext import ContextTypes, CommandHandler, filters, MessageHandler
+from telegram.ext import ContextTypes, CommandHandler
 from utils import excel, projects, helpers
 from utils.logger import get_logger, log_command, log_event, log_error
 import config
-from utils import helpers as btn_helpers
+from handlers.menu_router import add_menu_button
 from metrics import (
     track_command,
     track_handler_start,
@@ -18,6 +20,20 @@ from metrics import (
 
 logger = get_logger("handlers.start")
 
+
+@functools.lru_cache(maxsize=None)
+def _projects_menu_keyboard() -> ReplyKeyboardMarkup:
+    """Клавиатура меню проектов (тексты из config.PROJECT_MENU_BUTTONS)"""
+    btn = config.PROJECT_MENU_BUTTONS
+    keyboard = [
+        [btn["create"], btn["list"]],
+        [btn["select"], btn["all_expenses"]],
+        [btn["info"], btn["settings"]],
+        [btn["delete"], btn["main_menu"]],
+    ]
+    return ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+
+
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
     Обрабатывает команду /start
@@ -166,19 +182,10 @@ async def projects_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
     log_event(logger, "projects_menu_opened", user_id=user_id)
     
     try:
-        btn = config.PROJECT_MENU_BUTTONS
-        keyboard = [
-            [btn["create"], btn["list"]],
-            [btn["select"], btn["all_expenses"]],
-            [btn["info"], btn["settings"]],
-            [btn["delete"], btn["main_menu"]],
-        ]
-        reply_markup = ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
-        
         await update.message.reply_text(
             "📁 Меню управления проектами:\n\n"
             "Выберите действие:",
-            reply_markup=reply_markup
+            reply_markup=_projects_menu_keyboard()
         )
         log_event(logger, "projects_menu_success", user_id=user_id)
     except Exception as e:
@@ -242,7 +249,8 @@ def register_start_handlers(application):
     application.add_handler(CommandHandler("help", help_command))
     
     # Обработчики для кнопок меню (тексты из config.MAIN_MENU_BUTTONS)
-    application.add_handler(MessageHandler(filters.Regex(btn_helpers.main_menu_button_regex("projects")), projects_menu))
-    application.add_handler(MessageHandler(filters.Regex(btn_helpers.main_menu_button_regex("settings")), settings_menu))
-    application.add_handler(MessageHandler(filters.Regex(btn_helpers.main_menu_button_regex("main_menu")), main_menu))
-    application.add_handler(MessageHandler(filters.Regex(btn_helpers.main_menu_button_regex("help")), help_command))
+    btn = config.MAIN_MENU_BUTTONS
+    add_menu_button(application, btn["projects"], projects_menu)
+    add_menu_button(application, btn["settings"], settings_menu)
+    add_menu_button(application, btn["main_menu"], main_menu)
+    add_menu_button(application, btn["help"], help_command)
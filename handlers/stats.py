@@ -6,14 +6,14 @@ import asyncio
 
 from telegram import Update, ReplyKeyboardMarkup
 from telegram.constants import ParseMode
-from telegram.ext import ContextTypes, CommandHandler, filters, MessageHandler, ConversationHandler, CallbackQueryHandler
-from utils import excel, helpers, visualization, projects, incomes
-from utils.helpers import main_menu_button_regex, analysis_menu_button_regex
-from utils.logger import get_logger, log_command, log_event, log_error
+from telegram.ext import ContextTypes, CommandHandler, ConversationHandler, CallbackQueryHandler
+from utils import excel, helpers, projects, incomes
+from utils.lazy_import import lazy_import
+from utils.logger import get_logger, log_command, log_event, log_error, measure_time
 import config
+from handlers.menu_router import add_menu_button
 import os
 import datetime
-import time
 from metrics import (
     track_command,
     track_handler_start,
@@ -26,9 +26,13 @@ from metrics import (
 
 logger = get_logger("handlers.stats")
 
+# matplotlib/seaborn загружаются при первом построении графика, а не при старте бота
+visualization = lazy_import("utils.visualization")
+
 # Состояния для ConversationHandler
 CHOOSING_CATEGORY, = range(1)
 
+@measure_time("month_command", logger=logger, slow_threshold=config.SLOW_OPERATION_SECONDS)
 async def month_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
     Обрабатывает команду /month для получения статистики за текущий месяц
@@ -41,8 +45,8 @@ async def month_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
     track_flow_started("month")
     error_type = None
     user_id = update.effective_user.id
-    start_time = time.time()
-
+    timer = measure_time.current()
+    timer.log_fields.update(user_id=user_id)
     try:
         # Получаем текущий месяц и год
         now = datetime.datetime.now()
@@ -89,7 +93,7 @@ async def month_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
 
         # Отправляем отчет
         await update.message.reply_text(report, reply_markup=helpers.get_main_menu_keyboard())
-        
+            
         total = expense_total
         count = expenses.get('count', 0) if expenses else 0
         log_event(logger, "month_stats_sent", user_id=user_id, 
@@ -98,33 +102,31 @@ async def month_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
 
         # Если есть расходы, отправляем круговую диаграмму
         if expenses and expenses['total'] > 0:
-            chart_start = time.time()
-            chart_path = await visualization.create_monthly_pie_chart(user_id,
-                                                                month=month,
-                                                                year=year,
-                                                                project_id=project_id)
-            chart_duration = time.time() - chart_start
-            
+            with measure_time("month_pie_chart") as chart_timer:
+                chart_path = await visualization.create_monthly_pie_chart(user_id,
+                                                                    month=month,
+                                                                    year=year,
+                                                                    project_id=project_id)
+                
             if chart_path and os.path.exists(chart_path):
                 with open(chart_path, 'rb') as photo:
                     await update.message.reply_photo(photo=photo, caption="Распределение расходов по категориям")
                 log_event(logger, "month_chart_sent", user_id=user_id, 
                          project_id=project_id, month=month, year=year,
-                         duration=chart_duration)
+                         duration=chart_timer.duration)
             else:
                 log_event(logger, "month_chart_failed", user_id=user_id, 
                          project_id=project_id, month=month, year=year,
                          reason="chart_not_created")
-        
-        duration = time.time() - start_time
+            
         log_event(logger, "month_command_success", user_id=user_id, 
-                 project_id=project_id, duration=duration)
+                 project_id=project_id, duration=timer.elapsed)
         track_flow_completed("month")
-        
+            
     except Exception as e:
         error_type = classify_error_type(e)
-        duration = time.time() - start_time
-        log_error(logger, e, "month_command_error", user_id=user_id, duration=duration)
+        timer.status = 'error'
+        log_error(logger, e, "month_command_error", user_id=user_id, duration=timer.elapsed)
         await update.message.reply_text("❌ Произошла ошибка при получении статистики.")
     finally:
         if error_type:
@@ -351,10 +353,10 @@ def register_stats_handlers(application):
     Регистрирует обработчики команд для получения статистики и анализа
     """
     application.add_handler(CommandHandler("month", month_command))
-    application.add_handler(MessageHandler(filters.Regex(main_menu_button_regex("month")), month_command))
+    add_menu_button(application, config.MAIN_MENU_BUTTONS["month"], month_command)
     application.add_handler(CommandHandler("category", category_command))
     # Categories button now handled by category menu (handlers/category.py)
     application.add_handler(CommandHandler("stats", stats_command))
-    application.add_handler(MessageHandler(filters.Regex(analysis_menu_button_regex("stats")), stats_command))
+    add_menu_button(application, config.ANALYSIS_MENU_BUTTONS["stats"], stats_command)
     application.add_handler(CommandHandler("day", day_command))
-    application.add_handler(MessageHandler(filters.Regex(main_menu_button_regex("day")), day_command))
+    add_menu_button(application, config.MAIN_MENU_BUTTONS["day"], day_command)
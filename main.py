@@ -1,3 +1,8 @@
+import time
+
+# Отсчёт времени старта: разбивка логируется в system_initialized
+_STARTUP_BEGAN = time.perf_counter()
+
 import logging
 import os
 import datetime
@@ -19,6 +24,8 @@ from telegram.ext import Application, ContextTypes
 import config
 from handlers import register_all_handlers
 from utils.db import init_pool, close_pool
+from utils.telegram_request import InstrumentedHTTPXRequest
+from utils.update_processor import PerUserUpdateProcessor
 from metrics import track_error_only, classify_error_type
 
 # Настройка структурированного логирования
@@ -26,6 +33,8 @@ from utils.logger import get_logger
 
 logger = get_logger("main")
 
+_IMPORTS_DONE = time.perf_counter()
+
 # Глобальный экземпляр планировщика
 _scheduler: AsyncIOScheduler = None
 
@@ -34,16 +43,27 @@ async def on_startup(application: Application):
     """Вызывается после инициализации Application"""
     global _scheduler
     from utils.logger import log_event
+    started = time.perf_counter()
     os.makedirs(config.DATA_DIR, exist_ok=True)
     await init_pool()
+    db_pool_ms = (time.perf_counter() - started) * 1000
     metrics_port = int(os.environ.get("METRICS_PORT", "8000"))
     start_http_server(metrics_port, addr="0.0.0.0")
     log_event(logger, "prometheus_metrics_started", port=metrics_port)
 
-    # Запускаем планировщик уведомлений о бюджете и постоянных расходов
+    # Задержка event loop, число задач и очередь пула рендеринга
+    from utils.runtime_monitor import start_runtime_monitors
+    start_runtime_monitors()
+
+    # Очередь уведомлений фоновых задач с ограничением скорости отправки
+    from utils.notification_queue import start_notification_queue
+    start_notification_queue(application.bot)
+    # Доставка уведомлений, записанных фоновыми задачами в notification_outbox
+    from utils.notification_outbox import start_outbox_drainer
+    start_outbox_drainer(application.bot)
+
+    # Запускаем планировщик уведомлений о бюджете
     from utils.budget_notifier import check_budget_notifications
-    from utils.recurring import process_recurring_expenses
-    from utils.recurring_incomes import process_recurring_incomes
     _scheduler = AsyncIOScheduler(timezone=pytz.UTC)
     _scheduler.add_job(
         check_budget_notifications,
@@ -54,33 +74,17 @@ async def on_startup(application: Application):
         replace_existing=True,
         next_run_time=datetime.datetime.now(pytz.UTC),  # Запуск сразу при старте
     )
-    # Воркер постоянных расходов: проверяет каждые 5 минут
-    _scheduler.add_job(
-        process_recurring_expenses,
-        'interval',
-        minutes=5,
-        args=[application.bot],
-        id='recurring_expenses',
-        replace_existing=True,
-        next_run_time=datetime.datetime.now(pytz.UTC),  # Запуск сразу при старте
-    )
-    # Воркер постоянных доходов: проверяет каждые 5 минут
-    _scheduler.add_job(
-        process_recurring_incomes,
-        'interval',
-        minutes=5,
-        args=[application.bot],
-        id='recurring_incomes',
-        replace_existing=True,
-        next_run_time=datetime.datetime.now(pytz.UTC),
-    )
     _scheduler.start()
     log_event(logger, "scheduler_started",
-              jobs=["budget_notifications", "recurring_expenses", "recurring_incomes"],
-              budget_interval_hours=4,
-              recurring_interval_minutes=5)
+              jobs=["budget_notifications"],
+              budget_interval_hours=4)
+
+    # Постоянные расходы и доходы: проход при старте, дальше — к ближайшему next_run_at
+    from utils.recurring_scheduler import start_recurring_scheduler
+    start_recurring_scheduler(application.bot)
 
-    log_event(logger, "bot_started", status="success")
+    log_event(logger, "bot_started", status="success",
+              duration_ms=(time.perf_counter() - started) * 1000, db_pool_ms=db_pool_ms)
 
 # Функция, которая выполнится ПРИ ОСТАНОВКЕ бота
 async def on_shutdown(application: Application):
@@ -90,9 +94,21 @@ async def on_shutdown(application: Application):
     if _scheduler and _scheduler.running:
         _scheduler.shutdown(wait=False)
         log_event(logger, "scheduler_stopped")
+    from utils.recurring_scheduler import stop_recurring_scheduler
+    await stop_recurring_scheduler()
+    from utils.notification_outbox import stop_outbox_drainer
+    await stop_outbox_drainer()
+    from utils.notification_queue import stop_notification_queue
+    await stop_notification_queue()
+    from utils.runtime_monitor import stop_runtime_monitors
+    await stop_runtime_monitors()
     await close_pool()
     log_event(logger, "bot_shutdown", status="success")
 
+    # Дописываем очередь логов до выхода процесса
+    from utils.logger import shutdown_logging
+    shutdown_logging()
+
 def main():
     """Главная точка входа (НЕ асинхронная)"""
     
@@ -102,21 +118,29 @@ def main():
     os.makedirs(config.DATA_DIR, exist_ok=True)
 
     # Собираем приложение
+    build_started = time.perf_counter()
     application = (
         Application.builder()
         .token(config.TOKEN)
+        # Метрики задержек, размеров запросов и flood control для всех вызовов Bot API
+        .request(InstrumentedHTTPXRequest(connection_pool_size=256))
+        .get_updates_request(InstrumentedHTTPXRequest())
+        # Параллельно между пользователями, по порядку внутри пользователя
+        .concurrent_updates(PerUserUpdateProcessor(config.UPDATE_CONCURRENCY))
         .post_init(on_startup)  # Инициализация после создания приложения
         .post_stop(on_shutdown) # Закрытие при остановке
         .build()
     )
 
     # Регистрация обработчиков
+    handlers_started = time.perf_counter()
     register_all_handlers(application)
     
     # Добавляем middleware для логирования всех входящих обновлений
-    from utils.logging_middleware import LoggingHandler
+    from utils.logging_middleware import LoggingHandler, UpdateStatsHandler, UPDATE_STATS_GROUP
     
     application.add_handler(LoggingHandler, group=-1)  # Самый низкий приоритет
+    application.add_handler(UpdateStatsHandler, group=UPDATE_STATS_GROUP)  # После всех обработчиков
     
     # Обработчик ошибок
     async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -142,7 +166,21 @@ def main():
     
     application.add_error_handler(error_handler)
 
-    log_event(logger, "system_initialized", status="ready")
+    initialized = time.perf_counter()
+    log_event(
+        logger, "system_initialized", status="ready",
+        duration_ms=(initialized - _STARTUP_BEGAN) * 1000,
+        imports_ms=(_IMPORTS_DONE - _STARTUP_BEGAN) * 1000,
+        build_ms=(handlers_started - build_started) * 1000,
+        handlers_ms=(initialized - handlers_started) * 1000,
+    )
+
+    if config.BOT_MODE == "webhook":
+        # Обновления приходят POST-запросами на локальный HTTP-сервер (utils.webhook)
+        import asyncio
+        from utils.webhook import run_webhook
+        asyncio.run(run_webhook(application, on_startup=on_startup, on_shutdown=on_shutdown))
+        return
 
     # run_polling САМ создаст и закроет event loop корректно
     application.run_polling(drop_pending_updates=True)
@@ -1,14 +1,21 @@
 """Prometheus metrics for Telegram bot."""
 
-from typing import Optional
+import functools
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Optional
 
-from prometheus_client import Counter, Gauge
+from prometheus_client import Counter, Gauge, Histogram
 
 try:
     from telegram.error import TelegramError
+    from telegram.ext import ApplicationHandlerStop
 except Exception:  # pragma: no cover
     TelegramError = Exception  # fallback for runtime environments without telegram import
 
+    class ApplicationHandlerStop(Exception):
+        pass
+
 
 ERRORS_TOTAL = Counter(
     "errors_total",
@@ -52,6 +59,147 @@ FLOW_CANCELLED_TOTAL = Counter(
     labelnames=("flow",),
 )
 
+HANDLER_LATENCY_SECONDS = Histogram(
+    "handler_latency_seconds",
+    "Latency of registered handler callbacks by handler and outcome",
+    labelnames=("handler", "status"),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+OPERATION_DURATION_SECONDS = Histogram(
+    "operation_duration_seconds",
+    "Duration of measured operations (utils.logger.measure_time)",
+    labelnames=("operation", "status"),
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+UPDATE_USER_QUEUE_DEPTH = Histogram(
+    "update_user_queue_depth",
+    "Per-user queue depth (including the arriving update) when an update arrives",
+    buckets=(1, 2, 3, 5, 10, 20, 50),
+)
+
+UPDATES_WAITING = Gauge(
+    "updates_waiting",
+    "Number of updates waiting for earlier updates of the same user to finish",
+)
+
+UPDATE_DB_QUERIES = Histogram(
+    "update_db_queries",
+    "Number of database round trips per processed update",
+    labelnames=("handler",),
+    buckets=(0, 1, 2, 3, 5, 8, 13, 20, 30, 50, 100),
+)
+
+UPDATE_DB_SECONDS = Histogram(
+    "update_db_seconds",
+    "Total database time per processed update",
+    labelnames=("handler",),
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+TELEGRAM_API_LATENCY_SECONDS = Histogram(
+    "telegram_api_latency_seconds",
+    "Latency of Bot API calls by method and outcome",
+    labelnames=("method", "status"),
+    buckets=(0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+
+TELEGRAM_API_PAYLOAD_BYTES = Histogram(
+    "telegram_api_payload_bytes",
+    "Size of Bot API request payloads (JSON body or uploaded files)",
+    labelnames=("method",),
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216),
+)
+
+TELEGRAM_API_ERRORS_TOTAL = Counter(
+    "telegram_api_errors_total",
+    "Total number of failed Bot API calls by method and error class",
+    labelnames=("method", "error"),
+)
+
+TELEGRAM_API_RETRY_AFTER_TOTAL = Counter(
+    "telegram_api_retry_after_total",
+    "Total number of RetryAfter (flood control) responses by method",
+    labelnames=("method",),
+)
+
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    "event_loop_lag_seconds",
+    "Delay between the scheduled and actual wake-up of the event loop monitor",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+EVENT_LOOP_TASKS = Gauge(
+    "event_loop_tasks",
+    "Current number of asyncio tasks on the bot event loop",
+)
+
+EXECUTOR_PENDING_TASKS = Gauge(
+    "executor_pending_tasks",
+    "Number of executor jobs waiting for a free worker thread",
+    labelnames=("executor",),
+)
+
+EXECUTOR_ACTIVE_TASKS = Gauge(
+    "executor_active_tasks",
+    "Number of executor jobs currently running",
+    labelnames=("executor",),
+)
+
+LOG_RECORDS_DROPPED_TOTAL = Counter(
+    "log_records_dropped_total",
+    "Total number of log records dropped because the logging queue was full",
+    labelnames=("level",),
+)
+
+LOG_EVENTS_SUPPRESSED_TOTAL = Counter(
+    "log_events_suppressed_total",
+    "Total number of log events suppressed by sampling or rate limits",
+    labelnames=("event", "reason"),
+)
+
+LOG_QUEUE_SIZE = Gauge(
+    "log_queue_size",
+    "Current number of log records waiting in the logging queue",
+)
+
+
+NOTIFICATION_QUEUE_DEPTH = Gauge(
+    "notification_queue_depth",
+    "Number of outbound notifications waiting in the send queue",
+)
+
+NOTIFICATIONS_SENT_TOTAL = Counter(
+    "notifications_sent_total",
+    "Total number of background notifications delivered",
+    labelnames=("source",),
+)
+
+NOTIFICATIONS_FAILED_TOTAL = Counter(
+    "notifications_failed_total",
+    "Total number of background notifications that could not be delivered",
+    labelnames=("source", "error"),
+)
+
+NOTIFICATIONS_DROPPED_TOTAL = Counter(
+    "notifications_dropped_total",
+    "Total number of background notifications dropped before sending",
+    labelnames=("source", "reason"),
+)
+
+NOTIFICATION_DIGEST_MESSAGES = Histogram(
+    "notification_digest_messages",
+    "Number of outbox notifications combined into one outbound message",
+    buckets=(1, 2, 3, 5, 10, 20, 50),
+)
+
+NOTIFICATION_RETRIES_TOTAL = Counter(
+    "notification_retries_total",
+    "Total number of notification send retries by reason",
+    labelnames=("source", "reason"),
+)
+
 
 def track_handler_start(handler_name: str) -> None:
     """Marks handler request start by incrementing in-flight gauge."""
@@ -92,6 +240,61 @@ def track_command(command_name: str) -> None:
     BOT_COMMAND_TOTAL.labels(command=command_name).inc()
 
 
+# Name of the last instrumented handler that ran for the current update
+current_handler: ContextVar[Optional[str]] = ContextVar("current_handler", default=None)
+
+
+def _callback_name(callback: Callable[..., Any]) -> str:
+    qualname = getattr(callback, "__qualname__", None) or getattr(callback, "__name__", None)
+    if qualname is None:
+        return repr(callback)
+    module = getattr(callback, "__module__", None)
+    return f"{module}.{qualname}" if module else qualname
+
+
+def instrument_callback(
+    callback: Callable[..., Awaitable[Any]], handler_name: Optional[str] = None
+) -> Callable[..., Awaitable[Any]]:
+    """Wraps an async handler callback with latency histogram, in-flight gauge and outcome.
+
+    The handler label defaults to "<module>.<qualname>": callbacks in different
+    modules share short names (cancel, handle_amount, ...). In-flight count
+    goes to ACTIVE_REQUESTS alongside the manually tracked handlers.
+    Exceptions are counted as errors and re-raised; handler control-flow
+    exceptions (ApplicationHandlerStop) count as success.
+    """
+    if getattr(callback, "__instrumented__", False):
+        return callback
+
+    name = handler_name or _callback_name(callback)
+    latency = {
+        status: HANDLER_LATENCY_SECONDS.labels(handler=name, status=status)
+        for status in ("success", "error")
+    }
+    in_flight = ACTIVE_REQUESTS.labels(handler=name)
+
+    @functools.wraps(callback)
+    async def wrapper(*args, **kwargs):
+        status = "success"
+        current_handler.set(name)
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            return await callback(*args, **kwargs)
+        except ApplicationHandlerStop:
+            raise
+        except Exception as e:
+            status = "error"
+            ERRORS_TOTAL.labels(type=classify_error_type(e), handler=name).inc()
+            raise
+        finally:
+            latency[status].observe(time.perf_counter() - start)
+            in_flight.dec()
+
+    wrapper.__instrumented__ = True
+    return wrapper
+
+
 def classify_error_type(error: Optional[Exception]) -> str:
     """Maps exception to one of: db, telegram_api, validation, unknown."""
     if error is None:
@@ -0,0 +1,8 @@
+-- Индекс для горячих запросов по личным расходам (project_id IS NULL):
+-- статистика за месяц/день, расходы по категории и годовые агрегаты.
+-- Без него эти запросы на больших объёмах уходят в Seq Scan по expenses
+-- (проектные запросы покрывают idx_expenses_project_id / idx_expenses_project_month).
+-- Планы проверяет tests/test_query_plans.py.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_expenses_user_date
+ON public.expenses (user_id, date)
+WHERE project_id IS NULL;
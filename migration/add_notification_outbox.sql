@@ -0,0 +1,25 @@
+-- Очередь уведомлений фоновых задач (transactional outbox).
+-- Задачи (постоянные расходы/доходы, бюджет) пишут сообщение сюда
+-- в той же транзакции, что и изменение данных; доставкой занимается
+-- utils.notification_outbox (drain_outbox) отдельно от самих задач.
+--
+-- available_at — когда строку можно взять в работу: при выдаче на отправку
+-- сдвигается на время аренды, после неудачи — на время до повтора.
+-- Доставленные строки удаляются; строки с attempts >= NOTIFY_OUTBOX_MAX_ATTEMPTS
+-- остаются в таблице для разбора.
+CREATE TABLE IF NOT EXISTS public.notification_outbox (
+    id              bigserial PRIMARY KEY,
+    chat_id         bigint    NOT NULL,
+    text            text      NOT NULL,
+    source          text      NOT NULL,
+    attempts        integer   NOT NULL DEFAULT 0,
+    available_at    timestamp NOT NULL DEFAULT now(),
+    created_at      timestamp NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_notification_outbox_available
+    ON public.notification_outbox (available_at, id);
+
+-- Drainer забирает все строки чата сразу, чтобы отправить их одним дайджестом
+CREATE INDEX IF NOT EXISTS idx_notification_outbox_chat
+    ON public.notification_outbox (chat_id);
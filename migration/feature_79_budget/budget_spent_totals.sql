@@ -0,0 +1,84 @@
+-- Migration: feature_79_budget / budget_spent_totals
+-- Текущие траты за месяц хранятся прямо в строке бюджета (budgets.spent).
+-- Итог поддерживает триггер на expenses в той же транзакции, что и сама
+-- вставка/удаление/перенос расхода, поэтому немедленная проверка бюджета
+-- (utils.budget_notifier.check_user_budget_now) читает одну строку
+-- вместо пересчёта всех расходов за месяц.
+--
+-- Сумма считается так же, как в excel.get_month_expenses:
+--   личный бюджет  — расходы пользователя с project_id IS NULL;
+--   бюджет проекта — расходы всех участников проекта.
+-- Месяц берётся из expenses.month, год — из expenses.date.
+
+ALTER TABLE public.budgets
+    ADD COLUMN IF NOT EXISTS spent numeric NOT NULL DEFAULT 0;
+
+-- Бюджеты проекта ищутся без user_id: триггер обновляет бюджеты всех участников
+CREATE INDEX IF NOT EXISTS budgets_project_month_idx
+    ON public.budgets(project_id, month, year)
+    WHERE project_id IS NOT NULL;
+
+CREATE OR REPLACE FUNCTION public.budgets_add_spent(
+    p_user_id text, p_project_id integer, p_month integer, p_year integer, p_delta numeric
+) RETURNS void LANGUAGE plpgsql AS $$
+BEGIN
+    IF p_delta IS NULL OR p_delta = 0 THEN
+        RETURN;
+    END IF;
+    IF p_project_id IS NULL THEN
+        UPDATE public.budgets
+        SET spent = spent + p_delta
+        WHERE user_id = p_user_id AND project_id IS NULL
+          AND month = p_month AND year = p_year;
+    ELSE
+        UPDATE public.budgets
+        SET spent = spent + p_delta
+        WHERE project_id = p_project_id
+          AND month = p_month AND year = p_year;
+    END IF;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.expenses_budget_spent() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM public.budgets_add_spent(
+            OLD.user_id, OLD.project_id, OLD.month,
+            EXTRACT(YEAR FROM OLD.date)::integer, -OLD.amount
+        );
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM public.budgets_add_spent(
+            NEW.user_id, NEW.project_id, NEW.month,
+            EXTRACT(YEAR FROM NEW.date)::integer, NEW.amount
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS expenses_budget_spent ON public.expenses;
+-- Перенос между категориями (delete_category_with_transfer) итоги не меняет и триггер не вызывает
+CREATE TRIGGER expenses_budget_spent
+    AFTER INSERT OR DELETE OR UPDATE OF amount, user_id, project_id, month, date
+    ON public.expenses
+    FOR EACH ROW
+    EXECUTE FUNCTION public.expenses_budget_spent();
+
+-- Заполнение итогов для существующих бюджетов.
+-- Запрос идемпотентен: его же можно выполнить для сверки итогов.
+UPDATE public.budgets b
+SET spent = COALESCE((
+    SELECT SUM(e.amount) FROM public.expenses e
+    WHERE e.user_id = b.user_id AND e.project_id IS NULL
+      AND e.month = b.month AND EXTRACT(YEAR FROM e.date) = b.year
+), 0)
+WHERE b.project_id IS NULL;
+
+UPDATE public.budgets b
+SET spent = COALESCE((
+    SELECT SUM(e.amount) FROM public.expenses e
+    WHERE e.project_id = b.project_id
+      AND e.month = b.month AND EXTRACT(YEAR FROM e.date) = b.year
+), 0)
+WHERE b.project_id IS NOT NULL;
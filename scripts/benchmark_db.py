@@ -0,0 +1,214 @@
+"""
+DB benchmark suite: times every public read query function in utils/excel.py,
+utils/incomes.py, utils/budgets.py, utils/categories.py and utils/projects.py
+against the dataset generated by scripts/seed_dataset.py.
+
+Sample subjects are picked from the seeded users: the heaviest personal user,
+a typical (median) user and the largest shared project. Each case reports
+mean/p50/p95 latency and DB round trips per call. Results are stored as JSON;
+--compare prints the change against a previous run and exits with code 1 if any
+case got slower than --threshold percent.
+
+Usage: python scripts/benchmark_db.py [--iterations 20] [--output benchmarks/db.json]
+                                      [--compare benchmarks/db_baseline.json] [--threshold 25]
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import statistics
+import sys
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from seed_dataset import SEED_USER_BASE
+from utils import budgets, categories, db, excel, incomes, projects
+
+
+async def pick_subjects() -> dict:
+    """Выбирает пользователей и проект из синтетических данных"""
+    seeded = "user_id ~ '^[0-9]+$' AND user_id::bigint >= $1"
+    per_user = await db.fetch(
+        f"""
+        SELECT user_id, COUNT(*) AS n FROM expenses
+        WHERE project_id IS NULL AND {seeded}
+        GROUP BY user_id ORDER BY n DESC
+        """, SEED_USER_BASE)
+    if not per_user:
+        raise SystemExit("No seeded data found, run scripts/seed_dataset.py first")
+
+    project = await db.fetchrow(
+        f"""
+        SELECT e.project_id, p.user_id AS owner_id, COUNT(*) AS n
+        FROM expenses e JOIN projects p ON p.project_id = e.project_id
+        WHERE e.project_id IS NOT NULL AND p.{seeded}
+        GROUP BY e.project_id, p.user_id ORDER BY n DESC LIMIT 1
+        """, SEED_USER_BASE)
+    heavy = per_user[0]
+    median = per_user[len(per_user) // 2]
+    category = await db.fetchrow(
+        "SELECT category_id, name FROM categories WHERE user_id = $1 AND project_id IS NULL LIMIT 1",
+        heavy['user_id'])
+
+    return {
+        "heavy_user": int(heavy['user_id']),
+        "heavy_user_expenses": heavy['n'],
+        "median_user": int(median['user_id']),
+        "median_user_expenses": median['n'],
+        "project_id": project['project_id'] if project else None,
+        "project_owner": int(project['owner_id']) if project else None,
+        "project_expenses": project['n'] if project else 0,
+        "category_id": category['category_id'],
+        "category_name": category['name'],
+    }
+
+
+def build_cases(s: dict) -> dict:
+    """Имя кейса -> фабрика корутины. Только функции чтения: бенчмарк не меняет данные."""
+    today = datetime.date.today()
+    month, year = today.month, today.year
+    day = today.strftime("%Y-%m-%d")
+    heavy, median = s["heavy_user"], s["median_user"]
+    project, owner = s["project_id"], s["project_owner"]
+
+    cases = {
+        # utils/excel.py
+        "excel.get_month_expenses[heavy]": lambda: excel.get_month_expenses(heavy, month, year),
+        "excel.get_month_expenses[median]": lambda: excel.get_month_expenses(median, month, year),
+        "excel.get_day_expenses[heavy]": lambda: excel.get_day_expenses(heavy, day),
+        "excel.get_category_expenses[heavy]": lambda: excel.get_category_expenses(heavy, s["category_id"], year),
+        "excel.get_all_expenses[heavy,year]": lambda: excel.get_all_expenses(heavy, year),
+        "excel.get_all_expenses[heavy,all]": lambda: excel.get_all_expenses(heavy),
+        # utils/incomes.py
+        "incomes.get_month_incomes[heavy]": lambda: incomes.get_month_incomes(heavy, month, year),
+        "incomes.get_day_incomes[heavy]": lambda: incomes.get_day_incomes(heavy, day),
+        "incomes.get_all_incomes[heavy,year]": lambda: incomes.get_all_incomes(heavy, year),
+        "incomes.get_yearly_income_by_category[heavy]": lambda: incomes.get_yearly_income_by_category(heavy, year),
+        "incomes.get_yearly_income_vs_expense[heavy]": lambda: incomes.get_yearly_income_vs_expense(heavy, year),
+        # utils/budgets.py
+        "budgets.get_budget[heavy]": lambda: budgets.get_budget(heavy, month, year),
+        "budgets.get_or_inherit_budget[heavy]": lambda: budgets.get_or_inherit_budget(heavy, month, year),
+        "budgets.get_budgets_for_year[heavy]": lambda: budgets.get_budgets_for_year(heavy, year),
+        "budgets.get_all_active_budgets_with_notifications": (
+            lambda: budgets.get_all_active_budgets_with_notifications(month, year)),
+        # utils/categories.py (кэш сбрасывается перед каждым вызовом — меряем БД)
+        "categories.get_categories_for_user_project[heavy]": (
+            lambda: categories.get_categories_for_user_project(heavy)),
+        "categories.get_category_by_name[heavy]": (
+            lambda: categories.get_category_by_name(heavy, s["category_name"])),
+        "categories.get_category_by_id[heavy]": lambda: categories.get_category_by_id(heavy, s["category_id"]),
+        "categories.get_category_by_id_only": lambda: categories.get_category_by_id_only(s["category_id"]),
+        "categories.get_category_name_by_id[heavy]": (
+            lambda: categories.get_category_name_by_id(heavy, s["category_id"])),
+        # utils/projects.py
+        "projects.get_all_projects[heavy]": lambda: projects.get_all_projects(heavy),
+        "projects.get_active_project[heavy]": lambda: projects.get_active_project(heavy),
+    }
+
+    if project is not None:
+        cases.update({
+            "excel.get_month_expenses[project]": lambda: excel.get_month_expenses(owner, month, year, project),
+            "excel.get_all_expenses[project,year]": lambda: excel.get_all_expenses(owner, year, project),
+            "incomes.get_month_incomes[project]": lambda: incomes.get_month_incomes(owner, month, year, project),
+            "categories.get_categories_for_user_project[project]": (
+                lambda: categories.get_categories_for_user_project(owner, project)),
+            "projects.get_project_by_id": lambda: projects.get_project_by_id(owner, project),
+            "projects.get_project_by_name": lambda: projects.get_project_by_name(owner, "Проект 1"),
+            "projects.is_project_member": lambda: projects.is_project_member(owner, project),
+            "projects.get_user_role_in_project": lambda: projects.get_user_role_in_project(owner, project),
+            "projects.get_project_members": lambda: projects.get_project_members(project),
+            "projects.get_project_stats": lambda: projects.get_project_stats(owner, project),
+        })
+    return cases
+
+
+async def run_case(factory, iterations: int) -> dict:
+    await factory()  # warm-up: подготовленные запросы, кэш страниц
+    timings, queries = [], []
+    for _ in range(iterations):
+        categories.invalidate_categories_cache()
+        stats = db.begin_query_stats()
+        t0 = time.perf_counter()
+        await factory()
+        timings.append(time.perf_counter() - t0)
+        queries.append(stats.count)
+
+    timings.sort()
+    return {
+        "mean_ms": statistics.mean(timings) * 1000,
+        "p50_ms": timings[len(timings) // 2] * 1000,
+        "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000,
+        "db_queries": max(queries),
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """Печатает изменения p50 относительно baseline, возвращает регрессии"""
+    regressions = []
+    print(f"\n  Compared with baseline ({baseline.get('created_at', '?')}):")
+    for name, row in current["cases"].items():
+        base = baseline.get("cases", {}).get(name)
+        if not base or not base["p50_ms"]:
+            continue
+        change = (row["p50_ms"] - base["p50_ms"]) / base["p50_ms"] * 100
+        marker = ""
+        if change > threshold:
+            marker = "  <-- REGRESSION"
+            regressions.append(name)
+        print(f"  {name:<55} {base['p50_ms']:>9.2f} -> {row['p50_ms']:>9.2f} ms ({change:+6.1f}%){marker}")
+    return regressions
+
+
+async def main_async(args) -> dict:
+    await db.init_pool()
+    try:
+        subjects = await pick_subjects()
+        results = {}
+        for name, factory in build_cases(subjects).items():
+            results[name] = await run_case(factory, args.iterations)
+            row = results[name]
+            print(f"  {name:<55} mean {row['mean_ms']:>8.2f} ms  p50 {row['p50_ms']:>8.2f}  "
+                  f"p95 {row['p95_ms']:>8.2f}  queries {row['db_queries']}")
+        total_expenses = await db.fetchval("SELECT COUNT(*) FROM expenses")
+    finally:
+        await db.close_pool()
+
+    return {
+        "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "iterations": args.iterations,
+        "total_expenses": total_expenses,
+        "subjects": subjects,
+        "cases": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark query functions against the seeded dataset")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--output", default=os.path.join("benchmarks", "db_results.json"))
+    parser.add_argument("--compare", help="previous results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=25.0, help="allowed p50 slowdown, percent")
+    args = parser.parse_args()
+
+    print("=== DB benchmark ===\n")
+    report = asyncio.run(main_async(args))
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n  {report['total_expenses']:,} expenses in DB; results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n  {len(regressions)} regression(s) above {args.threshold:.0f}%")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
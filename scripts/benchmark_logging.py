@@ -0,0 +1,79 @@
+"""
+Benchmark script for measuring StructuredFormatter throughput (records/sec).
+Covers JSON mode with every available encoder and the human-readable mode.
+
+Usage: python scripts/benchmark_logging.py [n_records]
+"""
+
+import time
+import sys
+import os
+import logging
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import logger as log_utils
+from utils.logger import StructuredFormatter
+
+
+def make_records(n: int) -> list[logging.LogRecord]:
+    """Builds records shaped like typical log_event calls on the expense path."""
+    factory = logging.getLogger("benchmark")
+    records = []
+    for i in range(n):
+        records.append(factory.makeRecord(
+            "handlers.expense", logging.INFO, __file__, 0, "", (), None,
+            extra={
+                'event': 'expense_added_from_text',
+                'request_id': '5f0c1d2e-8a4b-4c11-9e77-0d7a1b2c3d4e',
+                'status': 'success',
+                'duration_ms': 12.34,
+                'user_id': 123456789 + i,
+                'amount': 350.0,
+                'category_id': 42,
+                'category_name': 'продукты',
+                'project_id': None,
+            },
+        ))
+    return records
+
+
+def benchmark_formatter(formatter: StructuredFormatter, records: list[logging.LogRecord]) -> float:
+    """Returns records/sec for formatting all records once."""
+    t0 = time.perf_counter()
+    for record in records:
+        formatter.format(record)
+    return len(records) / (time.perf_counter() - t0)
+
+
+def report(label: str, rate: float) -> None:
+    print(f"  {label:<30} {rate:12,.0f} records/sec  ({1e6 / rate:6.2f} µs/record)")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    print(f"=== Logging benchmark (n={n} records) ===\n")
+
+    records = make_records(n)
+    formatters = [("JSON (stdlib json):", StructuredFormatter(True, json_dumps=log_utils.stdlib_json_dumps))]
+    if log_utils.orjson is not None:
+        formatters.append(("JSON (orjson):", StructuredFormatter(True, json_dumps=log_utils.orjson_dumps)))
+    else:
+        print("  orjson is not installed — only the stdlib encoder is measured\n")
+    formatters.append(("Human-readable:", StructuredFormatter(False)))
+
+    # Warm-up
+    for _, formatter in formatters:
+        benchmark_formatter(formatter, records[:1000])
+
+    print("Results:")
+    for label, formatter in formatters:
+        report(label, benchmark_formatter(formatter, records))
+
+    print(f"\n  Default JSON backend: {log_utils.JSON_BACKEND}")
+    print("\n=== Done ===")
+
+
+if __name__ == '__main__':
+    main()
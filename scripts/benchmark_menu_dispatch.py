@@ -0,0 +1,91 @@
+"""
+Benchmark: cost of dispatching a text message through reply-menu handlers.
+
+Compares the old chain of MessageHandler(filters.Regex("^<button>$")) entries
+with handlers.menu_router.MenuRouter (one dict lookup) for a growing number of
+registered buttons. Two cases per size: the last registered button (worst case
+for the chain) and plain text that matches no button (every expense amount
+typed by a user walks the whole chain before reaching expense.text_handler).
+
+Usage: python scripts/benchmark_menu_dispatch.py [--sizes 10 25 50 100 200] [--iterations 20000]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telegram import Update
+from telegram.ext import MessageHandler, filters
+
+from handlers.menu_router import MenuRouter
+
+
+async def _noop(update, context):
+    return None
+
+
+def make_update(text: str) -> Update:
+    return Update.de_json({
+        "update_id": 1,
+        "message": {
+            "message_id": 1,
+            "date": int(time.time()),
+            "chat": {"id": 1, "type": "private"},
+            "from": {"id": 1, "is_bot": False, "first_name": "Bench"},
+            "text": text,
+        },
+    }, None)
+
+
+def chain_dispatch(chain: list, update: Update):
+    """Как Application.process_update: первый обработчик, чей check_update вернул не None/False"""
+    for handler in chain:
+        check = handler.check_update(update)
+        if check is not None and check is not False:
+            return handler
+    return None
+
+
+def time_per_call(func, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - started) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Menu dispatch cost: regex handler chain vs MenuRouter")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 25, 50, 100, 200])
+    parser.add_argument("--iterations", type=int, default=20_000)
+    args = parser.parse_args()
+
+    print("\n=== Menu dispatch cost (µs per update) ===\n")
+    print(f"  {'buttons':>7} {'chain: last btn':>16} {'chain: no match':>16} {'router: btn':>12} {'router: no match':>17}")
+    for size in args.sizes:
+        buttons = [f"🔘 Кнопка {i}" for i in range(size)]
+        chain = [MessageHandler(filters.Regex("^" + re.escape(text) + "$"), _noop) for text in buttons]
+        router = MenuRouter()
+        for text in buttons:
+            router.add(text, _noop)
+
+        last_button = make_update(buttons[-1])
+        free_text = make_update("350 продукты")
+        assert chain_dispatch(chain, last_button) is chain[-1]
+        assert router.check_update(last_button) is _noop
+
+        row = [
+            time_per_call(lambda: chain_dispatch(chain, last_button), args.iterations),
+            time_per_call(lambda: chain_dispatch(chain, free_text), args.iterations),
+            time_per_call(lambda: router.check_update(last_button), args.iterations),
+            time_per_call(lambda: router.check_update(free_text), args.iterations),
+        ]
+        print(f"  {size:>7} " + " ".join(f"{value * 1e6:>{width}.2f}" for value, width in zip(row, (16, 16, 12, 17))))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,260 @@
+"""
+Load-test harness: replays synthetic user sessions through the real handlers
+registered by handlers.register_all_handlers, against a local Postgres
+(DB_* env vars, see SETUP_LOCAL.md) and a fake Telegram transport.
+
+Each simulated user runs /start and then a random mix of scenarios
+(add expense via text, /month, /category, /export, PDF report) with a short
+think time. Per scenario the script reports throughput, latency percentiles
+and DB round trips per update (utils.db query stats).
+
+Usage: python scripts/load_test.py [--users 50] [--actions 20] [--think 0.05] [--json results.json]
+
+Note: the script writes real rows for user ids starting at --user-base;
+point it at a disposable database.
+"""
+
+import argparse
+import asyncio
+import datetime
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import matplotlib
+matplotlib.use('Agg')
+
+# main патчит apscheduler под pytz до импорта telegram.ext (иначе JobQueue не создаётся)
+import main  # noqa: F401
+from telegram import Update
+from telegram.ext import Application
+from telegram.request import BaseRequest
+
+import config
+from handlers import register_all_handlers
+from utils import db
+from utils.logging_middleware import LoggingHandler, UpdateStatsHandler, UPDATE_STATS_GROUP
+
+BOT_USER = {"id": 1, "is_bot": True, "first_name": "LoadTest", "username": "load_test_bot"}
+
+# Сценарий update, обрабатываемого в текущем task (для error handler)
+_current_scenario: ContextVar[str] = ContextVar("load_test_scenario", default="unknown")
+
+SCENARIOS = {
+    # name: (weight, text)
+    "add_expense": (50, "{amount} продукты нагрузочный тест"),
+    "month": (20, "/month"),
+    "category": (10, "/category продукты"),
+    "export": (10, "/export {year}"),
+    "report": (10, config.MAIN_MENU_BUTTONS["report"]),
+}
+
+
+class FakeTelegramRequest(BaseRequest):
+    """Транспорт Bot API без сети: отвечает как Telegram и считает вызовы по методам"""
+
+    def __init__(self):
+        self.calls = defaultdict(int)
+        self._message_ids = itertools.count(1)
+
+    @property
+    def read_timeout(self):
+        return None
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    async def do_request(self, url, method, request_data=None, read_timeout=None,
+                         write_timeout=None, connect_timeout=None, pool_timeout=None):
+        api_method = url.rsplit('/', 1)[-1]
+        self.calls[api_method] += 1
+        params = request_data.parameters if request_data is not None else {}
+
+        if api_method == "getMe":
+            result = BOT_USER
+        elif api_method.startswith(("send", "edit")):
+            chat_id = int(params.get("chat_id", 0))
+            result = {
+                "message_id": next(self._message_ids),
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "from": BOT_USER,
+                "text": params.get("text", ""),
+            }
+        else:
+            result = True
+        return 200, json.dumps({"ok": True, "result": result}).encode()
+
+
+class SessionFactory:
+    """Строит синтетические Update так, как их присылает Telegram"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._update_ids = itertools.count(1)
+
+    def message(self, user_id: int, text: str) -> Update:
+        message = {
+            "message_id": next(self._update_ids),
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": f"User{user_id}"},
+            "text": text,
+        }
+        if text.startswith("/"):
+            command = text.split()[0]
+            message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(command)}]
+        return Update.de_json({"update_id": message["message_id"], "message": message}, self.bot)
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Results:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.db_queries = defaultdict(list)
+        self.db_time = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, scenario: str, latency: float, stats) -> None:
+        self.latencies[scenario].append(latency)
+        if stats is not None:
+            self.db_queries[scenario].append(stats.count)
+            self.db_time[scenario].append(stats.duration)
+
+    def summary(self, wall_time: float) -> dict:
+        summary = {}
+        for scenario, latencies in sorted(self.latencies.items()):
+            queries = self.db_queries[scenario]
+            summary[scenario] = {
+                "count": len(latencies),
+                "errors": self.errors[scenario],
+                "throughput_per_sec": len(latencies) / wall_time if wall_time else 0.0,
+                "p50_ms": percentile(latencies, 50) * 1000,
+                "p95_ms": percentile(latencies, 95) * 1000,
+                "p99_ms": percentile(latencies, 99) * 1000,
+                "max_ms": max(latencies) * 1000,
+                "db_queries_mean": sum(queries) / len(queries) if queries else 0.0,
+                "db_queries_max": max(queries) if queries else 0,
+                "db_time_mean_ms": (sum(self.db_time[scenario]) / len(queries) * 1000) if queries else 0.0,
+            }
+        return summary
+
+
+def build_application(transport: FakeTelegramRequest) -> Application:
+    application = (
+        Application.builder()
+        .token("123456:LOAD-TEST")
+        .request(transport)
+        .get_updates_request(FakeTelegramRequest())
+        .updater(None)
+        .job_queue(None)
+        .build()
+    )
+    register_all_handlers(application)
+    application.add_handler(LoggingHandler, group=-1)
+    application.add_handler(UpdateStatsHandler, group=UPDATE_STATS_GROUP)
+    return application
+
+
+async def run_update(application, results: Results, scenario: str, update: Update) -> None:
+    _current_scenario.set(scenario)
+    started = time.perf_counter()
+    # Исключения обработчиков Application передаёт в error handler (см. main_async)
+    await application.process_update(update)
+    # log_update (group -1) начал новый подсчёт в этом же task
+    results.record(scenario, time.perf_counter() - started, db.current_query_stats())
+
+
+async def simulate_user(application, factory: SessionFactory, results: Results, user_id: int,
+                        actions: int, think: float, rng: random.Random) -> None:
+    await run_update(application, results, "start", factory.message(user_id, "/start"))
+    names = list(SCENARIOS)
+    weights = [SCENARIOS[name][0] for name in names]
+    year = datetime.date.today().year
+
+    for _ in range(actions):
+        scenario = rng.choices(names, weights)[0]
+        text = SCENARIOS[scenario][1].format(amount=rng.randint(50, 5000), year=year)
+        await run_update(application, results, scenario, factory.message(user_id, text))
+        if think:
+            await asyncio.sleep(rng.uniform(0, think * 2))
+
+
+def print_report(summary: dict, wall_time: float, transport: FakeTelegramRequest) -> None:
+    print(f"\n=== Load test results ({wall_time:.1f}s wall time) ===\n")
+    header = f"  {'scenario':<12} {'count':>6} {'err':>4} {'rps':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'db q':>6} {'db q max':>8} {'db ms':>7}"
+    print(header)
+    for scenario, row in summary.items():
+        print(f"  {scenario:<12} {row['count']:>6} {row['errors']:>4} {row['throughput_per_sec']:>7.1f} "
+              f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} "
+              f"{row['db_queries_mean']:>6.1f} {row['db_queries_max']:>8} {row['db_time_mean_ms']:>7.1f}")
+    print("\n  Bot API calls: " + ", ".join(f"{k}={v}" for k, v in sorted(transport.calls.items())))
+
+
+async def main_async(args) -> dict:
+    rng = random.Random(args.seed)
+    transport = FakeTelegramRequest()
+    application = build_application(transport)
+    results = Results()
+
+    async def count_error(update, context):
+        results.errors[_current_scenario.get()] += 1
+
+    application.add_error_handler(count_error)
+
+    await db.init_pool()
+    try:
+        async with application:
+            factory = SessionFactory(application.bot)
+            started = time.perf_counter()
+            await asyncio.gather(*(
+                simulate_user(application, factory, results, args.user_base + i,
+                              args.actions, args.think, random.Random(rng.random()))
+                for i in range(args.users)
+            ))
+            wall_time = time.perf_counter() - started
+    finally:
+        await db.close_pool()
+
+    summary = results.summary(wall_time)
+    print_report(summary, wall_time, transport)
+    return {"users": args.users, "actions": args.actions, "wall_time_sec": wall_time, "scenarios": summary}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay synthetic user sessions through the bot handlers")
+    parser.add_argument("--users", type=int, default=50, help="simulated users (run concurrently)")
+    parser.add_argument("--actions", type=int, default=20, help="actions per user after /start")
+    parser.add_argument("--think", type=float, default=0.05, help="mean think time between actions, seconds")
+    parser.add_argument("--user-base", type=int, default=900_000_000, help="first synthetic Telegram user id")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="write results to this JSON file")
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n  Results written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
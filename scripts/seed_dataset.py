@@ -0,0 +1,275 @@
+"""
+Seeded generator of a production-scale dataset for a local Postgres.
+
+Populates users, shared projects with members, expense and income categories,
+expenses, incomes, budgets and recurring rules. Runs are reproducible for the
+same --seed and scale. Expenses follow a skewed per-user distribution (a few
+heavy users, a long tail), span --years years and ~30% belong to projects.
+
+Expects the migrated schema (migration/*) and DB_* env vars (see SETUP_LOCAL.md).
+Synthetic users get Telegram ids starting at SEED_USER_BASE, so the data can be
+removed with --reset without touching real users.
+
+Usage: python scripts/seed_dataset.py [--expenses 100000] [--users 500] [--projects 50]
+                                      [--years 3] [--seed 42] [--reset]
+"""
+
+import argparse
+import asyncio
+import datetime
+import os
+import random
+import sys
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from utils import db
+
+SEED_USER_BASE = 800_000_000
+
+EXPENSE_COLUMNS = ('user_id', 'project_id', 'date', 'time', 'amount', 'category_id', 'description', 'month')
+INCOME_COLUMNS = ('user_id', 'amount', 'income_category_id', 'project_id', 'description', 'month', 'income_date')
+DESCRIPTIONS = ['', '', '', 'обед', 'такси до работы', 'подарок', 'продукты на неделю', 'кофе', 'аптека', 'бензин']
+FREQUENCIES = ['daily', 'weekly', 'monthly', 'monthly', 'monthly', 'every_n_days', 'every_n_weeks', 'every_n_months']
+
+
+def seed_user_ids(users: int) -> list[str]:
+    return [str(SEED_USER_BASE + i) for i in range(users)]
+
+
+def user_weights(users: int, rng: random.Random) -> list[float]:
+    """Доля расходов пользователя: степенное распределение (немного «тяжёлых» пользователей)"""
+    return [rng.paretovariate(1.2) for _ in range(users)]
+
+
+async def reset(user_ids: list[str]) -> None:
+    """Удаляет все данные синтетических пользователей"""
+    async with db.transaction() as conn:
+        project_ids = [r['project_id'] for r in await conn.fetch(
+            "SELECT project_id FROM projects WHERE user_id = ANY($1)", user_ids)]
+        for table in ('recurring_rules', 'recurring_incomes', 'expenses', 'incomes', 'budgets'):
+            await conn.execute(
+                f"DELETE FROM {table} WHERE user_id = ANY($1) OR project_id = ANY($2)",
+                user_ids, project_ids)
+        await conn.execute("DELETE FROM income_categories WHERE user_id = ANY($1) OR project_id = ANY($2)",
+                           user_ids, project_ids)
+        await conn.execute("DELETE FROM categories WHERE user_id = ANY($1) OR project_id = ANY($2)",
+                           user_ids, project_ids)
+        await conn.execute("DELETE FROM project_members WHERE user_id = ANY($1) OR project_id = ANY($2)",
+                           user_ids, project_ids)
+        await conn.execute("UPDATE users SET active_project_id = NULL WHERE user_id = ANY($1)", user_ids)
+        await conn.execute("DELETE FROM projects WHERE project_id = ANY($1)", project_ids)
+        await conn.execute("DELETE FROM users WHERE user_id = ANY($1)", user_ids)
+
+
+async def seed(args) -> dict:
+    rng = random.Random(args.seed)
+    user_ids = seed_user_ids(args.users)
+    today = datetime.date.today()
+    first_day = today - datetime.timedelta(days=365 * args.years)
+    span_days = (today - first_day).days
+    counts = {}
+
+    async with db.transaction() as conn:
+        await conn.execute(
+            "INSERT INTO users(user_id) SELECT unnest($1::text[]) ON CONFLICT DO NOTHING", user_ids)
+        counts['users'] = len(user_ids)
+
+        # Проекты и участники
+        owners = [rng.choice(user_ids) for _ in range(args.projects)]
+        project_ids = [r['project_id'] for r in await conn.fetch(
+            """
+            INSERT INTO projects(user_id, project_name, created_date)
+            SELECT owner, 'Проект ' || n, $2::date
+            FROM unnest($1::text[]) WITH ORDINALITY AS t(owner, n)
+            RETURNING project_id
+            """, owners, first_day)]
+        members = {}
+        member_rows = []
+        for project_id, owner in zip(project_ids, owners):
+            team = {owner} | set(rng.sample(user_ids, min(len(user_ids), rng.randint(1, 6))))
+            members[project_id] = sorted(team)
+            for uid in members[project_id]:
+                role = 'owner' if uid == owner else rng.choice(['editor', 'editor', 'viewer'])
+                member_rows.append((project_id, uid, role))
+        await conn.copy_records_to_table('project_members', records=member_rows,
+                                         columns=('project_id', 'user_id', 'role'))
+        counts['projects'] = len(project_ids)
+        counts['project_members'] = len(member_rows)
+
+        # Категории: системные личные для каждого пользователя и проектные для каждого проекта
+        names = list(config.DEFAULT_CATEGORIES)
+        cat_rows = [(uid, name, True, None) for uid in user_ids for name in names]
+        cat_rows += [(owner, name, True, pid) for pid, owner in zip(project_ids, owners) for name in names]
+        category_ids = {}
+        for row in await conn.fetch(
+            """
+            INSERT INTO categories(user_id, name, is_system, project_id)
+            SELECT * FROM unnest($1::text[], $2::text[], $3::bool[], $4::int[])
+            RETURNING category_id, user_id, project_id
+            """,
+            [r[0] for r in cat_rows], [r[1] for r in cat_rows],
+            [r[2] for r in cat_rows], [r[3] for r in cat_rows],
+        ):
+            scope = ('project', row['project_id']) if row['project_id'] else ('user', row['user_id'])
+            category_ids.setdefault(scope, []).append(row['category_id'])
+        counts['categories'] = len(cat_rows)
+
+        income_names = list(config.DEFAULT_INCOME_CATEGORIES)
+        inc_rows = [(uid, name, None) for uid in user_ids for name in income_names]
+        inc_rows += [(owner, name, pid) for pid, owner in zip(project_ids, owners) for name in income_names]
+        income_category_ids = {}
+        for row in await conn.fetch(
+            """
+            INSERT INTO income_categories(user_id, name, is_system, project_id)
+            SELECT u, n, TRUE, p FROM unnest($1::text[], $2::text[], $3::int[]) AS t(u, n, p)
+            RETURNING income_category_id, user_id, project_id
+            """,
+            [r[0] for r in inc_rows], [r[1] for r in inc_rows], [r[2] for r in inc_rows],
+        ):
+            scope = ('project', row['project_id']) if row['project_id'] else ('user', row['user_id'])
+            income_category_ids.setdefault(scope, []).append(row['income_category_id'])
+        counts['income_categories'] = len(inc_rows)
+
+        # Расходы и доходы
+        weights = user_weights(args.users, rng)
+        user_projects = {}
+        for pid, team in members.items():
+            for uid in team:
+                user_projects.setdefault(uid, []).append(pid)
+
+        def pick_scope(uid):
+            if user_projects.get(uid) and rng.random() < 0.3:
+                return rng.choice(user_projects[uid])
+            return None
+
+        expense_users = rng.choices(user_ids, weights, k=args.expenses)
+        expenses = []
+        for uid in expense_users:
+            project_id = pick_scope(uid)
+            scope = ('project', project_id) if project_id else ('user', uid)
+            day = first_day + datetime.timedelta(days=rng.randrange(span_days + 1))
+            expenses.append((
+                uid, project_id, day,
+                datetime.time(rng.randrange(24), rng.randrange(60)),
+                round(rng.lognormvariate(6, 1), 2),
+                rng.choice(category_ids[scope]),
+                rng.choice(DESCRIPTIONS),
+                day.month,
+            ))
+        await conn.copy_records_to_table('expenses', records=expenses, columns=EXPENSE_COLUMNS)
+        counts['expenses'] = len(expenses)
+
+        incomes = []
+        for uid in rng.choices(user_ids, weights, k=max(1, args.expenses // 10)):
+            project_id = pick_scope(uid)
+            scope = ('project', project_id) if project_id else ('user', uid)
+            day = first_day + datetime.timedelta(days=rng.randrange(span_days + 1))
+            incomes.append((uid, round(rng.lognormvariate(10, 0.5), 2),
+                            rng.choice(income_category_ids[scope]), project_id, None, day.month, day))
+        await conn.copy_records_to_table('incomes', records=incomes, columns=INCOME_COLUMNS)
+        counts['incomes'] = len(incomes)
+
+        # Бюджеты за последние 12 месяцев
+        budgets = []
+        for uid in user_ids:
+            for back in range(12):
+                if rng.random() < 0.5:
+                    continue
+                month_start = (today.replace(day=1) - datetime.timedelta(days=31 * back)).replace(day=1)
+                amount = round(rng.uniform(20_000, 150_000), -3)
+                notify = rng.random() < 0.4
+                budgets.append((uid, None, amount, month_start.month, month_start.year,
+                                notify, round(amount * 0.8, 2) if notify else None))
+        await conn.copy_records_to_table(
+            'budgets', records=budgets,
+            columns=('user_id', 'project_id', 'amount', 'month', 'year', 'notify_enabled', 'notify_threshold'))
+        # Расходы вставлены раньше бюджетов, поэтому триггер не заполнил budgets.spent —
+        # считаем итоги так же, как migration/feature_79_budget/budget_spent_totals.sql
+        await conn.execute(
+            """
+            UPDATE budgets b
+            SET spent = COALESCE((
+                SELECT SUM(e.amount) FROM expenses e
+                WHERE e.user_id = b.user_id AND e.project_id IS NULL
+                  AND e.month = b.month AND EXTRACT(YEAR FROM e.date) = b.year
+            ), 0)
+            WHERE b.user_id = ANY($1) AND b.project_id IS NULL
+            """, user_ids)
+        counts['budgets'] = len(budgets)
+
+        # Постоянные расходы и доходы: часть правил уже «просрочена» (next_run_at в прошлом)
+        now = datetime.datetime.utcnow().replace(microsecond=0)
+        rules, income_rules = [], []
+        for uid in user_ids:
+            for _ in range(rng.choice([0, 0, 1, 1, 2, 3])):
+                frequency = rng.choice(FREQUENCIES)
+                rules.append(_rule(rng, uid, frequency, rng.choice(category_ids[('user', uid)]), now, first_day))
+            if rng.random() < 0.3:
+                income_rules.append(_rule(rng, uid, 'monthly', rng.choice(income_category_ids[('user', uid)]),
+                                          now, first_day))
+        rule_columns = ('user_id', 'amount', '{category}', 'comment', 'frequency_type', 'interval_value',
+                        'weekday', 'day_of_month', 'start_date', 'next_run_at', 'status')
+        await conn.copy_records_to_table(
+            'recurring_rules', records=rules,
+            columns=[c.format(category='category_id') for c in rule_columns])
+        await conn.copy_records_to_table(
+            'recurring_incomes', records=income_rules,
+            columns=[c.format(category='income_category_id') for c in rule_columns])
+        counts['recurring_rules'] = len(rules)
+        counts['recurring_incomes'] = len(income_rules)
+
+    return counts
+
+
+def _rule(rng, uid, frequency, category_id, now, first_day):
+    interval = rng.randint(2, 4) if frequency.startswith('every_n') else None
+    weekday = rng.randint(1, 7) if 'week' in frequency else None
+    day_of_month = rng.randint(1, 28) if 'month' in frequency else None
+    next_run = now + datetime.timedelta(minutes=rng.randint(-180, 60 * 24 * 30))
+    status = 'active' if rng.random() < 0.9 else 'paused'
+    return (uid, round(rng.uniform(100, 20_000), 2), category_id, rng.choice(DESCRIPTIONS),
+            frequency, interval, weekday, day_of_month, first_day, next_run, status)
+
+
+async def main_async(args) -> None:
+    await db.init_pool()
+    try:
+        if args.reset:
+            t0 = time.perf_counter()
+            await reset(seed_user_ids(args.users))
+            print(f"  Removed synthetic data for {args.users} users ({time.perf_counter() - t0:.1f}s)")
+            if args.reset_only:
+                return
+
+        t0 = time.perf_counter()
+        counts = await seed(args)
+        await db.execute("ANALYZE")
+        elapsed = time.perf_counter() - t0
+    finally:
+        await db.close_pool()
+
+    print(f"\n=== Seeded dataset (seed={args.seed}) in {elapsed:.1f}s ===\n")
+    for table, count in counts.items():
+        print(f"  {table:<20} {count:>10,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Populate a local Postgres with a reproducible synthetic dataset")
+    parser.add_argument("--expenses", type=int, default=100_000, help="number of expenses (1k–1M)")
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--projects", type=int, default=50)
+    parser.add_argument("--years", type=int, default=3, help="history depth in years")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="remove previously seeded users first")
+    parser.add_argument("--reset-only", action="store_true", help="only remove seeded users")
+    args = parser.parse_args()
+    args.reset = args.reset or args.reset_only
+    asyncio.run(main_async(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -10,6 +10,7 @@ from handlers.expense import (
     handle_category_callback, 
     handle_description,
     cancel,
+    text_handler,
     ENTERING_AMOUNT, 
     CHOOSING_CATEGORY
 )
@@ -169,3 +170,69 @@ async def test_cancel_command(mock_update, mock_context):
         mock_cancel.assert_called_once()
         
         assert result == ConversationHandler.END
+
+
+@pytest.mark.asyncio
+async def test_text_handler_adds_batch_of_expenses(mock_update, mock_context):
+    """Многострочное сообщение: одна вставка, одно подтверждение, одна проверка бюджета"""
+    mock_update.message.text = "350 продукты хлеб\n120 транспорт\n90 такси"
+    found = {
+        "продукты": {"category_id": 1, "name": "продукты"},
+        "транспорт": {"category_id": 2, "name": "транспорт"},
+    }
+
+    with patch('handlers.expense.helpers.get_active_project_id', new=AsyncMock(return_value=None)), \
+         patch('handlers.expense.categories.get_categories_by_names', new=AsyncMock(return_value=found)) as mock_lookup, \
+         patch('handlers.expense.excel.add_expenses', new=AsyncMock(return_value=True)) as mock_add, \
+         patch('handlers.expense.check_user_budget_now', new=AsyncMock()) as mock_budget:
+        await text_handler(mock_update, mock_context)
+
+    mock_lookup.assert_awaited_once()
+    mock_add.assert_awaited_once()
+    assert [e['category']['category_id'] for e in mock_add.await_args.args[1]] == [1, 2]
+    mock_update.message.reply_text.assert_awaited_once()
+    reply = mock_update.message.reply_text.await_args.args[0]
+    assert "Добавлено расходов: 2" in reply
+    assert "такси" in reply
+    mock_budget.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_text_handler_two_lines_without_description_are_two_expenses(mock_update, mock_context):
+    """Две строки без описания — два расхода, а не один с описанием из второй строки"""
+    mock_update.message.text = "350 продукты\n\n120 транспорт"
+    found = {
+        "продукты": {"category_id": 1, "name": "продукты"},
+        "транспорт": {"category_id": 2, "name": "транспорт"},
+    }
+
+    with patch('handlers.expense.helpers.get_active_project_id', new=AsyncMock(return_value=None)), \
+         patch('handlers.expense.categories.get_categories_by_names', new=AsyncMock(return_value=found)), \
+         patch('handlers.expense.excel.add_expenses', new=AsyncMock(return_value=True)) as mock_add, \
+         patch('handlers.expense.excel.add_expense', new=AsyncMock(return_value=True)) as mock_add_single, \
+         patch('handlers.expense.check_user_budget_now', new=AsyncMock()):
+        await text_handler(mock_update, mock_context)
+
+    mock_add_single.assert_not_awaited()
+    mock_add.assert_awaited_once()
+    added = mock_add.await_args.args[1]
+    assert [e['amount'] for e in added] == [350.0, 120.0]
+    assert [e['description'] for e in added] == ["", ""]
+
+
+@pytest.mark.asyncio
+async def test_text_handler_keeps_multiline_description_as_one_expense(mock_update, mock_context):
+    """Если не каждая строка — расход, сообщение остаётся одним расходом с многострочным описанием"""
+    mock_update.message.text = "500 еда обед\nс коллегами"
+
+    with patch('handlers.expense.helpers.get_active_project_id', new=AsyncMock(return_value=None)), \
+         patch('handlers.expense.categories.get_category_by_name',
+               new=AsyncMock(return_value={"category_id": 3, "name": "еда"})), \
+         patch('handlers.expense.excel.add_expense', new=AsyncMock(return_value=True)) as mock_add_single, \
+         patch('handlers.expense.excel.add_expenses', new=AsyncMock()) as mock_add, \
+         patch('handlers.expense.check_user_budget_now', new=AsyncMock()):
+        await text_handler(mock_update, mock_context)
+
+    mock_add.assert_not_awaited()
+    mock_add_single.assert_awaited_once()
+    assert mock_add_single.await_args.args[1:4] == (500.0, 3, "обед\nс коллегами")
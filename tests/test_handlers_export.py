@@ -167,3 +167,32 @@ async def test_perform_export_message_selection():
         # Тест 2: direct message update - должен использовать update.message
         await perform_export(mock_direct_update, 123, None, None, None)
         mock_direct_update.message.reply_text.assert_called()
+
+
+@pytest.mark.asyncio
+async def test_perform_export_builds_and_sends_excel():
+    """Экспорт с данными строит Excel-файл и отправляет его документом"""
+    update = Mock()
+    update.callback_query = None
+    update.message = AsyncMock()
+    sent = {}
+
+    async def capture_document(document, filename, **kwargs):
+        sent['size'] = len(document.read())
+        sent['filename'] = filename
+
+    update.message.reply_document.side_effect = capture_document
+    expenses_df = pd.DataFrame({
+        'date': ['2024-03-01', '2024-03-02'],
+        'amount': ['100.5', '200'],
+        'category': ['Еда', 'Транспорт'],
+        'description': ['обед', 'такси'],
+        'month': [3, 3],
+    })
+
+    with patch('handlers.export.excel.get_all_expenses', new=AsyncMock(return_value=expenses_df)):
+        await perform_export(update, 123, None, 2024, 3)
+
+    update.message.reply_text.assert_not_called()
+    assert sent['filename'].endswith('.xlsx')
+    assert sent['size'] > 0
@@ -0,0 +1,152 @@
+"""
+Тесты для handlers/menu_router.py (диспетчеризация кнопок меню)
+"""
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from telegram import Update
+
+import config
+import handlers
+from handlers.menu_router import MenuRouter, add_menu_button, menu_router
+from utils import helpers
+
+
+def _update(text=None, edited=False):
+    message = {
+        "message_id": 1,
+        "date": int(time.time()),
+        "chat": {"id": 1, "type": "private"},
+        "from": {"id": 1, "is_bot": False, "first_name": "Test"},
+    }
+    if text is not None:
+        message["text"] = text
+    if edited:
+        message["edit_date"] = int(time.time())
+    return Update.de_json({"update_id": 1, "edited_message" if edited else "message": message}, None)
+
+
+async def month_button(update, context):
+    return "month"
+
+
+async def other_month_button(update, context):
+    return "other"
+
+
+def test_router_matches_exact_button_text_only():
+    """Кнопка находится только по точному тексту; прочий текст проходит мимо."""
+    router = MenuRouter()
+    router.add(config.MAIN_MENU_BUTTONS["month"], month_button)
+
+    assert router.check_update(_update(config.MAIN_MENU_BUTTONS["month"])) is month_button
+    assert router.check_update(_update(config.MAIN_MENU_BUTTONS["month"] + " ")) is None
+    assert router.check_update(_update("350 продукты")) is None
+    assert router.check_update(_update()) is None
+    assert router.check_update(_update(config.MAIN_MENU_BUTTONS["month"], edited=True)) is None
+    assert router.check_update("not an update") is None
+
+
+def test_first_registered_button_wins():
+    """При совпадении текстов остаётся первая кнопка, как в цепочке MessageHandler."""
+    router = MenuRouter()
+    router.add("⬅️ Главное меню", month_button)
+    router.add("⬅️ Главное меню", other_month_button)
+
+    assert router.routes["⬅️ Главное меню"] is month_button
+
+
+@pytest.mark.asyncio
+async def test_handle_update_calls_routed_callback():
+    """handle_update вызывает callback найденной кнопки."""
+    router = MenuRouter()
+    callback = AsyncMock(return_value="done")
+    router.add("📆 День", callback)
+    update = _update("📆 День")
+    context = SimpleNamespace()
+
+    result = await router.handle_update(update, None, router.check_update(update), context)
+
+    assert result == "done"
+    callback.assert_awaited_once_with(update, context)
+
+
+def test_menu_router_is_created_once_per_application():
+    """menu_router переиспользует уже зарегистрированный маршрутизатор группы 0."""
+    class FakeApplication:
+        def __init__(self):
+            self.handlers = {}
+
+        def add_handler(self, handler, group=0):
+            self.handlers.setdefault(group, []).append(handler)
+
+    application = FakeApplication()
+    add_menu_button(application, "📅 Месяц", month_button)
+    add_menu_button(application, "📆 День", other_month_button)
+
+    assert len(application.handlers[0]) == 1
+    assert menu_router(application) is application.handlers[0][0]
+    assert set(application.handlers[0][0].routes) == {"📅 Месяц", "📆 День"}
+
+
+def test_instrument_handlers_wraps_routes():
+    """Колбэки кнопок получают метрики обработчиков."""
+    router = MenuRouter()
+    router.add("📅 Месяц", month_button)
+
+    handlers.instrument_handlers(SimpleNamespace(handlers={0: [router]}))
+
+    assert router.routes["📅 Месяц"].__wrapped__ is month_button
+
+
+def test_menu_keyboards_are_built_once():
+    """Клавиатуры меню неизменяемы и строятся один раз."""
+    assert helpers.get_main_menu_keyboard() is helpers.get_main_menu_keyboard()
+    assert helpers.get_income_menu_keyboard() is helpers.get_income_menu_keyboard()
+
+
+@pytest.mark.asyncio
+async def test_menu_button_ends_active_conversation():
+    """Кнопка меню посреди диалога завершает его: следующий текст — снова расход, а не ввод диалога."""
+    from telegram.ext import ConversationHandler, MessageHandler, filters
+
+    calls = []
+
+    async def start_naming(update, context):
+        calls.append("start")
+        return 1
+
+    async def take_name(update, context):
+        calls.append("name")
+        return ConversationHandler.END
+
+    async def expense(update, context):
+        calls.append("expense")
+
+    router = MenuRouter()
+    router.add("📆 День", AsyncMock(side_effect=lambda u, c: calls.append("day")))
+    conversation = ConversationHandler(
+        entry_points=[MessageHandler(filters.Regex("^Новый проект$"), start_naming)],
+        states={1: [MessageHandler(filters.TEXT & ~filters.COMMAND, take_name)]},
+        fallbacks=[],
+    )
+    application = SimpleNamespace(bot=None, handlers={0: [
+        router, conversation, MessageHandler(filters.TEXT & ~filters.COMMAND, expense),
+    ]})
+
+    async def dispatch(text):
+        # Как Application.process_update: в группе срабатывает первый подходящий обработчик
+        update = _update(text)
+        for handler in application.handlers[0]:
+            check = handler.check_update(update)
+            if check is not None and check is not False:
+                await handler.handle_update(update, application, check, MagicMock())
+                return
+
+    await dispatch("Новый проект")
+    await dispatch("📆 День")
+    await dispatch("350 продукты")
+
+    assert calls == ["start", "day", "expense"]
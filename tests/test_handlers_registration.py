@@ -0,0 +1,58 @@
+"""
+Тесты для handlers/__init__.py (инструментирование обработчиков)
+"""
+import pytest
+from types import SimpleNamespace
+from telegram.ext import CommandHandler, ConversationHandler, MessageHandler, filters
+
+import handlers
+from metrics import ACTIVE_REQUESTS, HANDLER_LATENCY_SECONDS
+
+
+def _count(handler_name, status):
+    metric = HANDLER_LATENCY_SECONDS.labels(handler=handler_name, status=status)
+    return sum(bucket.get() for bucket in metric._buckets)
+
+
+async def tests_instr_entry(update, context):
+    return 1
+
+
+async def tests_instr_state(update, context):
+    raise ValueError("boom")
+
+
+async def tests_instr_plain(update, context):
+    return None
+
+
+@pytest.mark.asyncio
+async def test_instrument_handlers_wraps_conversation_states():
+    """Колбэки точек входа, состояний и обычных обработчиков получают метрики."""
+    conversation = ConversationHandler(
+        entry_points=[CommandHandler("instr", tests_instr_entry)],
+        states={1: [MessageHandler(filters.TEXT, tests_instr_state)]},
+        fallbacks=[],
+    )
+    plain = CommandHandler("plain", tests_instr_plain)
+    application = SimpleNamespace(handlers={0: [conversation, plain]})
+
+    handlers.instrument_handlers(application)
+    handlers.instrument_handlers(application)  # повторный вызов не оборачивает дважды
+
+    entry = conversation.entry_points[0].callback
+    state = conversation.states[1][0].callback
+    assert entry.__wrapped__ is tests_instr_entry
+    assert plain.callback.__wrapped__ is tests_instr_plain
+
+    entry_name = f"{__name__}.tests_instr_entry"
+    state_name = f"{__name__}.tests_instr_state"
+    before_success = _count(entry_name, "success")
+    before_error = _count(state_name, "error")
+    assert await entry(None, None) == 1
+    with pytest.raises(ValueError):
+        await state(None, None)
+
+    assert _count(entry_name, "success") - before_success == 1
+    assert _count(state_name, "error") - before_error == 1
+    assert ACTIVE_REQUESTS.labels(handler=state_name)._value.get() == 0
@@ -0,0 +1,142 @@
+"""
+Регрессионные тесты планов горячих запросов (EXPLAIN (FORMAT JSON)).
+
+Запросы берутся из реальных функций модулей: обёртки utils.db подменяются
+записывающими, затем каждый SELECT объясняется на локальной БД с данными
+scripts/seed_dataset.py. Тест падает, если план читает expenses, incomes
+или categories последовательным сканированием.
+
+Без доступной БД (DB_* из SETUP_LOCAL.md) или при объёме меньше
+EXPLAIN_MIN_EXPENSES расходов тесты пропускаются: на маленьких таблицах
+Seq Scan — нормальный выбор планировщика.
+"""
+import asyncio
+import datetime
+import json
+import os
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import asyncpg
+import pytest
+
+from utils import budgets, categories, db, excel, incomes, projects, queries, recurring, recurring_incomes
+
+pytestmark = pytest.mark.integration
+
+MIN_EXPENSES = int(os.environ.get("EXPLAIN_MIN_EXPENSES", "10000"))
+GUARDED_TABLES = {"expenses", "incomes", "categories"}
+
+
+def _day(s):
+    return s.day.strftime("%Y-%m-%d")
+
+
+HOT_QUERIES = {
+    "month_expenses_personal": lambda s: excel.get_month_expenses(s.user_id, s.month, s.year),
+    "month_expenses_project": lambda s: excel.get_month_expenses(s.owner_id, s.month, s.year, s.project_id),
+    "day_expenses_personal": lambda s: excel.get_day_expenses(s.user_id, _day(s)),
+    "day_expenses_project": lambda s: excel.get_day_expenses(s.owner_id, _day(s), s.project_id),
+    "category_expenses_personal": lambda s: excel.get_category_expenses(s.user_id, s.category_id, s.year),
+    "year_expenses_personal": lambda s: excel.get_all_expenses(s.user_id, s.year),
+    "year_expenses_project": lambda s: excel.get_all_expenses(s.owner_id, s.year, s.project_id),
+    "month_incomes_personal": lambda s: incomes.get_month_incomes(s.user_id, s.month, s.year),
+    "day_incomes_personal": lambda s: incomes.get_day_incomes(s.user_id, _day(s)),
+    "year_incomes_personal": lambda s: incomes.get_all_incomes(s.user_id, s.year),
+    "year_income_vs_expense_personal": lambda s: incomes.get_yearly_income_vs_expense(s.user_id, s.year),
+    "category_by_name_personal": lambda s: categories.get_category_by_name(s.user_id, "продукты"),
+    "categories_project": lambda s: categories.get_categories_for_user_project(s.owner_id, s.project_id),
+    "role_in_project": lambda s: projects.get_user_role_in_project(s.owner_id, s.project_id),
+    "due_recurring_expenses": lambda s: recurring.process_recurring_expenses(None),
+    "due_recurring_incomes": lambda s: recurring_incomes.process_recurring_incomes(None),
+    "active_budgets": lambda s: budgets.get_all_active_budgets_with_notifications(s.month, s.year),
+}
+
+
+async def _capture_queries(call) -> list:
+    """Выполняет функцию с записывающими обёртками db, возвращает [(sql, args)] её SELECT-запросов"""
+    captured = []
+
+    def recorder(result, named=False):
+        async def record(query, *args, request_id=None):
+            captured.append((queries.STATEMENTS[query] if named else query, args))
+            return result() if callable(result) else result
+        return record
+
+    with patch.multiple(
+        db,
+        fetch=recorder(list), fetchrow=recorder(None), fetchval=recorder(None),
+        fetch_named=recorder(list, named=True), fetchrow_named=recorder(None, named=True),
+        fetchval_named=recorder(None, named=True),
+    ), patch("utils.permissions.has_permission", AsyncMock(return_value=True)):
+        categories.invalidate_categories_cache()
+        await call()
+    return [(sql, args) for sql, args in captured if sql.lstrip().upper().startswith(("SELECT", "WITH"))]
+
+
+def _seq_scans(plan: dict) -> set:
+    """Таблицы из GUARDED_TABLES, которые план читает через Seq Scan"""
+    found, stack = set(), [plan]
+    while stack:
+        node = stack.pop()
+        if node.get("Node Type") == "Seq Scan" and node.get("Relation Name") in GUARDED_TABLES:
+            found.add(node["Relation Name"])
+        stack.extend(node.get("Plans", []))
+    return found
+
+
+@pytest.fixture
+async def conn():
+    try:
+        connection = await asyncpg.connect(db.DSN, timeout=3)
+    except (OSError, asyncio.TimeoutError, asyncpg.PostgresError) as e:
+        pytest.skip(f"local database is not available: {e}")
+    try:
+        expenses = await connection.fetchval("SELECT reltuples::bigint FROM pg_class WHERE relname = 'expenses'")
+        if (expenses or 0) < MIN_EXPENSES:
+            pytest.skip(f"expenses has ~{expenses} rows, need {MIN_EXPENSES} (run scripts/seed_dataset.py)")
+        yield connection
+    finally:
+        await connection.close()
+
+
+@pytest.fixture
+async def subjects(conn):
+    """Самый активный пользователь, самый крупный проект и их данные"""
+    user = await conn.fetchrow(
+        """
+        SELECT user_id, MAX(date) AS day FROM expenses
+        WHERE project_id IS NULL
+        GROUP BY user_id ORDER BY COUNT(*) DESC LIMIT 1
+        """)
+    project = await conn.fetchrow(
+        """
+        SELECT e.project_id, p.user_id AS owner_id FROM expenses e
+        JOIN projects p ON p.project_id = e.project_id
+        GROUP BY e.project_id, p.user_id ORDER BY COUNT(*) DESC LIMIT 1
+        """)
+    category_id = await conn.fetchval(
+        "SELECT category_id FROM expenses WHERE user_id = $1 AND project_id IS NULL LIMIT 1", user["user_id"])
+    today = datetime.date.today()
+    return SimpleNamespace(
+        user_id=int(user["user_id"]),
+        day=user["day"],
+        owner_id=int(project["owner_id"]) if project else 0,
+        project_id=project["project_id"] if project else 0,
+        category_id=category_id,
+        month=today.month,
+        year=today.year,
+    )
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+async def test_hot_query_avoids_seq_scan(name, conn, subjects):
+    """Горячий запрос не читает большие таблицы последовательным сканированием."""
+    captured = await _capture_queries(lambda: HOT_QUERIES[name](subjects))
+    assert captured, f"{name} issued no SELECT"
+
+    for sql, args in captured:
+        raw = await conn.fetchval("EXPLAIN (FORMAT JSON) " + sql, *args)
+        plan = json.loads(raw)[0]["Plan"]
+        scans = _seq_scans(plan)
+        assert not scans, f"{name}: Seq Scan on {', '.join(sorted(scans))}\n{sql.strip()}\n{json.dumps(plan, indent=2)}"
@@ -0,0 +1,72 @@
+"""
+Бюджет времени импорта при старте бота: main не должен тянуть тяжёлые
+научные библиотеки, они загружаются при первом построении графика/отчёта.
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("matplotlib", "seaborn", "numpy", "pandas", "openpyxl")
+# С запасом для общих CI-раннеров: сейчас импорт main занимает ~0.4 с,
+# а с pandas/matplotlib — в несколько раз дольше
+IMPORT_BUDGET_SECONDS = float(os.environ.get("STARTUP_IMPORT_BUDGET_SECONDS", "3.0"))
+
+PROBE = """
+import json, sys
+import main
+print(json.dumps({"loaded": [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+
+@pytest.fixture(scope="module")
+def startup():
+    """Импортирует main в чистом интерпретаторе (в текущем процессе модули уже загружены тестами)"""
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=ROOT, capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_main_does_not_import_heavy_modules(startup):
+    """При старте не загружаются matplotlib, seaborn, numpy, pandas и openpyxl."""
+    assert startup["loaded"] == []
+
+
+def _import_times(module):
+    """Накопленное время импорта (-X importtime) модуля и его самых дорогих зависимостей"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, _, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|").split("|"))
+        cumulative[name] = int(cumulative_us) / 1e6
+    return cumulative
+
+
+def test_main_import_fits_budget():
+    """Импорт main укладывается в бюджет времени (по -X importtime, без старта интерпретатора)."""
+    cumulative = _import_times("main")
+    slowest = sorted(cumulative.items(), key=lambda item: -item[1])[1:6]
+    assert cumulative["main"] < IMPORT_BUDGET_SECONDS, f"самые долгие импорты: {slowest}"
+
+
+def test_lazy_module_loads_on_first_attribute_access():
+    """Отложенный модуль исполняется при первом обращении к атрибуту."""
+    probe = (
+        "import sys; from handlers import stats; "
+        "assert 'matplotlib' not in sys.modules; "
+        "stats.visualization.create_monthly_pie_chart; "
+        "assert 'matplotlib' in sys.modules"
+    )
+    result = subprocess.run([sys.executable, "-c", probe], cwd=ROOT, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
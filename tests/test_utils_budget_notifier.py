@@ -1,14 +1,20 @@
 """
 Тесты для utils/budget_notifier.py
 """
+import contextlib
 import datetime
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, patch, sentinel
 
 import pytest
 
 from utils import budget_notifier
 
 
+@contextlib.asynccontextmanager
+async def _transaction():
+    yield sentinel.conn
+
+
 def test_should_send_only_first_time():
     """Уведомление отправляется только если ранее не отправляли."""
     assert budget_notifier._should_send(None, 100.0, 120.0) is True
@@ -31,7 +37,8 @@ async def test_process_budget_does_not_resend_overspent_when_already_notified():
     }
 
     with patch("utils.budget_notifier.excel.get_month_expenses", new=AsyncMock(return_value={"total": 1200.0})), \
-         patch("utils.budget_notifier._send_to_users", new=AsyncMock()) as send_mock, \
+         patch("utils.budget_notifier.notification_outbox.add_notifications", new=AsyncMock()) as send_mock, \
+         patch("utils.budget_notifier.db.transaction", new=_transaction), \
          patch("utils.budget_notifier.budgets_utils.update_notification_state", new=AsyncMock()) as update_mock:
         await budget_notifier._process_budget(
             bot=bot,
@@ -62,7 +69,8 @@ async def test_process_budget_sends_overspent_once_and_updates_state():
     }
 
     with patch("utils.budget_notifier.excel.get_month_expenses", new=AsyncMock(return_value={"total": 1200.0})), \
-         patch("utils.budget_notifier._send_to_users", new=AsyncMock()) as send_mock, \
+         patch("utils.budget_notifier.notification_outbox.add_notifications", new=AsyncMock()) as send_mock, \
+         patch("utils.budget_notifier.db.transaction", new=_transaction), \
          patch("utils.budget_notifier.budgets_utils.update_notification_state", new=AsyncMock()) as update_mock:
         await budget_notifier._process_budget(
             bot=bot,
@@ -78,6 +86,7 @@ async def test_process_budget_sends_overspent_once_and_updates_state():
         threshold_notified_at=None,
         overspent_notified_at=now,
         last_notified_spending=1200.0,
+        conn=sentinel.conn,
     )
 
 
@@ -95,3 +104,125 @@ async def test_check_budget_notifications_uses_local_now_for_month_year():
         await budget_notifier.check_budget_notifications(bot=AsyncMock())
 
     active_mock.assert_called_once_with(1, 2026)
+
+
+@pytest.mark.asyncio
+async def test_process_budget_uses_running_total_without_scanning_expenses():
+    """Если в бюджете есть итог spent, расходы за месяц не перечитываются."""
+    now = datetime.datetime(2026, 4, 17, 12, 0, 0)
+    budget = {
+        "id": 3,
+        "user_id": "123",
+        "project_id": None,
+        "amount": 1000.0,
+        "notify_threshold": 800.0,
+        "overspent_notified_at": None,
+        "threshold_notified_at": None,
+        "last_notified_spending": None,
+        "spent": 850.0,
+    }
+
+    with patch("utils.budget_notifier.excel.get_month_expenses", new=AsyncMock()) as month_mock, \
+         patch("utils.budget_notifier.notification_outbox.add_notifications", new=AsyncMock()) as send_mock, \
+         patch("utils.budget_notifier.db.transaction", new=_transaction), \
+         patch("utils.budget_notifier.budgets_utils.update_notification_state", new=AsyncMock()) as update_mock:
+        await budget_notifier._process_budget(bot=AsyncMock(), budget=budget, month=4, year=2026, now=now)
+
+    month_mock.assert_not_called()
+    send_mock.assert_called_once()
+    update_mock.assert_called_once_with(
+        budget_id=3,
+        threshold_notified_at=now,
+        overspent_notified_at=None,
+        last_notified_spending=850.0,
+        conn=sentinel.conn,
+    )
+
+
+@pytest.mark.asyncio
+async def test_check_user_budget_now_reads_single_budget_row():
+    """Немедленная проверка после расхода — одно чтение строки бюджета."""
+    budget = {
+        "id": 4,
+        "user_id": "123",
+        "project_id": None,
+        "amount": 1000.0,
+        "notify_enabled": True,
+        "notify_threshold": 800.0,
+        "overspent_notified_at": None,
+        "threshold_notified_at": datetime.datetime.now(),
+        "last_notified_spending": 820.0,
+        "spent": 900.0,
+    }
+
+    with patch("utils.budget_notifier.budgets_utils.get_budget", new=AsyncMock(return_value=budget)) as get_mock, \
+         patch("utils.budget_notifier.excel.get_month_expenses", new=AsyncMock()) as month_mock, \
+         patch("utils.budget_notifier.notification_outbox.add_notifications", new=AsyncMock()) as send_mock, \
+         patch("utils.budget_notifier.db.transaction", new=_transaction):
+        await budget_notifier.check_user_budget_now(AsyncMock(), 123)
+
+    get_mock.assert_awaited_once()
+    month_mock.assert_not_called()
+    send_mock.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_check_user_budget_now_writes_own_source():
+    """Немедленная проверка пишет со своим source: проход планировщика её не задерживает."""
+    budget = {
+        "id": 5,
+        "user_id": "123",
+        "project_id": None,
+        "amount": 1000.0,
+        "notify_enabled": True,
+        "notify_threshold": 800.0,
+        "overspent_notified_at": None,
+        "threshold_notified_at": None,
+        "last_notified_spending": None,
+        "spent": 900.0,
+    }
+
+    with patch("utils.budget_notifier.budgets_utils.get_budget", new=AsyncMock(return_value=budget)), \
+         patch("utils.budget_notifier.notification_outbox.add_notifications", new=AsyncMock()) as send_mock, \
+         patch("utils.budget_notifier.db.transaction", new=_transaction), \
+         patch("utils.budget_notifier.budgets_utils.update_notification_state", new=AsyncMock()), \
+         patch("utils.budget_notifier.notification_outbox.wake_drainer"):
+        await budget_notifier.check_user_budget_now(AsyncMock(), 123)
+
+    send_mock.assert_awaited_once()
+    assert send_mock.await_args.kwargs["source"] == "budget_now"
+
+
+@pytest.mark.asyncio
+async def test_update_notification_state_reraises_inside_callers_transaction():
+    """На соединении транзакции ошибка пробрасывается, без него — только логируется."""
+    from utils import budgets
+
+    conn = AsyncMock()
+    conn.execute.side_effect = RuntimeError("boom")
+    with pytest.raises(RuntimeError):
+        await budgets.update_notification_state(1, last_notified_spending=10, conn=conn)
+
+    with patch("utils.budgets.db.execute", new=AsyncMock(side_effect=RuntimeError("boom"))):
+        await budgets.update_notification_state(1, last_notified_spending=10)
+
+
+@pytest.mark.asyncio
+async def test_check_budget_notifications_runs_as_notification_pass():
+    """Проход планировщика держит строки "budget" в outbox до конца и будит drainer после."""
+    from utils import notification_outbox
+
+    seen = []
+
+    async def fetch_budgets(month, year):
+        seen.append(dict(notification_outbox._passes_running))
+        return []
+
+    with patch("utils.budget_notifier.budgets_utils.get_all_active_budgets_with_notifications",
+               new=AsyncMock(side_effect=fetch_budgets)), \
+         patch("utils.notification_outbox.wake_drainer") as wake_mock:
+        await budget_notifier.check_budget_notifications(bot=None)
+
+    assert seen == [{"budget": 1}]
+    assert notification_outbox._passes_running == {}
+    wake_mock.assert_called_once()
@@ -0,0 +1,103 @@
+"""Тесты для utils/categories.py (кэш категорий)"""
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+import config
+from utils import categories
+
+
+def _row(category_id, name, is_system=False, project_id=None):
+    return {
+        "category_id": category_id,
+        "name": name,
+        "is_system": is_system,
+        "is_active": True,
+        "project_id": project_id,
+        "created_at": None,
+        "user_id": "1",
+    }
+
+
+@pytest.fixture(autouse=True)
+def clear_categories_cache():
+    categories.invalidate_categories_cache()
+    yield
+    categories.invalidate_categories_cache()
+
+
+@pytest.mark.asyncio
+async def test_get_category_by_name_served_from_cache():
+    """Повторный поиск по имени не обращается к БД."""
+    rows = [_row(1, "Продукты", True), _row(2, "Кофе")]
+    with patch("utils.categories.db.fetch_named", new=AsyncMock(return_value=rows)) as fetch_mock:
+        first = await categories.get_category_by_name(1, "продукты")
+        second = await categories.get_category_by_name(1, "КОФЕ")
+        missing = await categories.get_category_by_name(1, "такси")
+
+    assert first["category_id"] == 1
+    assert second["category_id"] == 2
+    assert missing is None
+    fetch_mock.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_get_categories_by_names_loads_scope_once():
+    """Поиск нескольких категорий выполняет одну загрузку."""
+    rows = [_row(1, "Продукты", True), _row(2, "Кофе")]
+    with patch("utils.categories.db.fetch_named", new=AsyncMock(return_value=rows)) as fetch_mock:
+        found = await categories.get_categories_by_names(1, ["продукты", "Кофе", "такси"])
+
+    assert {name: c["category_id"] for name, c in found.items()} == {"продукты": 1, "кофе": 2}
+    fetch_mock.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_create_category_invalidates_cache():
+    """Создание категории сбрасывает закэшированный список."""
+    with patch("utils.categories.db.fetch_named", new=AsyncMock(side_effect=[
+             [_row(1, "Продукты", True)],
+             [_row(1, "Продукты", True), _row(3, "Такси")],
+         ])) as fetch_mock, \
+         patch("utils.categories.db.execute_named", new=AsyncMock()), \
+         patch("utils.categories.db.fetchrow", new=AsyncMock(return_value=None)), \
+         patch("utils.categories.db.fetchval", new=AsyncMock(return_value=3)):
+        assert await categories.get_category_by_name(1, "такси") is None
+        result = await categories.create_category(1, "Такси")
+        found = await categories.get_category_by_name(1, "такси")
+
+    assert result["success"] is True
+    assert found["category_id"] == 3
+    assert fetch_mock.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_ensure_system_categories_skips_db_when_all_present():
+    """Если все системные категории уже есть, вставки не выполняются."""
+    rows = [_row(i, name, True) for i, name in enumerate(config.DEFAULT_CATEGORIES)]
+    with patch("utils.categories.db.fetch_named", new=AsyncMock(return_value=rows)), \
+         patch("utils.categories.db.execute_named", new=AsyncMock()) as execute_mock, \
+         patch("utils.categories.db.fetchrow_named", new=AsyncMock()) as provision_mock:
+        await categories.ensure_system_categories_exist(1)
+
+    execute_mock.assert_not_called()
+    provision_mock.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_ensure_system_categories_provisions_in_single_query():
+    """Недостающие системные категории вставляются одним запросом, кэш сбрасывается."""
+    with patch("utils.categories.db.fetch_named", new=AsyncMock(return_value=[])) as fetch_mock, \
+         patch("utils.categories.db.execute_named", new=AsyncMock()), \
+         patch("utils.categories.db.fetchrow_named",
+               new=AsyncMock(return_value={"inserted": 20, "reactivated": 0})) as provision_mock:
+        await categories.ensure_system_categories_exist(1)
+        await categories.get_categories_for_user_project(1)
+
+    provision_mock.assert_awaited_once()
+    name, user_id, names = provision_mock.await_args.args
+    assert name == categories.queries.PROVISION_SYSTEM_CATEGORIES
+    assert user_id == "1"
+    assert names == list(config.DEFAULT_CATEGORIES.keys())
+    # Первое чтение — проверка в ensure, второе — после сброса кэша
+    assert fetch_mock.await_count == 2
@@ -0,0 +1,147 @@
+"""
+Тесты для utils/db.py (каталог подготовленных запросов)
+"""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import asyncpg
+import pytest
+
+from utils import db, queries
+
+
+class _FakeAcquire:
+    """Контекстный менеджер, имитирующий pool.acquire()"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def __aenter__(self):
+        return self.conn
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def _pool_with(conn):
+    pool = MagicMock()
+    pool.acquire.return_value = _FakeAcquire(conn)
+    return pool
+
+
+def test_catalog_names_are_unique_and_have_sql():
+    """Каждое имя в каталоге связано с непустым текстом запроса."""
+    names = [getattr(queries, c) for c in dir(queries) if c.isupper() and c != "STATEMENTS"]
+    assert len(names) == len(set(names))
+    assert set(names) == set(queries.STATEMENTS)
+    assert all(sql.strip() for sql in queries.STATEMENTS.values())
+
+
+@pytest.mark.asyncio
+async def test_fetchrow_named_uses_prepared_statement():
+    """fetchrow_named выполняет подготовленный запрос по имени."""
+    statement = MagicMock()
+    statement.fetchrow = AsyncMock(return_value={"role": "owner"})
+    conn = MagicMock()
+    conn.get_prepared = AsyncMock(return_value=statement)
+
+    with patch("utils.db._pool", _pool_with(conn)):
+        row = await db.fetchrow_named(queries.GET_USER_ROLE_IN_PROJECT, "1", 2)
+
+    assert row == {"role": "owner"}
+    conn.get_prepared.assert_awaited_once_with(queries.GET_USER_ROLE_IN_PROJECT)
+    statement.fetchrow.assert_awaited_once_with("1", 2)
+
+
+@pytest.mark.asyncio
+async def test_fetchval_named_logs_and_reraises_errors():
+    """Ошибка fetchval_named логируется с именем запроса и пробрасывается дальше."""
+    statement = MagicMock()
+    statement.fetchval = AsyncMock(side_effect=RuntimeError("boom"))
+    conn = MagicMock()
+    conn.get_prepared = AsyncMock(return_value=statement)
+
+    with patch("utils.db._pool", _pool_with(conn)), \
+         patch("utils.db.log_error") as log_error_mock:
+        with pytest.raises(RuntimeError):
+            await db.fetchval_named(queries.IS_PROJECT_MEMBER, "1", 2, request_id="r1")
+
+    _, error, event = log_error_mock.call_args.args
+    assert str(error) == "boom" and event == "db_fetch_error"
+    assert log_error_mock.call_args.kwargs["statement"] == queries.IS_PROJECT_MEMBER
+    assert log_error_mock.call_args.kwargs["request_id"] == "r1"
+
+
+@pytest.mark.asyncio
+async def test_named_statement_is_reprepared_after_invalidation():
+    """После InvalidCachedStatementError запрос готовится заново и повторяется."""
+    stale = MagicMock()
+    stale.fetchval = AsyncMock(side_effect=asyncpg.exceptions.InvalidCachedStatementError("stale"))
+    fresh = MagicMock()
+    fresh.fetchval = AsyncMock(return_value=5)
+    conn = MagicMock()
+    conn.get_prepared = AsyncMock(side_effect=[stale, fresh])
+
+    with patch("utils.db._pool", _pool_with(conn)):
+        value = await db.fetchval_named(queries.IS_PROJECT_MEMBER, "1", 2)
+
+    assert value == 5
+    assert conn.get_prepared.await_args_list[1].kwargs == {"refresh": True}
+
+
+@pytest.mark.asyncio
+async def test_queries_are_counted_per_update_context():
+    """Обёртки db считают обращения к БД в счётчике текущего update."""
+    statement = MagicMock()
+    statement.fetchval = AsyncMock(return_value=1)
+    conn = MagicMock()
+    conn.get_prepared = AsyncMock(return_value=statement)
+    pool = _pool_with(conn)
+    pool.fetchrow = AsyncMock(return_value=None)
+
+    assert db.current_query_stats() is None
+    with patch("utils.db._pool", pool):
+        await db.fetchval_named(queries.IS_PROJECT_MEMBER, "1", 2)  # вне update — не считается
+        stats = db.begin_query_stats()
+        await db.fetchval_named(queries.IS_PROJECT_MEMBER, "1", 2)
+        await db.fetchrow("SELECT 1")
+
+    assert stats.count == 2
+    assert stats.duration >= 0
+
+
+@pytest.mark.asyncio
+async def test_transaction_queries_are_counted():
+    """Запросы на соединении db.transaction() тоже попадают в счётчик update."""
+    conn = MagicMock()
+    conn.transaction.return_value = _FakeAcquire(conn)
+    conn.execute = AsyncMock()
+    conn.executemany = AsyncMock()
+    conn.fetchrow = AsyncMock(return_value=None)
+
+    with patch("utils.db._pool", _pool_with(conn)):
+        stats = db.begin_query_stats()
+        async with db.transaction() as tx:
+            await tx.execute("UPDATE budgets SET spent = $1", 10)
+            await tx.executemany("INSERT INTO t VALUES ($1)", [(1,), (2,)])
+            await tx.fetchrow("SELECT 1")
+            assert tx.transaction is conn.transaction
+
+    assert stats.count == 3
+    conn.execute.assert_awaited_once_with("UPDATE budgets SET spent = $1", 10)
+
+
+@pytest.mark.asyncio
+async def test_executemany_named_runs_in_one_transaction():
+    """executemany_named отправляет все строки одним вызовом внутри транзакции."""
+    statement = MagicMock()
+    statement.executemany = AsyncMock()
+    conn = MagicMock()
+    conn.get_prepared = AsyncMock(return_value=statement)
+    conn.transaction.return_value = _FakeAcquire(conn)
+    rows = [("1", None, 10.0), ("1", None, 20.0)]
+
+    with patch("utils.db._pool", _pool_with(conn)):
+        await db.executemany_named(queries.INSERT_EXPENSE, iter(rows))
+
+    conn.transaction.assert_called_once()
+    statement.executemany.assert_awaited_once_with(rows)
@@ -51,6 +51,35 @@ def test_parse_add_command_invalid_amount():
     assert result is None
 
 
+def test_parse_add_command_multiline_description():
+    """Сумма и категория — из первой строки, следующие строки продолжают описание"""
+    result = helpers.parse_add_command("500 еда обед\nс коллегами")
+    assert result == {'amount': 500.0, 'category': "еда", 'description': "обед\nс коллегами"}
+
+    result = helpers.parse_add_command("500 еда\nобед с коллегами")
+    assert result == {'amount': 500.0, 'category': "еда", 'description': "обед с коллегами"}
+
+    assert helpers.parse_add_command("еда\n500 обед") is None
+
+
+def test_parse_expense_lines_multiple():
+    """Тест парсинга нескольких расходов, по одному на строку"""
+    result = helpers.parse_expense_lines("350 продукты хлеб\n\n120 транспорт")
+
+    assert [e['amount'] for e in result] == [350.0, 120.0]
+    assert [e['category'] for e in result] == ["продукты", "транспорт"]
+
+
+def test_parse_expense_lines_single_line():
+    """Одна строка не считается пакетом"""
+    assert helpers.parse_expense_lines("350 продукты") is None
+
+
+def test_parse_expense_lines_invalid_line():
+    """Если хотя бы одна строка не распознана, пакет не принимается"""
+    assert helpers.parse_expense_lines("350 продукты\nпросто текст") is None
+
+
 @pytest.mark.asyncio
 async def test_cancel_conversation_basic():
     """Тест базовой отмены conversation"""
@@ -59,3 +59,17 @@ async def test_deactivate_income_category_blocked_by_active_recurring():
 
     assert result["success"] is False
     assert "постоянного дохода" in result["message"].lower()
+
+
+@pytest.mark.asyncio
+async def test_ensure_system_income_categories_single_bulk_query():
+    """Системные категории доходов создаются одним запросом вместо цикла."""
+    with patch("utils.income_categories.db.execute_named", new=AsyncMock()), \
+         patch("utils.income_categories.db.fetchrow_named",
+               new=AsyncMock(return_value={"inserted": 3, "reactivated": 1})) as provision_mock, \
+         patch("utils.income_categories.create_income_category", new=AsyncMock()) as create_mock:
+        await income_categories.ensure_system_income_categories_exist(1)
+
+    provision_mock.assert_awaited_once()
+    assert provision_mock.await_args.args[0] == income_categories.queries.PROVISION_SYSTEM_INCOME_CATEGORIES
+    create_mock.assert_not_called()
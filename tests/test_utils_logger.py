@@ -0,0 +1,259 @@
+"""
+Тесты для utils/logger.py
+"""
+import io
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+
+from metrics import LOG_RECORDS_DROPPED_TOTAL
+from utils.logger import DroppingQueueHandler, StructuredFormatter, log_event
+
+
+def _make_logger(name, handler):
+    logger = logging.getLogger(name)
+    logger.handlers = [handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger
+
+
+class _ThreadRecordingHandler(logging.StreamHandler):
+    """StreamHandler, запоминающий поток, в котором выполнялся вывод"""
+
+    def __init__(self, stream):
+        super().__init__(stream)
+        self.threads = set()
+
+    def emit(self, record):
+        self.threads.add(threading.current_thread().name)
+        super().emit(record)
+
+
+def test_records_are_formatted_on_listener_thread():
+    """Форматирование и запись выполняются в фоновом потоке, а не в вызывающем."""
+    stream = io.StringIO()
+    target = _ThreadRecordingHandler(stream)
+    target.setFormatter(StructuredFormatter(json_format=True))
+    log_queue = queue.Queue(maxsize=10)
+    handler = DroppingQueueHandler(log_queue, target)
+    listener = logging.handlers.QueueListener(log_queue, target)
+    listener.start()
+    handler.listening = True
+
+    logger = _make_logger("tests.logger.listener", handler)
+    log_event(logger, "expense_added", user_id=1)
+    listener.stop()
+
+    payload = json.loads(stream.getvalue().strip())
+    assert payload["event"] == "expense_added"
+    assert payload["user_id"] == 1
+    assert threading.current_thread().name not in target.threads
+
+
+def test_full_queue_drops_records_and_counts_them():
+    """При переполнении очереди запись отбрасывается и попадает в метрику."""
+    target = logging.StreamHandler(io.StringIO())
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1), target)
+    handler.listening = True
+    logger = _make_logger("tests.logger.drop", handler)
+
+    before = LOG_RECORDS_DROPPED_TOTAL.labels(level="INFO")._value.get()
+    log_event(logger, "first")
+    log_event(logger, "second")
+    after = LOG_RECORDS_DROPPED_TOTAL.labels(level="INFO")._value.get()
+
+    assert handler.queue.qsize() == 1
+    assert after - before == 1
+
+
+def test_records_are_written_synchronously_when_not_listening():
+    """Без запущенного слушателя (после shutdown) записи не теряются."""
+    stream = io.StringIO()
+    target = logging.StreamHandler(stream)
+    target.setFormatter(StructuredFormatter(json_format=True))
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1), target)
+    logger = _make_logger("tests.logger.sync", handler)
+
+    log_event(logger, "bot_stopped")
+
+    assert json.loads(stream.getvalue().strip())["event"] == "bot_stopped"
+    assert handler.queue.empty()
+
+
+def _record(**extra):
+    return logging.getLogger("tests.logger.format").makeRecord(
+        "handlers.expense", logging.INFO, __file__, 0, "", (), None, extra=extra
+    )
+
+
+def test_formatter_keeps_only_extra_fields():
+    """В JSON попадают только поля extra (без стандартных атрибутов LogRecord и None)."""
+    from utils.logger import stdlib_json_dumps
+
+    record = _record(event="expense_added", user_id=1, project_id=None, amount=10.5)
+    payload = json.loads(StructuredFormatter(True, json_dumps=stdlib_json_dumps).format(record))
+
+    assert set(payload) == {"timestamp", "level", "service", "event", "user_id", "amount"}
+    assert payload["service"] == "handlers.expense"
+
+
+def test_json_backends_produce_same_payload():
+    """Выбранный по умолчанию encoder даёт тот же результат, что и stdlib json."""
+    import datetime
+    from utils.logger import stdlib_json_dumps
+
+    record = _record(event="e", when=datetime.date(2026, 1, 2), names={1: "продукты"}, big=2 ** 70)
+    default = json.loads(StructuredFormatter(True).format(record))
+    stdlib = json.loads(StructuredFormatter(True, json_dumps=stdlib_json_dumps).format(record))
+
+    assert default == stdlib
+
+
+def test_readable_format_puts_priority_fields_first():
+    """Читаемый формат выводит приоритетные поля перед остальными."""
+    record = _record(event="e", amount=5, status="success", user_id=7)
+    line = StructuredFormatter(False).format(record)
+
+    assert line.index("user_id=7") < line.index("status=success") < line.index("amount=5")
+
+
+def test_log_event_skips_disabled_level_without_building_record():
+    """Если уровень отключён, запись не создаётся."""
+    from unittest.mock import MagicMock
+
+    logger = MagicMock(spec=logging.Logger)
+    logger.isEnabledFor.return_value = False
+
+    log_event(logger, "permission_check_debug", level=logging.DEBUG, user_id=1)
+
+    logger.log.assert_not_called()
+
+
+def test_sampled_event_is_suppressed_and_counted():
+    """Событие с sample_rate=0 подавляется и учитывается в метрике."""
+    from metrics import LOG_EVENTS_SUPPRESSED_TOTAL
+    from utils.logger import configure_event_limits
+
+    stream = io.StringIO()
+    target = logging.StreamHandler(stream)
+    target.setFormatter(StructuredFormatter(json_format=True))
+    logger = _make_logger("tests.logger.sampled", DroppingQueueHandler(queue.Queue(), target))
+
+    configure_event_limits({"noisy_event": {"sample_rate": 0.0}})
+    try:
+        counter = LOG_EVENTS_SUPPRESSED_TOTAL.labels(event="noisy_event", reason="sampled")
+        before = counter._value.get()
+        log_event(logger, "noisy_event")
+        log_event(logger, "other_event")
+        after = counter._value.get()
+    finally:
+        configure_event_limits()
+
+    lines = stream.getvalue().strip().splitlines()
+    assert [json.loads(line)["event"] for line in lines] == ["other_event"]
+    assert after - before == 1
+
+
+def test_event_limit_caps_events_per_second():
+    """max_per_second ограничивает число событий в пределах одной секунды."""
+    from unittest.mock import patch
+    from utils.logger import EventLimit
+
+    limit = EventLimit(max_per_second=2)
+    with patch("utils.logger.time.monotonic", return_value=100.0):
+        results = [limit.check() for _ in range(4)]
+    with patch("utils.logger.time.monotonic", return_value=101.0):
+        results.append(limit.check())
+
+    assert results == [None, None, "rate_limited", "rate_limited", None]
+
+
+def _observed(operation, status):
+    from metrics import OPERATION_DURATION_SECONDS
+    return OPERATION_DURATION_SECONDS.labels(operation=operation, status=status)._sum.get()
+
+
+def test_measure_time_decorator_records_histogram_and_status():
+    """Декоратор пишет длительность в гистограмму с итоговым статусом вызова."""
+    import pytest
+    from unittest.mock import patch
+    from utils.logger import measure_time
+
+    @measure_time("tests_sync_op")
+    def succeed():
+        return 42
+
+    @measure_time("tests_sync_op")
+    def fail():
+        raise ValueError("boom")
+
+    with patch("utils.logger.time.perf_counter", side_effect=[10.0, 10.5, 20.0, 20.25]):
+        assert succeed() == 42
+        with pytest.raises(ValueError):
+            fail()
+
+    assert _observed("tests_sync_op", "success") == 0.5
+    assert _observed("tests_sync_op", "error") == 0.25
+
+
+def test_measure_time_bare_decorator_uses_qualname():
+    """Без аргументов имя операции берётся из module.qualname функции."""
+    from utils.logger import measure_time
+
+    @measure_time
+    def render():
+        return "ok"
+
+    assert render() == "ok"
+    assert render.__name__ == "render"
+    assert _observed(f"{__name__}.test_measure_time_bare_decorator_uses_qualname.<locals>.render",
+                     "success") > 0
+
+
+def test_measure_time_async_context_logs_slow_operation():
+    """Контекстный менеджер внутри корутины логирует медленную операцию и отдаёт duration."""
+    import asyncio
+    from unittest.mock import MagicMock, patch
+    from utils.logger import measure_time
+
+    logger = MagicMock(spec=logging.Logger)
+
+    async def handler():
+        with measure_time("tests_slow_op", logger=logger, slow_threshold=1.0, user_id=7) as timer:
+            await asyncio.sleep(0)
+            timer.status = "error"
+        return timer
+
+    with patch("utils.logger.time.perf_counter", side_effect=[0.0, 3.0]), \
+         patch("utils.logger.log_performance") as perf_mock:
+        timer = asyncio.run(handler())
+
+    assert timer.duration == 3.0
+    perf_mock.assert_called_once_with(logger, "tests_slow_op", 3.0, status="error",
+                                      slow=True, slow_threshold=1.0, user_id=7)
+
+
+def test_measure_time_current_exposes_decorator_timer():
+    """Внутри функции под декоратором measure_time.current() — её таймер; ошибку можно отметить без исключения."""
+    import asyncio
+    from utils.logger import measure_time
+
+    seen = []
+
+    @measure_time("tests_current_op")
+    async def handler():
+        timer = measure_time.current()
+        with measure_time("tests_current_inner"):
+            seen.append(measure_time.current().operation)
+        seen.append(timer.operation)
+        timer.status = "error"
+
+    before = _observed("tests_current_op", "error")
+    asyncio.run(handler())
+
+    assert seen == ["tests_current_inner", "tests_current_op"]
+    assert measure_time.current() is None
+    assert _observed("tests_current_op", "error") > before
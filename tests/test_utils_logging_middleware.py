@@ -0,0 +1,54 @@
+"""
+Тесты для utils/logging_middleware.py (итоги update по БД)
+"""
+import logging
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from metrics import UPDATE_DB_QUERIES, current_handler
+from utils import db
+from utils.logging_middleware import log_update_stats
+
+
+def _update_and_context():
+    update = MagicMock()
+    update.effective_user.id = 1
+    context = MagicMock()
+    context.user_data = {"request_id": "req-1"}
+    return update, context
+
+
+@pytest.mark.asyncio
+async def test_update_stats_observed_per_handler_and_warns_on_many_queries():
+    """Число запросов пишется в гистограмму обработчика; при превышении порога — WARNING."""
+    update, context = _update_and_context()
+    stats = db.begin_query_stats()
+    stats.count, stats.duration = 25, 0.3
+    current_handler.set("tests_budget_handler")
+    histogram = UPDATE_DB_QUERIES.labels(handler="tests_budget_handler")
+    before = histogram._sum.get()
+
+    with patch("utils.logging_middleware.config.UPDATE_DB_QUERY_WARNING_THRESHOLD", 15), \
+         patch("utils.logging_middleware.log_event") as log_mock:
+        await log_update_stats(update, context)
+
+    assert histogram._sum.get() - before == 25
+    kwargs = log_mock.call_args.kwargs
+    assert kwargs["level"] == logging.WARNING
+    assert kwargs["db_queries"] == 25
+    assert kwargs["handler"] == "tests_budget_handler"
+    assert kwargs["request_id"] == "req-1"
+
+
+@pytest.mark.asyncio
+async def test_update_stats_below_threshold_logged_at_debug():
+    """Обычный update логируется на уровне DEBUG."""
+    update, context = _update_and_context()
+    db.begin_query_stats().count = 2
+
+    with patch("utils.logging_middleware.log_event") as log_mock:
+        await log_update_stats(update, context)
+
+    assert log_mock.call_args.kwargs["level"] == logging.DEBUG
+    assert log_mock.call_args.kwargs["handler"] == "unhandled"
@@ -0,0 +1,147 @@
+"""
+Тесты для utils/notification_outbox.py
+"""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from utils import notification_outbox
+
+
+@pytest.mark.asyncio
+async def test_add_notifications_inserts_rows_on_callers_connection():
+    """Уведомления пишутся одним executemany на соединении транзакции вызывающего."""
+    conn = MagicMock()
+    conn.executemany = AsyncMock()
+
+    await notification_outbox.add_notifications(conn, [("1", "a"), (2, "b")], source="budget")
+    await notification_outbox.add_notifications(conn, [], source="budget")
+
+    conn.executemany.assert_awaited_once()
+    assert conn.executemany.await_args.args[1] == [(1, "a", "budget"), (2, "b", "budget")]
+
+
+@pytest.mark.asyncio
+async def test_drain_outbox_deletes_delivered_and_postpones_failed():
+    """Доставленные строки удаляются, неудачные откладываются до повтора."""
+    rows = [
+        {"id": 1, "chat_id": 10, "text": "ok", "source": "budget"},
+        {"id": 2, "chat_id": 20, "text": "blocked", "source": "budget"},
+    ]
+
+    with patch("utils.notification_outbox.db.fetch", new=AsyncMock(side_effect=[rows, []])) as fetch_mock, \
+         patch("utils.notification_outbox.db.execute", new=AsyncMock()) as execute_mock, \
+         patch("utils.notification_outbox.deliver_notification",
+               new=AsyncMock(side_effect=[True, False])) as deliver_mock:
+        delivered = await notification_outbox.drain_outbox(bot=object(), batch_size=2)
+
+    assert delivered == 1
+    assert deliver_mock.await_count == 2
+    # Полная пачка — drainer проверяет, не осталось ли ещё строк
+    assert fetch_mock.await_count == 2
+    delete_call, retry_call = execute_mock.await_args_list
+    assert "DELETE" in delete_call.args[0] and delete_call.args[1] == [1]
+    assert "attempts = attempts + 1" in retry_call.args[0] and retry_call.args[1] == [2]
+
+
+def test_build_digests_groups_messages_per_chat():
+    """Уведомления одного чата собираются в одно сообщение в порядке записи."""
+    rows = [
+        {"id": 3, "chat_id": 1, "text": "бюджет", "source": "budget"},
+        {"id": 1, "chat_id": 1, "text": "подписка 1", "source": "recurring_expense"},
+        {"id": 2, "chat_id": 2, "text": "доход", "source": "recurring_income"},
+    ]
+
+    digests = notification_outbox._build_digests(rows)
+
+    assert digests == [
+        (1, "🔔 Уведомлений: 2\n\nподписка 1\n\nбюджет", "digest", [1, 3]),
+        (2, "доход", "recurring_income", [2]),
+    ]
+
+
+def test_build_digests_splits_at_telegram_limit():
+    """Дайджест длиннее лимита Telegram делится на несколько сообщений."""
+    rows = [{"id": i, "chat_id": 1, "text": "x" * 1500, "source": "recurring_expense"} for i in range(5)]
+
+    digests = notification_outbox._build_digests(rows)
+
+    assert [d[3] for d in digests] == [[0, 1], [2, 3], [4]]
+    assert all(len(d[1]) <= 4096 for d in digests)
+
+
+def test_build_digests_truncates_single_oversized_text():
+    """Одно уведомление длиннее лимита обрезается, а не отправляется до исчерпания попыток."""
+    rows = [
+        {"id": 1, "chat_id": 1, "text": "x" * 5000, "source": "recurring_expense"},
+        {"id": 2, "chat_id": 1, "text": "короткое", "source": "recurring_expense"},
+    ]
+
+    digests = notification_outbox._build_digests(rows)
+
+    assert [d[3] for d in digests] == [[1], [2]]
+    assert len(digests[0][1]) == 4096 and digests[0][1].endswith("…")
+    assert digests[1][1] == "короткое"
+
+
+@pytest.mark.asyncio
+async def test_notification_pass_holds_drainer_until_done():
+    """Во время прохода планировщика drainer не забирает строки его источника, после — будится."""
+    with patch("utils.notification_outbox.wake_drainer") as wake_mock:
+        async with notification_outbox.notification_pass("budget"):
+            assert notification_outbox._passes_running == {"budget": 1}
+            wake_mock.assert_not_called()
+
+    assert notification_outbox._passes_running == {}
+    wake_mock.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_drain_outbox_skips_only_sources_of_running_pass():
+    """Проход планировщика держит только свои строки, остальные источники доставляются сразу."""
+    with patch("utils.notification_outbox.db.fetch", new=AsyncMock(return_value=[])) as fetch_mock, \
+         patch("utils.notification_outbox.wake_drainer"):
+        async with notification_outbox.notification_pass("budget"):
+            await notification_outbox.drain_outbox(bot=object(), batch_size=10)
+        await notification_outbox.drain_outbox(bot=object(), batch_size=10)
+
+    held, released = fetch_mock.await_args_list
+    assert "source <> ALL($4::text[])" in held.args[0]
+    assert held.args[4] == ["budget"]
+    assert released.args[4] == []
+
+
+@pytest.mark.asyncio
+async def test_stop_drainer_finishes_current_batch():
+    """Остановка дожидается доставки выданной пачки и удаляет её строки, новых пачек не берёт."""
+    import asyncio
+
+    rows = [{"id": 1, "chat_id": 10, "text": "ok", "source": "budget"}]
+    claimed = asyncio.Event()
+    release = asyncio.Event()
+
+    async def fetch(*args):
+        claimed.set()
+        return rows
+
+    async def deliver(*args, **kwargs):
+        await release.wait()
+        return True
+
+    with patch("utils.notification_outbox.db.fetch", new=AsyncMock(side_effect=fetch)) as fetch_mock, \
+         patch("utils.notification_outbox.db.execute", new=AsyncMock()) as execute_mock, \
+         patch("utils.notification_outbox.deliver_notification", new=AsyncMock(side_effect=deliver)), \
+         patch("utils.notification_outbox.config.NOTIFY_OUTBOX_BATCH_SIZE", 1):
+        notification_outbox.start_outbox_drainer(bot=object())
+        await claimed.wait()
+        stop = asyncio.create_task(notification_outbox.stop_outbox_drainer(timeout=5))
+        await asyncio.sleep(0.01)
+        assert not stop.done()
+        release.set()
+        await stop
+
+    # Пачка полная — без остановки drainer сразу взял бы следующую
+    assert fetch_mock.await_count == 1
+    delete_call, = execute_mock.await_args_list
+    assert "DELETE" in delete_call.args[0] and delete_call.args[1] == [1]
+    assert notification_outbox._drainer_task is None
@@ -0,0 +1,155 @@
+"""
+Тесты для utils/notification_queue.py
+"""
+from unittest.mock import AsyncMock
+
+import pytest
+from prometheus_client import REGISTRY
+from telegram.error import Forbidden, NetworkError, RetryAfter
+
+from utils import notification_queue
+from utils.notification_queue import NotificationQueue, TokenBucket
+
+
+def _sample(name, labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_token_bucket_reserves_delays_in_order():
+    """После исчерпания пачки задержки растут на 1/rate для каждого следующего вызова."""
+    bucket = TokenBucket(rate=2.0, capacity=2)
+
+    assert [bucket.reserve(0.0) for _ in range(4)] == [0.0, 0.0, 0.5, 1.0]
+    assert bucket.reserve(10.0) == 0.0
+    assert bucket.idle(20.0) is True
+
+
+@pytest.mark.asyncio
+async def test_queue_retries_after_flood_control():
+    """RetryAfter приостанавливает отправку, затем сообщение доставляется."""
+    bot = AsyncMock()
+    bot.send_message.side_effect = [RetryAfter(0), None]
+    queue = NotificationQueue(bot, senders=2, global_rate=1000, chat_rate=1000, chat_burst=10)
+    before = _sample("notifications_sent_total", {"source": "tests_retry"})
+
+    queue.start()
+    assert queue.enqueue(1, "hello", source="tests_retry") is True
+    await queue.stop(timeout=5)
+
+    assert bot.send_message.await_count == 2
+    assert _sample("notifications_sent_total", {"source": "tests_retry"}) == before + 1
+    assert _sample("notification_retries_total", {"source": "tests_retry", "reason": "RetryAfter"}) == 1
+
+
+@pytest.mark.asyncio
+async def test_queue_does_not_retry_blocked_chat():
+    """Если пользователь заблокировал бота, повтора нет — сообщение считается неудачным."""
+    bot = AsyncMock()
+    bot.send_message.side_effect = Forbidden("bot was blocked by the user")
+    queue = NotificationQueue(bot, senders=1, global_rate=1000, chat_rate=1000, chat_burst=10)
+
+    queue.start()
+    queue.enqueue(1, "hello", source="tests_blocked")
+    await queue.stop(timeout=5)
+
+    bot.send_message.assert_awaited_once()
+    assert _sample("notifications_failed_total", {"source": "tests_blocked", "error": "Forbidden"}) == 1
+
+
+@pytest.mark.asyncio
+async def test_network_retry_is_deferred_without_blocking_sender():
+    """Повтор после NetworkError ждёт таймером: единственный воркер тем временем отправляет другим чатам."""
+    import asyncio
+
+    bot = AsyncMock()
+    bot.send_message.side_effect = [NetworkError("timeout"), None, None]
+    queue = NotificationQueue(bot, senders=1, global_rate=1000, chat_rate=1000, chat_burst=10)
+
+    queue.start()
+    failing = queue.submit(1, "retry me", source="tests_network")
+    other = queue.submit(2, "other", source="tests_network")
+    assert await asyncio.wait_for(other, 0.5) is True
+    # Первая попытка отложена на 1 с (2 ** 0) и пока лежит в таймере
+    assert not failing.done()
+    assert queue.depth() == 1
+
+    assert await asyncio.wait_for(failing, 5) is True
+    await queue.stop(timeout=5)
+
+    sent_to = [call.kwargs["chat_id"] for call in bot.send_message.await_args_list]
+    assert sent_to == [1, 2, 1]
+    assert _sample("notification_retries_total", {"source": "tests_network", "reason": "NetworkError"}) == 1
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_chat_does_not_block_other_chats():
+    """Пачка в один чат откладывается по его лимиту, а сообщения другим чатам уходят сразу."""
+    import asyncio
+
+    bot = AsyncMock()
+    queue = NotificationQueue(bot, senders=2, global_rate=1000, chat_rate=1, chat_burst=1)
+
+    queue.start()
+    futures = [queue.submit(1, f"burst {i}", source="tests_burst") for i in range(3)]
+    other = queue.submit(2, "other", source="tests_burst")
+    assert await asyncio.wait_for(other, 0.5) is True
+
+    sent_to = [call.kwargs["chat_id"] for call in bot.send_message.await_args_list]
+    assert sent_to == [1, 2]
+    assert queue.depth() == 2
+
+    await queue.stop(timeout=0)
+    assert [f.result() for f in futures] == [True, False, False]
+    assert _sample("notifications_dropped_total", {"source": "tests_burst", "reason": "shutdown"}) == 2
+
+
+@pytest.mark.asyncio
+async def test_deferred_messages_keep_chat_order():
+    """Отложенные сообщения чата доставляются в порядке постановки, stop() их дожидается."""
+    bot = AsyncMock()
+    queue = NotificationQueue(bot, senders=3, global_rate=1000, chat_rate=50, chat_burst=1)
+
+    queue.start()
+    for i in range(4):
+        queue.enqueue(1, f"m{i}", source="tests_order")
+    await queue.stop(timeout=5)
+
+    assert [call.kwargs["text"] for call in bot.send_message.await_args_list] == ["m0", "m1", "m2", "m3"]
+    assert queue.depth() == 0
+
+
+@pytest.mark.asyncio
+async def test_queue_drops_when_full():
+    """Переполненная очередь отбрасывает сообщение и считает его."""
+    queue = NotificationQueue(AsyncMock(), maxsize=1)
+
+    assert queue.enqueue(1, "first", source="tests_full") is True
+    assert queue.enqueue(1, "second", source="tests_full") is False
+    assert _sample("notifications_dropped_total", {"source": "tests_full", "reason": "queue_full"}) == 1
+
+    await queue.stop(timeout=0)
+    assert _sample("notifications_dropped_total", {"source": "tests_full", "reason": "shutdown"}) == 1
+
+
+@pytest.mark.asyncio
+async def test_send_notification_goes_through_running_queue():
+    """Пока очередь запущена, фоновые задачи не ждут отправки."""
+    bot = AsyncMock()
+    notification_queue.start_notification_queue(bot)
+    try:
+        await notification_queue.send_notification(bot, 5, "text", source="tests_queue")
+        bot.send_message.assert_not_called()
+    finally:
+        await notification_queue.stop_notification_queue()
+
+    bot.send_message.assert_awaited_once_with(chat_id=5, text="text")
+
+
+@pytest.mark.asyncio
+async def test_send_notification_without_queue_sends_directly():
+    """Без запущенной очереди (скрипты, тесты) сообщение отправляется сразу."""
+    bot = AsyncMock()
+
+    await notification_queue.send_notification(bot, 5, "text", source="tests_direct", reply_markup=None)
+
+    bot.send_message.assert_awaited_once_with(chat_id=5, text="text", reply_markup=None)
@@ -0,0 +1,53 @@
+"""
+Тесты для utils/profiler.py
+"""
+import threading
+import time
+
+import pytest
+
+from utils import profiler
+
+
+def _busy_worker(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sampler_collects_collapsed_stacks_of_other_threads():
+    """Стеки рабочих потоков попадают в collapsed-вывод вместе с именем потока."""
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_worker, args=(stop,), name="tests-busy")
+    worker.start()
+    sampler = profiler.SamplingProfiler(interval=0.001)
+    sampler.start()
+    time.sleep(0.05)
+    sampler.stop()
+    stop.set()
+    worker.join()
+
+    collapsed = sampler.collapsed()
+    assert sampler.samples > 0
+    assert any(line.startswith("tests-busy;") and "_busy_worker" in line
+               for line in collapsed.splitlines())
+    assert "sampling-profiler" not in collapsed
+
+
+@pytest.mark.asyncio
+async def test_memory_diff_reports_allocations_during_interval():
+    """Diff tracemalloc показывает строки, выделившие память за интервал."""
+    import asyncio
+
+    holder = []
+
+    async def allocate():
+        await asyncio.sleep(0.01)
+        holder.append([bytearray(1024) for _ in range(200)])
+
+    task = asyncio.create_task(allocate())
+    report = await profiler.memory_diff(0.1, limit=50)
+    await task
+
+    assert report.startswith("tracemalloc diff")
+    assert "test_utils_profiler.py" in report
+    assert not profiler.is_running()
@@ -1,5 +1,6 @@
 """Тесты для utils/recurring_incomes.py"""
 
+import contextlib
 import datetime
 import pytest
 from unittest.mock import AsyncMock, patch
@@ -61,3 +62,40 @@ async def test_process_recurring_incomes_idempotent_same_day():
 
     # При already_created не должно быть вставки новой записи
     assert mock_execute.call_count == 0
+
+
+@pytest.mark.asyncio
+async def test_process_recurring_incomes_writes_notification_in_same_transaction():
+    """Доход, сдвиг next_run_at и уведомление пишутся одной транзакцией, без отправки в Telegram."""
+    rule = {
+        "id": 78,
+        "user_id": "1",
+        "amount": 500,
+        "income_category_id": 2,
+        "category_name": "Зарплата",
+        "comment": "Зарплата",
+        "project_id": None,
+        "frequency_type": "monthly",
+        "interval_value": None,
+        "weekday": None,
+        "day_of_month": None,
+        "is_last_day_of_month": False,
+    }
+    conn = AsyncMock()
+
+    @contextlib.asynccontextmanager
+    async def transaction():
+        yield conn
+
+    bot = AsyncMock()
+    with patch("utils.recurring_incomes.db.fetch", new=AsyncMock(return_value=[rule])), \
+         patch("utils.recurring_incomes.db.fetchval", new=AsyncMock(return_value=None)), \
+         patch("utils.recurring_incomes.db.transaction", new=transaction), \
+         patch("utils.recurring_incomes.notification_outbox.wake_drainer") as wake_mock:
+        await recurring_incomes.process_recurring_incomes(bot)
+
+    assert conn.execute.await_count == 2
+    conn.executemany.assert_awaited_once()
+    assert conn.executemany.await_args.args[1][0][0] == 1
+    bot.send_message.assert_not_called()
+    wake_mock.assert_called_once()
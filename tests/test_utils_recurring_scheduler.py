@@ -0,0 +1,70 @@
+"""
+Тесты для utils/recurring_scheduler.py
+"""
+import asyncio
+import datetime
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+import config
+from utils import recurring_scheduler
+
+
+NOW = datetime.datetime(2026, 5, 1, 12, 0, 0)
+
+
+def test_plan_deadline_sleeps_until_next_due():
+    """Без просроченных правил задача спит ровно до ближайшего next_run_at."""
+    next_due = NOW + datetime.timedelta(minutes=7)
+
+    assert recurring_scheduler._plan_deadline(NOW, next_due, False) == next_due
+
+
+def test_plan_deadline_without_rules_uses_max_sleep():
+    """Без активных правил — только редкая сверка с БД."""
+    expected = NOW + datetime.timedelta(seconds=config.RECURRING_SCHEDULER_MAX_SLEEP_SECONDS)
+
+    assert recurring_scheduler._plan_deadline(NOW, None, False) == expected
+
+
+def test_plan_deadline_retries_overdue_rules():
+    """Просроченные правила повторяются через RECURRING_SCHEDULER_RETRY_SECONDS, а не в цикле."""
+    next_due = NOW + datetime.timedelta(days=1)
+    expected = NOW + datetime.timedelta(seconds=config.RECURRING_SCHEDULER_RETRY_SECONDS)
+
+    assert recurring_scheduler._plan_deadline(NOW, next_due, True) == expected
+
+
+def test_reschedule_is_noop_without_running_scheduler():
+    """Без запущенного планировщика (скрипты, тесты) reschedule ничего не делает."""
+    recurring_scheduler.reschedule(NOW)
+
+    assert recurring_scheduler._armed_until is None
+
+
+@pytest.mark.asyncio
+async def test_reschedule_wakes_scheduler_for_earlier_rule():
+    """Новое правило со сроком раньше текущего будит планировщик без ожидания."""
+    far = datetime.timedelta(seconds=3600)
+    with patch("utils.recurring.process_recurring_expenses", new=AsyncMock()) as expenses_mock, \
+         patch("utils.recurring_incomes.process_recurring_incomes", new=AsyncMock()) as incomes_mock, \
+         patch("utils.recurring_scheduler._next_deadline",
+               new=AsyncMock(side_effect=lambda now: (now + far, False))) as deadline_mock:
+        recurring_scheduler.start_recurring_scheduler(bot=object())
+        try:
+            await asyncio.sleep(0.05)
+            assert expenses_mock.await_count == 1
+            assert deadline_mock.await_count == 1
+
+            # Более поздний срок не сдвигает сон
+            recurring_scheduler.reschedule(datetime.datetime.utcnow() + 2 * far)
+            await asyncio.sleep(0.05)
+            assert expenses_mock.await_count == 1
+
+            recurring_scheduler.reschedule(datetime.datetime.utcnow() + datetime.timedelta(milliseconds=50))
+            await asyncio.sleep(0.2)
+            assert expenses_mock.await_count == 2
+            assert incomes_mock.await_count == 2
+        finally:
+            await recurring_scheduler.stop_recurring_scheduler()
@@ -0,0 +1,72 @@
+"""
+Тесты для utils/runtime_monitor.py
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from prometheus_client import REGISTRY
+
+from metrics import EVENT_LOOP_LAG_SECONDS
+from utils import runtime_monitor
+
+
+def test_executor_counts_pending_and_active_jobs():
+    """Пул считает ожидающие и выполняющиеся задачи и обнуляет счётчики после завершения."""
+    executor = runtime_monitor.InstrumentedThreadPoolExecutor("tests_pool", max_workers=1)
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocker():
+        started.set()
+        release.wait(5)
+
+    first = executor.submit(blocker)
+    second = executor.submit(lambda: 1)
+    started.wait(5)
+
+    assert (executor.active, executor.pending) == (1, 1)
+    assert REGISTRY.get_sample_value("executor_pending_tasks", {"executor": "tests_pool"}) == 1
+
+    release.set()
+    assert second.result(5) == 1
+    first.result(5)
+    executor.shutdown()
+    assert (executor.active, executor.pending) == (0, 0)
+    assert REGISTRY.get_sample_value("executor_active_tasks", {"executor": "tests_pool"}) == 0
+
+
+@pytest.mark.asyncio
+async def test_monitor_reports_loop_blocked_by_sync_work():
+    """Синхронная работа в loop видна как задержка планирования."""
+    before = EVENT_LOOP_LAG_SECONDS._sum.get()
+    task = asyncio.create_task(runtime_monitor.monitor_event_loop(interval=0.01, warning_threshold=10))
+    await asyncio.sleep(0)
+    time.sleep(0.1)  # блокируем loop
+    await asyncio.sleep(0.05)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert EVENT_LOOP_LAG_SECONDS._sum.get() - before >= 0.05
+
+
+@pytest.mark.asyncio
+async def test_start_keeps_default_executor_and_uses_render_pool():
+    """Рендеринг идёт в отдельном пуле; executor по умолчанию не подменяется."""
+    loop = asyncio.get_running_loop()
+    default_before = loop._default_executor
+
+    runtime_monitor.start_runtime_monitors()
+    try:
+        executor = runtime_monitor.render_executor()
+        assert loop._default_executor is default_before
+        assert executor._thread_name_prefix == "render"
+        name = await loop.run_in_executor(executor, lambda: threading.current_thread().name)
+        assert name.startswith("render")
+    finally:
+        await runtime_monitor.stop_runtime_monitors()
+
+    assert runtime_monitor._render_executor is None
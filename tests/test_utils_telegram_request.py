@@ -0,0 +1,76 @@
+"""
+Тесты для utils/telegram_request.py
+"""
+import httpx
+import pytest
+from unittest.mock import AsyncMock, patch
+from telegram.error import BadRequest, RetryAfter
+from telegram.request import HTTPXRequest, RequestData
+from telegram.request._requestparameter import RequestParameter
+
+from metrics import (
+    TELEGRAM_API_ERRORS_TOTAL,
+    TELEGRAM_API_LATENCY_SECONDS,
+    TELEGRAM_API_PAYLOAD_BYTES,
+    TELEGRAM_API_RETRY_AFTER_TOTAL,
+)
+from utils.telegram_request import InstrumentedHTTPXRequest
+
+URL = "https://api.telegram.org/bot1:A/sendMessage"
+
+
+def _count(histogram):
+    return sum(bucket.get() for bucket in histogram._buckets)
+
+
+@pytest.mark.asyncio
+async def test_payload_size_is_measured_on_sent_body():
+    """Размер запроса берётся из тела, которое httpx действительно отправил."""
+    sent = []
+
+    def handler(http_request):
+        sent.append(len(http_request.content))
+        return httpx.Response(200, json={"ok": True, "result": True})
+
+    request = InstrumentedHTTPXRequest(httpx_kwargs={"transport": httpx.MockTransport(handler)})
+    payload = TELEGRAM_API_PAYLOAD_BYTES.labels(method="sendMessage")
+    before_sum, before_count = payload._sum.get(), _count(payload)
+    await request.initialize()
+    try:
+        data = RequestData([RequestParameter.from_input("chat_id", 1),
+                            RequestParameter.from_input("text", "привет")])
+        assert await request.post(URL, data) is True
+    finally:
+        await request.shutdown()
+
+    assert _count(payload) - before_count == 1
+    assert payload._sum.get() - before_sum == sent[0] > 0
+
+
+@pytest.mark.asyncio
+async def test_post_records_latency_by_method():
+    """Успешный вызов попадает в гистограмму по имени метода Bot API."""
+    request = InstrumentedHTTPXRequest()
+    latency = TELEGRAM_API_LATENCY_SECONDS.labels(method="sendMessage", status="success")
+    before = _count(latency)
+    with patch.object(HTTPXRequest, "post", new=AsyncMock(return_value={"ok": True})):
+        assert await request.post(URL, RequestData([])) == {"ok": True}
+
+    assert _count(latency) - before == 1
+
+
+@pytest.mark.asyncio
+async def test_post_counts_retry_after_and_error_class():
+    """RetryAfter и прочие ошибки Telegram учитываются и пробрасываются дальше."""
+    request = InstrumentedHTTPXRequest()
+    retry_before = TELEGRAM_API_RETRY_AFTER_TOTAL.labels(method="sendMessage")._value.get()
+    bad_before = TELEGRAM_API_ERRORS_TOTAL.labels(method="sendMessage", error="BadRequest")._value.get()
+
+    with patch.object(HTTPXRequest, "post", new=AsyncMock(side_effect=[RetryAfter(3), BadRequest("x")])):
+        with pytest.raises(RetryAfter):
+            await request.post(URL, RequestData([]))
+        with pytest.raises(BadRequest):
+            await request.post(URL, RequestData([]))
+
+    assert TELEGRAM_API_RETRY_AFTER_TOTAL.labels(method="sendMessage")._value.get() - retry_before == 1
+    assert TELEGRAM_API_ERRORS_TOTAL.labels(method="sendMessage", error="BadRequest")._value.get() - bad_before == 1
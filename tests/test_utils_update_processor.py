@@ -0,0 +1,62 @@
+"""
+Тесты для utils/update_processor.py
+"""
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+from telegram import Update
+
+from utils.update_processor import PerUserUpdateProcessor
+
+
+def _update(user_id):
+    update = MagicMock(spec=Update)
+    update.effective_user.id = user_id
+    return update
+
+
+@pytest.mark.asyncio
+async def test_updates_of_one_user_run_in_order_while_users_run_concurrently():
+    """Обновления одного пользователя не пересекаются, разные пользователи — параллельны."""
+    processor = PerUserUpdateProcessor(8)
+    events = []
+
+    async def handle(name, delay):
+        events.append(("start", name))
+        await asyncio.sleep(delay)
+        events.append(("end", name))
+
+    tasks = [
+        asyncio.create_task(processor.process_update(_update(1), handle("u1-slow", 0.05))),
+        asyncio.create_task(processor.process_update(_update(1), handle("u1-fast", 0))),
+        asyncio.create_task(processor.process_update(_update(2), handle("u2", 0))),
+    ]
+    await asyncio.sleep(0.01)
+    assert processor.queue_depth(1) == 2
+    await asyncio.gather(*tasks)
+
+    # u2 завершился, пока u1-slow ещё работал; u1-fast стартовал только после u1-slow
+    assert events.index(("end", "u2")) < events.index(("end", "u1-slow"))
+    assert events.index(("end", "u1-slow")) < events.index(("start", "u1-fast"))
+    assert processor.queue_depth(1) == 0
+    assert processor._locks == {}
+
+
+@pytest.mark.asyncio
+async def test_global_limit_caps_concurrency_across_users():
+    """Одновременно выполняется не больше max_concurrent_updates обновлений."""
+    processor = PerUserUpdateProcessor(2)
+    running = 0
+    peak = 0
+
+    async def handle():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    await asyncio.gather(*(processor.process_update(_update(uid), handle()) for uid in range(6)))
+
+    assert peak == 2
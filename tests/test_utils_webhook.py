@@ -0,0 +1,61 @@
+"""
+Тесты для utils/webhook.py
+"""
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+from telegram import Bot, Update
+
+from utils.webhook import SECRET_HEADER, build_web_app
+
+UPDATE_JSON = {
+    "update_id": 42,
+    "message": {
+        "message_id": 1,
+        "date": 0,
+        "chat": {"id": 7, "type": "private"},
+        "from": {"id": 7, "is_bot": False, "first_name": "Test"},
+        "text": "100 продукты",
+    },
+}
+
+
+def _application():
+    application = MagicMock()
+    application.bot = Bot("1:A")
+    application.update_queue = asyncio.Queue()
+    application.running = True
+    return application
+
+
+@pytest.mark.asyncio
+async def test_posted_update_is_queued_for_application():
+    """Синтетический Update JSON попадает в update_queue приложения."""
+    application = _application()
+    async with TestClient(TestServer(build_web_app(application, "/telegram", "s3cret"))) as client:
+        response = await client.post("/telegram", json=UPDATE_JSON, headers={SECRET_HEADER: "s3cret"})
+        health = await client.get("/healthz")
+        health_body = await health.json()
+
+    assert response.status == 200
+    update = application.update_queue.get_nowait()
+    assert isinstance(update, Update)
+    assert update.update_id == 42
+    assert update.message.text == "100 продукты"
+    assert health.status == 200
+    assert health_body == {"status": "ok", "pending_updates": 1}
+
+
+@pytest.mark.asyncio
+async def test_wrong_secret_and_bad_json_are_rejected():
+    """Запросы без секрета и с некорректным телом не попадают в очередь."""
+    application = _application()
+    async with TestClient(TestServer(build_web_app(application, "/telegram", "s3cret"))) as client:
+        forbidden = await client.post("/telegram", json=UPDATE_JSON)
+        bad = await client.post("/telegram", data="not json", headers={SECRET_HEADER: "s3cret"})
+
+    assert forbidden.status == 403
+    assert bad.status == 400
+    assert application.update_queue.empty()
@@ -7,12 +7,15 @@
 - Перерасход: spending > amount → один раз за месяц.
 - Если трат нет и не было → не беспокоить.
 - Для проектов: уведомить ВСЕХ участников.
+
+Уведомления пишутся в notification_outbox в одной транзакции с отметкой
+об отправке; доставляет их utils.notification_outbox.
 """
 
 import datetime
 from typing import List
 from utils.logger import get_logger, log_event, log_error
-from utils import budgets as budgets_utils, excel
+from utils import budgets as budgets_utils, db, excel, notification_outbox
 from utils.projects import get_project_members
 
 logger = get_logger("utils.budget_notifier")
@@ -61,51 +64,50 @@ def _get_month_name(month: int) -> str:
     return months[month - 1]
 
 
-async def _send_to_users(bot, user_ids: List[str], text: str) -> None:
-    """Отправить сообщение списку пользователей."""
-    for uid in user_ids:
-        try:
-            await bot.send_message(chat_id=int(uid), text=text)
-        except Exception as e:
-            log_error(logger, e, "budget_notification_send_error", user_id=uid)
-
-
 async def check_budget_notifications(bot) -> None:
     """
     Основная функция планировщика.
     Проверяет все активные бюджеты и отправляет уведомления при необходимости.
     """
-    # Используем локальное время процесса, чтобы месяц/год совпадали
-    # с датами, которыми сохраняются расходы.
-    now = datetime.datetime.now()
-    month = now.month
-    year = now.year
+    async with notification_outbox.notification_pass("budget"):
+        # Используем локальное время процесса, чтобы месяц/год совпадали
+        # с датами, которыми сохраняются расходы.
+        now = datetime.datetime.now()
+        month = now.month
+        year = now.year
 
-    log_event(logger, "budget_check_start", month=month, year=year)
+        log_event(logger, "budget_check_start", month=month, year=year)
 
-    active_budgets = await budgets_utils.get_all_active_budgets_with_notifications(month, year)
-    log_event(logger, "budget_check_count", count=len(active_budgets))
+        active_budgets = await budgets_utils.get_all_active_budgets_with_notifications(month, year)
+        log_event(logger, "budget_check_count", count=len(active_budgets))
 
-    for budget in active_budgets:
-        try:
-            await _process_budget(bot, budget, month, year, now)
-        except Exception as e:
-            log_error(logger, e, "budget_check_error", budget_id=budget['id'])
+        for budget in active_budgets:
+            try:
+                await _process_budget(bot, budget, month, year, now)
+            except Exception as e:
+                log_error(logger, e, "budget_check_error", budget_id=budget['id'])
 
-    log_event(logger, "budget_check_done", month=month, year=year)
+        log_event(logger, "budget_check_done", month=month, year=year)
 
 
 async def _process_budget(bot, budget: dict, month: int, year: int,
-                          now: datetime.datetime) -> None:
-    """Проверить один бюджет и отправить уведомления при необходимости."""
+                          now: datetime.datetime, source: str = "budget") -> None:
+    """
+    Проверить один бюджет и поставить уведомления в outbox при необходимости.
+    source — источник строк outbox: проход планировщика держит доставку
+    только своих строк (notification_pass), немедленная проверка пишет "budget_now".
+    """
     user_id = budget['user_id']
     project_id = budget.get('project_id')
     budget_amount = budget['amount']
     threshold = budget.get('notify_threshold')
 
-    # Получаем текущие траты за месяц
-    expenses = await excel.get_month_expenses(int(user_id), month, year, project_id)
-    current_spending = float(expenses.get('total', 0)) if expenses else 0.0
+    # Текущие траты за месяц ведутся в самой строке бюджета;
+    # пересчёт по расходам — только если итога нет (миграция не применена)
+    current_spending = budget.get('spent')
+    if current_spending is None:
+        expenses = await excel.get_month_expenses(int(user_id), month, year, project_id)
+        current_spending = float(expenses.get('total', 0)) if expenses else 0.0
 
     # Нет трат — не беспокоим
     if current_spending == 0:
@@ -123,12 +125,14 @@ async def _process_budget(bot, budget: dict, month: int, year: int,
 
     threshold_sent = False
     overspent_sent = False
+    messages: List[str] = []
 
     # --- Уведомление «порог достигнут» ---
     if threshold is not None and current_spending >= threshold:
         if _should_send(budget.get('threshold_notified_at'), last_spending, current_spending):
-            msg = _fmt_threshold_message(budget_amount, current_spending, threshold, month_name, year)
-            await _send_to_users(bot, recipient_ids, msg)
+            messages.append(
+                _fmt_threshold_message(budget_amount, current_spending, threshold, month_name, year)
+            )
             threshold_sent = True
             log_event(logger, "threshold_notification_sent",
                       budget_id=budget['id'], user_id=user_id, project_id=project_id,
@@ -137,28 +141,37 @@ async def _process_budget(bot, budget: dict, month: int, year: int,
     # --- Уведомление «бюджет превышен» ---
     if current_spending > budget_amount:
         if _should_send(budget.get('overspent_notified_at'), last_spending, current_spending):
-            msg = _fmt_overspent_message(budget_amount, current_spending, month_name, year)
-            await _send_to_users(bot, recipient_ids, msg)
+            messages.append(_fmt_overspent_message(budget_amount, current_spending, month_name, year))
             overspent_sent = True
             log_event(logger, "overspent_notification_sent",
                       budget_id=budget['id'], user_id=user_id, project_id=project_id,
                       spending=current_spending, budget=budget_amount)
 
-    # Обновляем состояние уведомлений в БД
-    if threshold_sent or overspent_sent:
-        await budgets_utils.update_notification_state(
-            budget_id=budget['id'],
-            threshold_notified_at=now if threshold_sent else None,
-            overspent_notified_at=now if overspent_sent else None,
-            last_notified_spending=current_spending,
-        )
+    # Сообщения и состояние уведомлений — одной транзакцией:
+    # отметка «отправлено» не появится без сообщений в outbox и наоборот
+    if messages:
+        async with db.transaction() as conn:
+            await notification_outbox.add_notifications(
+                conn,
+                [(uid, msg) for msg in messages for uid in recipient_ids],
+                source=source,
+            )
+            await budgets_utils.update_notification_state(
+                budget_id=budget['id'],
+                threshold_notified_at=now if threshold_sent else None,
+                overspent_notified_at=now if overspent_sent else None,
+                last_notified_spending=current_spending,
+                conn=conn,
+            )
+        notification_outbox.wake_drainer()
 
 
 async def check_user_budget_now(bot, user_id: int, project_id=None) -> None:
     """
     Немедленная проверка бюджета конкретного пользователя.
-    Вызывается после изменения порога или суммы бюджета,
-    чтобы не ждать следующего запуска планировщика (каждые 4 ч).
+    Вызывается после добавления расхода и после изменения порога или суммы
+    бюджета, чтобы не ждать следующего запуска планировщика (каждые 4 ч).
+    Траты берутся из budgets.spent — проверка читает одну строку бюджета.
     """
     now = datetime.datetime.now()
     month, year = now.month, now.year
@@ -170,7 +183,7 @@ async def check_user_budget_now(bot, user_id: int, project_id=None) -> None:
         return
 
     try:
-        await _process_budget(bot, budget, month, year, now)
+        await _process_budget(bot, budget, month, year, now, source="budget_now")
         log_event(logger, "check_user_budget_now_done",
                   user_id=user_id, project_id=project_id)
     except Exception as e:
@@ -31,6 +31,9 @@ def _row_to_dict(row) -> dict:
         'last_notified_spending': float(row['last_notified_spending']) if row['last_notified_spending'] else None,
         'threshold_notified_at':  row['threshold_notified_at'],
         'overspent_notified_at':  row['overspent_notified_at'],
+        # Текущие траты за месяц, поддерживаются триггером на expenses
+        # (migration/feature_79_budget/budget_spent_totals.sql)
+        'spent':                  float(row['spent']) if row.get('spent') is not None else None,
         'created_at':             row['created_at'],
         'updated_at':             row['updated_at'],
     }
@@ -120,14 +123,19 @@ async def set_budget(user_id: int, month: int, year: int, amount: float,
     """
     Установить или обновить бюджет на месяц (UPSERT).
     При изменении суммы сбрасывает счётчики уведомлений.
+    Новый бюджет получает текущие траты за месяц; дальше их ведёт триггер.
     """
     project_id = _normalize_project_id(project_id)
     try:
         if project_id is None:
             row = await db.fetchrow(
                 """
-                INSERT INTO budgets (user_id, project_id, amount, month, year, updated_at)
-                VALUES ($1, NULL, $2, $3, $4, now())
+                INSERT INTO budgets (user_id, project_id, amount, month, year, updated_at, spent)
+                VALUES ($1, NULL, $2, $3, $4, now(), (
+                    SELECT COALESCE(SUM(amount), 0) FROM expenses
+                    WHERE user_id = $1 AND project_id IS NULL
+                      AND month = $3 AND EXTRACT(YEAR FROM date) = $4
+                ))
                 ON CONFLICT (user_id, month, year) WHERE project_id IS NULL
                 DO UPDATE SET
                     amount                  = EXCLUDED.amount,
@@ -146,8 +154,12 @@ async def set_budget(user_id: int, month: int, year: int, amount: float,
         else:
             row = await db.fetchrow(
                 """
-                INSERT INTO budgets (user_id, project_id, amount, month, year, updated_at)
-                VALUES ($1, $5, $2, $3, $4, now())
+                INSERT INTO budgets (user_id, project_id, amount, month, year, updated_at, spent)
+                VALUES ($1, $5, $2, $3, $4, now(), (
+                    SELECT COALESCE(SUM(amount), 0) FROM expenses
+                    WHERE project_id = $5
+                      AND month = $3 AND EXTRACT(YEAR FROM date) = $4
+                ))
                 ON CONFLICT (user_id, project_id, month, year) WHERE project_id IS NOT NULL
                 DO UPDATE SET
                     amount                  = EXCLUDED.amount,
@@ -321,10 +333,13 @@ async def get_all_active_budgets_with_notifications(month: int, year: int) -> Li
 async def update_notification_state(budget_id: int,
                                     threshold_notified_at=None,
                                     overspent_notified_at=None,
-                                    last_notified_spending=None) -> None:
+                                    last_notified_spending=None,
+                                    conn=None) -> None:
     """
     Обновить поля состояния уведомлений после отправки.
     Передавать только те поля, которые изменились.
+    conn — соединение из db.transaction(), если обновление входит в транзакцию вызывающего;
+    тогда ошибка пробрасывается: транзакция всё равно откатится, и вызывающий должен об этом знать.
     """
     try:
         fields = ["updated_at = now()"]
@@ -345,12 +360,14 @@ async def update_notification_state(budget_id: int,
             fields.append(f"last_notified_spending = ${idx}")
             params.append(last_notified_spending)
 
-        await db.execute(
+        await (conn or db).execute(
             f"UPDATE budgets SET {', '.join(fields)} WHERE id = $1",
             *params
         )
     except Exception as e:
         log_error(logger, e, "update_notification_state_error", budget_id=budget_id)
+        if conn is not None:
+            raise
 
 
 async def get_budgets_for_year(user_id: int, year: int,
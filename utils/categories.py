@@ -4,12 +4,108 @@
 """
 
 import datetime
-from typing import Optional, List, Dict
-from . import db
+from collections import OrderedDict
+from typing import Optional, List, Dict, Tuple
+from . import db, queries
 from utils.logger import get_logger, log_event, log_error
 
 logger = get_logger("utils.categories")
 
+# ── In-process кэш категорий ─────────────────────────────────
+# Ключ (scope): ('project', project_id) или ('user', str(user_id)) для личных категорий.
+# Значение: список категорий в порядке выдачи из БД и индекс LOWER(name) -> категория.
+# Кэш заполняется при первом чтении и сбрасывается при любом изменении категорий.
+CATEGORIES_CACHE_MAX_SCOPES = 5000
+
+_categories_cache: "OrderedDict[Tuple, List[Dict]]" = OrderedDict()
+_name_index: Dict[Tuple, Dict[str, Dict]] = {}
+
+
+def _cache_scope(user_id: int, project_id: Optional[int]) -> Tuple:
+    if project_id is not None:
+        return ('project', int(project_id))
+    return ('user', str(user_id))
+
+
+def _cache_get(scope: Tuple) -> Optional[List[Dict]]:
+    cached = _categories_cache.get(scope)
+    if cached is not None:
+        _categories_cache.move_to_end(scope)
+    return cached
+
+
+def _cache_put(scope: Tuple, categories: List[Dict]) -> None:
+    _categories_cache[scope] = categories
+    _categories_cache.move_to_end(scope)
+    index: Dict[str, Dict] = {}
+    for cat in categories:
+        index.setdefault(cat['name'].lower(), cat)
+    _name_index[scope] = index
+    while len(_categories_cache) > CATEGORIES_CACHE_MAX_SCOPES:
+        evicted, _ = _categories_cache.popitem(last=False)
+        _name_index.pop(evicted, None)
+
+
+def invalidate_categories_cache(user_id: Optional[int] = None, project_id: Optional[int] = None) -> None:
+    """
+    Сбрасывает кэш категорий после изменения.
+
+    Изменение категории проекта сбрасывает только этот проект.
+    Изменение личной (глобальной) категории сбрасывает личный список пользователя
+    и все проектные списки: проект включает глобальные категории своего владельца.
+    Без аргументов кэш очищается полностью.
+    """
+    if user_id is None and project_id is None:
+        _categories_cache.clear()
+        _name_index.clear()
+        return
+
+    if project_id is not None:
+        scopes = [('project', int(project_id))]
+    else:
+        scopes = [('user', str(user_id))]
+        scopes += [scope for scope in _categories_cache if scope[0] == 'project']
+
+    for scope in scopes:
+        _categories_cache.pop(scope, None)
+        _name_index.pop(scope, None)
+
+
+async def _load_categories(user_id: int, project_id: Optional[int]) -> List[Dict]:
+    """
+    Возвращает список категорий scope из кэша, при промахе читает из БД.
+    Права доступа здесь не проверяются.
+    """
+    scope = _cache_scope(user_id, project_id)
+    cached = _cache_get(scope)
+    if cached is not None:
+        return cached
+
+    if project_id is not None:
+        rows = await db.fetch_named(
+            queries.CATEGORIES_FOR_PROJECT,
+            project_id
+        )
+    else:
+        rows = await db.fetch_named(
+            queries.CATEGORIES_PERSONAL,
+            str(user_id)
+        )
+
+    categories = [
+        {
+            'category_id': r['category_id'],
+            'name': r['name'],
+            'is_system': r['is_system'],
+            'is_active': r['is_active'],
+            'project_id': r['project_id'],
+            'created_at': r['created_at'].isoformat() if r['created_at'] else None
+        }
+        for r in rows
+    ]
+    _cache_put(scope, categories)
+    return categories
+
 
 async def get_categories_for_user_project(user_id: int, project_id: Optional[int] = None) -> List[Dict]:
     """
@@ -43,54 +139,8 @@ async def get_categories_for_user_project(user_id: int, project_id: Optional[int
         
         # For projects: get categories from ALL project members
         # For personal: get only user's own global categories
-        if project_id is not None:
-            rows = await db.fetch(
-                """
-                WITH deduplicated AS (
-                    SELECT DISTINCT ON (LOWER(c.name))
-                           c.category_id, c.name, c.is_system, c.is_active,
-                           c.project_id, c.created_at, c.user_id
-                    FROM categories c
-                    WHERE c.is_active = TRUE
-                      AND (
-                        c.project_id = $1
-                        OR (c.project_id IS NULL AND c.user_id = (
-                            SELECT user_id FROM projects WHERE project_id = $1
-                        ))
-                      )
-                    ORDER BY LOWER(c.name),
-                             CASE WHEN c.project_id = $1 THEN 0 ELSE 1 END,
-                             c.is_system DESC
-                )
-                SELECT * FROM deduplicated
-                ORDER BY is_system DESC, name ASC
-                """,
-                project_id
-            )
-        else:
-            rows = await db.fetch(
-                """
-                SELECT category_id, name, is_system, is_active, project_id, created_at, user_id
-                FROM categories
-                WHERE user_id = $1
-                  AND is_active = TRUE
-                  AND project_id IS NULL
-                ORDER BY is_system DESC, name ASC
-                """,
-                str(user_id)
-            )
-        
-        categories = [
-            {
-                'category_id': r['category_id'],
-                'name': r['name'],
-                'is_system': r['is_system'],
-                'is_active': r['is_active'],
-                'project_id': r['project_id'],
-                'created_at': r['created_at'].isoformat() if r['created_at'] else None
-            }
-            for r in rows
-        ]
+        # Копии, чтобы вызывающий код не портил закэшированные словари
+        categories = [dict(cat) for cat in await _load_categories(user_id, project_id)]
         
         log_event(logger, "get_categories_success", user_id=user_id, 
                  project_id=project_id, count=len(categories))
@@ -105,7 +155,7 @@ async def get_category_by_name(user_id: int, name: str, project_id: Optional[int
     """
     Находит категорию по имени (без учёта регистра).
     Сначала ищет в категориях проекта, затем в глобальных.
-    Один SQL-запрос вместо загрузки всего списка и цикла в Python.
+    Поиск идёт по индексу имён в кэше; к БД обращаемся только при промахе кэша.
 
     Args:
         user_id: ID пользователя
@@ -116,54 +166,45 @@ async def get_category_by_name(user_id: int, name: str, project_id: Optional[int
         Словарь с информацией о категории или None
     """
     try:
-        if project_id is not None:
-            row = await db.fetchrow(
-                """
-                SELECT category_id, name, is_system, is_active, project_id, created_at, user_id
-                FROM categories
-                WHERE LOWER(name) = LOWER($1)
-                  AND is_active = TRUE
-                  AND (
-                    project_id = $2
-                    OR (project_id IS NULL AND user_id = (
-                        SELECT user_id FROM projects WHERE project_id = $2
-                    ))
-                  )
-                ORDER BY CASE WHEN project_id = $2 THEN 0 ELSE 1 END
-                LIMIT 1
-                """,
-                name,
-                project_id
-            )
-        else:
-            row = await db.fetchrow(
-                """
-                SELECT category_id, name, is_system, is_active, project_id, created_at, user_id
-                FROM categories
-                WHERE user_id = $1
-                  AND LOWER(name) = LOWER($2)
-                  AND is_active = TRUE
-                  AND project_id IS NULL
-                LIMIT 1
-                """,
-                str(user_id),
-                name
-            )
-        if row is None:
-            return None
-        return {
-            'category_id': row['category_id'],
-            'name': row['name'],
-            'is_system': row['is_system'],
-            'is_active': row['is_active'],
-            'project_id': row['project_id'],
-            'created_at': row['created_at'].isoformat() if row['created_at'] else None,
-        }
+        scope = _cache_scope(user_id, project_id)
+        if scope not in _categories_cache:
+            await _load_categories(user_id, project_id)
+        category = _name_index.get(scope, {}).get(name.lower())
+        return dict(category) if category else None
     except Exception as e:
         log_error(logger, e, "get_category_by_name_error", user_id=user_id, name=name, project_id=project_id)
         return None
 
 
+async def get_categories_by_names(user_id: int, names, project_id: Optional[int] = None) -> Dict[str, Dict]:
+    """
+    Находит сразу несколько категорий по именам (без учёта регистра).
+    Список scope читается из БД не более одного раза, остальное — из индекса имён.
+
+    Args:
+        user_id: ID пользователя
+        names: Имена категорий
+        project_id: ID проекта (None для глобальных)
+
+    Returns:
+        Словарь «имя в нижнем регистре → категория»; ненайденных имён в нём нет
+    """
+    try:
+        scope = _cache_scope(user_id, project_id)
+        if scope not in _categories_cache:
+            await _load_categories(user_id, project_id)
+        index = _name_index.get(scope, {})
+        found = {}
+        for name in names:
+            category = index.get(name.lower())
+            if category:
+                found[name.lower()] = dict(category)
+        return found
+    except Exception as e:
+        log_error(logger, e, "get_categories_by_names_error", user_id=user_id, project_id=project_id)
+        return {}
+
+
 async def get_category_by_id(user_id: int, category_id: int) -> Optional[Dict]:
     """
     Получает категорию по ID с проверкой доступа.
@@ -179,25 +220,8 @@ async def get_category_by_id(user_id: int, category_id: int) -> Optional[Dict]:
         Словарь с информацией о категории или None
     """
     try:
-        row = await db.fetchrow(
-            """
-            SELECT c.category_id, c.name, c.is_system, c.is_active, c.project_id, c.created_at
-            FROM categories c
-            WHERE c.category_id = $1
-              AND c.is_active = TRUE
-              AND (
-                  c.user_id = $2  -- User owns the category
-                  OR c.project_id IS NULL  -- Global category (accessible to all)
-                  OR EXISTS (
-                      -- User is a member of the category's project
-                      SELECT 1 FROM projects p
-                      LEFT JOIN project_members pm ON p.project_id = pm.project_id AND pm.user_id = $2
-                      WHERE p.project_id = c.project_id
-                        AND p.deleted_at IS NULL
-                        AND (p.user_id = $2 OR pm.user_id = $2)
-                  )
-              )
-            """,
+        row = await db.fetchrow_named(
+            queries.CATEGORY_BY_ID_FOR_USER,
             category_id,
             str(user_id)
         )
@@ -233,12 +257,8 @@ async def get_category_by_id_only(category_id: int) -> Optional[Dict]:
         Словарь с информацией о категории или None
     """
     try:
-        row = await db.fetchrow(
-            """
-            SELECT category_id, name, is_system, is_active, project_id, created_at
-            FROM categories
-            WHERE category_id = $1 AND is_active = TRUE
-            """,
+        row = await db.fetchrow_named(
+            queries.CATEGORY_BY_ID_ONLY,
             category_id
         )
         if not row:
@@ -286,8 +306,8 @@ async def create_category(
                     'message': "У вас нет прав на создание категорий в этом проекте"
                 }
         # Убеждаемся, что пользователь существует
-        await db.execute(
-            "INSERT INTO users(user_id) VALUES($1) ON CONFLICT (user_id) DO NOTHING",
+        await db.execute_named(
+            queries.ENSURE_USER,
             str(user_id)
         )
         
@@ -339,6 +359,7 @@ async def create_category(
                 str(user_id)
             )
             
+            invalidate_categories_cache(user_id, project_id)
             log_event(logger, "create_category_reactivated", user_id=user_id,
                      category_id=category_id, category_name=name, project_id=project_id, is_system=is_system)
             
@@ -363,6 +384,7 @@ async def create_category(
             is_system
         )
         
+        invalidate_categories_cache(user_id, project_id)
         log_event(logger, "create_category_success", user_id=user_id,
                  category_id=category_id, category_name=name, project_id=project_id, is_system=is_system)
         
@@ -487,6 +509,7 @@ async def delete_category_with_transfer(user_id: int, category_id: int, target_c
             str(user_id)
         )
         
+        invalidate_categories_cache(user_id, category['project_id'])
         log_event(logger, "delete_category_with_transfer_success", user_id=user_id,
                  category_id=category_id, target_category_id=target_category_id,
                  transferred_count=transferred_count)
@@ -578,6 +601,7 @@ async def deactivate_category(user_id: int, category_id: int) -> Dict:
             str(user_id)
         )
         
+        invalidate_categories_cache(user_id, category['project_id'])
         log_event(logger, "deactivate_category_success", user_id=user_id, category_id=category_id)
         
         return {
@@ -602,22 +626,33 @@ async def ensure_system_categories_exist(user_id: int) -> None:
         user_id: ID пользователя
     """
     import config
-    
+
     try:
-        await db.execute(
-            "INSERT INTO users(user_id) VALUES($1) ON CONFLICT (user_id) DO NOTHING",
+        # Если все системные категории уже есть в личном списке (обычно из кэша) — выходим
+        await _load_categories(user_id, None)
+        index = _name_index.get(_cache_scope(user_id, None), {})
+        if all(name.lower() in index for name in config.DEFAULT_CATEGORIES):
+            return
+
+        await db.execute_named(
+            queries.ENSURE_USER,
             str(user_id)
         )
-        
-        for category_name in config.DEFAULT_CATEGORIES.keys():
-            await create_category(
-                user_id=user_id,
-                name=category_name,
-                project_id=None,
-                is_system=True
-            )
-        
-        log_event(logger, "ensure_system_categories_success", user_id=user_id)
+
+        # Все недостающие системные категории — одним INSERT ... SELECT unnest(...)
+        row = await db.fetchrow_named(
+            queries.PROVISION_SYSTEM_CATEGORIES,
+            str(user_id),
+            list(config.DEFAULT_CATEGORIES.keys())
+        )
+        inserted = row['inserted'] if row else 0
+        reactivated = row['reactivated'] if row else 0
+
+        if inserted or reactivated:
+            invalidate_categories_cache(user_id, None)
+
+        log_event(logger, "ensure_system_categories_success", user_id=user_id,
+                 inserted=inserted, reactivated=reactivated)
         
     except Exception as e:
         log_error(logger, e, "ensure_system_categories_error", user_id=user_id)
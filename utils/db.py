@@ -2,12 +2,15 @@
 Модуль для работы с PostgreSQL через asyncpg.
 Предоставляет пул соединений и базовые функции для выполнения запросов.
 """
+import contextlib
 import os
 import asyncpg
 import logging
+from contextvars import ContextVar
 from typing import Optional
 import time
 from utils.logger import get_logger, log_event, log_error, log_database_operation
+from utils import queries
 from urllib.parse import quote_plus
 
 logger = logging.getLogger(__name__)
@@ -25,6 +28,38 @@ DB_PASSWORD = os.environ.get("DB_PASSWORD", "")
 DSN = f"postgresql://{DB_USER}:{quote_plus(DB_PASSWORD)}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
 
+class QueryStats:
+    """Счётчик обращений к БД в рамках одного update (для поиска N+1)"""
+
+    __slots__ = ('count', 'duration')
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+
+_query_stats: ContextVar[Optional[QueryStats]] = ContextVar('db_query_stats', default=None)
+
+
+def begin_query_stats() -> QueryStats:
+    """Начинает новый подсчёт запросов в текущем контексте (вызывается на входе update)"""
+    stats = QueryStats()
+    _query_stats.set(stats)
+    return stats
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Возвращает счётчик текущего update или None вне обработки update"""
+    return _query_stats.get()
+
+
+def _record_query(duration: float) -> None:
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.duration += duration
+
+
 def extract_table_name(query: str) -> Optional[str]:
     """
     Извлекает название таблицы из SQL запроса
@@ -62,6 +97,37 @@ def extract_table_name(query: str) -> Optional[str]:
         return None
 
 
+class CatalogConnection(asyncpg.Connection):
+    """
+    Соединение, которое держит подготовленные запросы из utils.queries.
+    Запросы готовятся один раз при создании соединения (_prepare_catalog),
+    поэтому на горячем пути нет parse/plan — только bind/execute.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._catalog = {}
+
+    async def get_prepared(self, name: str, refresh: bool = False):
+        """
+        Возвращает подготовленный запрос по имени из каталога.
+        При refresh=True запрос готовится заново (например, после смены схемы).
+        """
+        statement = self._catalog.get(name)
+        if statement is None or refresh:
+            statement = await self.prepare(queries.STATEMENTS[name])
+            self._catalog[name] = statement
+        return statement
+
+
+async def _prepare_catalog(conn: CatalogConnection):
+    """
+    init-коллбэк пула: готовит все запросы каталога на новом соединении
+    """
+    for name in queries.STATEMENTS:
+        await conn.get_prepared(name)
+
+
 async def init_pool():
     """
     Инициализирует пул соединений с PostgreSQL
@@ -82,11 +148,14 @@ async def init_pool():
             max_inactive_connection_lifetime=300.0,  # 5 минут
             timeout=30.0,
             command_timeout=60.0,
+            connection_class=CatalogConnection,
+            init=_prepare_catalog,
             # server_settings={'jit': 'off'}  # опционально, если проблемы с производительностью
         )
         
         duration_ms = (time.time() - start_time) * 1000
-        log_event(db_logger, "db_pool_init_success", status="success", duration_ms=duration_ms)
+        log_event(db_logger, "db_pool_init_success", status="success", duration_ms=duration_ms,
+                  prepared_statements=len(queries.STATEMENTS))
         
     except Exception as e:
         duration_ms = (time.time() - start_time) * 1000
@@ -127,6 +196,7 @@ async def execute(query: str, *args, request_id: str = None):
     try:
         result = await _pool.execute(query, *args)
         duration = time.time() - start_time
+        _record_query(duration)
         
         # Извлекаем тип операции и таблицу
         operation = query.strip().split()[0].upper()
@@ -153,6 +223,7 @@ async def execute(query: str, *args, request_id: str = None):
         return result
     except Exception as e:
         duration = time.time() - start_time
+        _record_query(duration)
         log_error(db_logger, e, "db_execute_error", 
                  request_id=request_id,
                  duration_ms=duration * 1000,
@@ -175,6 +246,7 @@ async def fetch(query: str, *args, request_id: str = None):
     try:
         rows = await _pool.fetch(query, *args)
         duration = time.time() - start_time
+        _record_query(duration)
         
         # Извлекаем таблицу
         table = extract_table_name(query)
@@ -195,6 +267,7 @@ async def fetch(query: str, *args, request_id: str = None):
         return rows
     except Exception as e:
         duration = time.time() - start_time
+        _record_query(duration)
         log_error(db_logger, e, "db_fetch_error", 
                  request_id=request_id,
                  duration_ms=duration * 1000,
@@ -211,7 +284,11 @@ async def fetchrow(query: str, *args, request_id: str = None):
         *args: Параметры запроса
         request_id: ID запроса для трейсинга (опционально)
     """
-    return await _pool.fetchrow(query, *args)
+    start_time = time.perf_counter()
+    try:
+        return await _pool.fetchrow(query, *args)
+    finally:
+        _record_query(time.perf_counter() - start_time)
 
 
 async def fetchval(query: str, *args, request_id: str = None):
@@ -223,10 +300,273 @@ async def fetchval(query: str, *args, request_id: str = None):
         *args: Параметры запроса
         request_id: ID запроса для трейсинга (опционально)
     """
-    return await _pool.fetchval(query, *args)
+    start_time = time.perf_counter()
+    try:
+        return await _pool.fetchval(query, *args)
+    finally:
+        _record_query(time.perf_counter() - start_time)
+
+
+async def _run_named(name: str, method: str, *args):
+    """
+    Выполняет подготовленный запрос каталога на соединении из пула.
+    Если закэшированный план стал невалидным (ALTER TABLE и т.п.),
+    запрос готовится заново и выполняется повторно один раз.
+    """
+    start_time = time.perf_counter()
+    try:
+        async with _pool.acquire() as conn:
+            statement = await conn.get_prepared(name)
+            try:
+                result = await getattr(statement, method)(*args)
+            except asyncpg.exceptions.InvalidCachedStatementError:
+                statement = await conn.get_prepared(name, refresh=True)
+                result = await getattr(statement, method)(*args)
+            return result, statement
+    finally:
+        _record_query(time.perf_counter() - start_time)
+
+
+async def execute_named(name: str, *args, request_id: str = None):
+    """
+    Выполняет именованный запрос из каталога utils.queries (INSERT, UPDATE, DELETE)
+
+    Args:
+        name: Имя запроса в каталоге
+        *args: Параметры запроса
+        request_id: ID запроса для трейсинга (опционально)
+    """
+    start_time = time.time()
+    query = queries.STATEMENTS.get(name, '')
+    operation = query.strip().split()[0].upper() if query.strip() else 'UNKNOWN'
+    table = extract_table_name(query)
+
+    try:
+        _, statement = await _run_named(name, 'fetch', *args)
+        duration = time.time() - start_time
+
+        import config
+        should_log = True
+        if operation in ['INSERT', 'UPDATE'] and table in ['users', 'budget']:
+            slow_threshold = getattr(config, 'SLOW_DB_QUERY_THRESHOLD', 0.01)
+            if duration < slow_threshold:
+                should_log = False
+
+        if should_log:
+            log_database_operation(
+                db_logger,
+                operation,
+                table=table,
+                duration=duration,
+                request_id=request_id,
+                statement=name
+            )
+
+        return statement.get_statusmsg()
+    except Exception as e:
+        duration = time.time() - start_time
+        log_error(db_logger, e, "db_execute_error",
+                 request_id=request_id,
+                 duration_ms=duration * 1000,
+                 operation=operation,
+                 table=table,
+                 statement=name)
+        raise
+
+
+async def executemany_named(name: str, args_list, request_id: str = None):
+    """
+    Выполняет именованный запрос из каталога для каждого набора параметров.
+    Все строки отправляются одним конвейером в одной транзакции:
+    либо вставлены все, либо ни одной.
+
+    Args:
+        name: Имя запроса в каталоге
+        args_list: Последовательность наборов параметров
+        request_id: ID запроса для трейсинга (опционально)
+    """
+    start_time = time.perf_counter()
+    query = queries.STATEMENTS.get(name, '')
+    operation = query.strip().split()[0].upper() if query.strip() else 'UNKNOWN'
+    table = extract_table_name(query)
+    args_list = list(args_list)
+
+    try:
+        async with _pool.acquire() as conn:
+            for refresh in (False, True):
+                try:
+                    async with conn.transaction():
+                        statement = await conn.get_prepared(name, refresh=refresh)
+                        await statement.executemany(args_list)
+                    break
+                except asyncpg.exceptions.InvalidCachedStatementError:
+                    if refresh:
+                        raise
+        duration = time.perf_counter() - start_time
+        log_database_operation(
+            db_logger,
+            operation,
+            table=table,
+            duration=duration,
+            request_id=request_id,
+            statement=name,
+            rows=len(args_list)
+        )
+    except Exception as e:
+        duration = time.perf_counter() - start_time
+        log_error(db_logger, e, "db_executemany_error",
+                 request_id=request_id,
+                 duration_ms=duration * 1000,
+                 operation=operation,
+                 table=table,
+                 statement=name,
+                 rows=len(args_list))
+        raise
+    finally:
+        _record_query(time.perf_counter() - start_time)
+
+
+async def fetch_named(name: str, *args, request_id: str = None):
+    """
+    Выполняет именованный SELECT-запрос из каталога и возвращает все строки
+
+    Args:
+        name: Имя запроса в каталоге
+        *args: Параметры запроса
+        request_id: ID запроса для трейсинга (опционально)
+    """
+    start_time = time.time()
+    table = extract_table_name(queries.STATEMENTS.get(name, ''))
+
+    try:
+        rows, _ = await _run_named(name, 'fetch', *args)
+        duration = time.time() - start_time
+
+        import config
+        slow_threshold = getattr(config, 'SLOW_DB_QUERY_THRESHOLD', 0.05)
+        if duration >= slow_threshold:
+            log_database_operation(
+                db_logger,
+                'SELECT',
+                table=table,
+                duration=duration,
+                rows_returned=len(rows) if rows else 0,
+                request_id=request_id,
+                statement=name
+            )
+
+        return rows
+    except Exception as e:
+        duration = time.time() - start_time
+        log_error(db_logger, e, "db_fetch_error",
+                 request_id=request_id,
+                 duration_ms=duration * 1000,
+                 table=table,
+                 statement=name)
+        raise
+
+
+async def _fetch_one_named(name: str, method: str, args, request_id: str = None):
+    """
+    Общая часть fetchrow_named / fetchval_named: выполняет запрос каталога
+    с тем же логированием медленных запросов и ошибок, что и fetch_named.
+    """
+    start_time = time.time()
+    query = queries.STATEMENTS.get(name, '')
+    operation = query.strip().split()[0].upper() if query.strip() else 'UNKNOWN'
+    table = extract_table_name(query)
+
+    try:
+        result, _ = await _run_named(name, method, *args)
+        duration = time.time() - start_time
+
+        import config
+        slow_threshold = getattr(config, 'SLOW_DB_QUERY_THRESHOLD', 0.05)
+        if duration >= slow_threshold:
+            log_database_operation(
+                db_logger,
+                operation,
+                table=table,
+                duration=duration,
+                request_id=request_id,
+                statement=name
+            )
+
+        return result
+    except Exception as e:
+        duration = time.time() - start_time
+        log_error(db_logger, e, "db_fetch_error",
+                 request_id=request_id,
+                 duration_ms=duration * 1000,
+                 operation=operation,
+                 table=table,
+                 statement=name)
+        raise
+
+
+async def fetchrow_named(name: str, *args, request_id: str = None):
+    """
+    Выполняет именованный SELECT-запрос из каталога и возвращает одну строку
+
+    Args:
+        name: Имя запроса в каталоге
+        *args: Параметры запроса
+        request_id: ID запроса для трейсинга (опционально)
+    """
+    return await _fetch_one_named(name, 'fetchrow', args, request_id)
+
+
+async def fetchval_named(name: str, *args, request_id: str = None):
+    """
+    Выполняет именованный SELECT-запрос из каталога и возвращает одно значение
+
+    Args:
+        name: Имя запроса в каталоге
+        *args: Параметры запроса
+        request_id: ID запроса для трейсинга (опционально)
+    """
+    return await _fetch_one_named(name, 'fetchval', args, request_id)
+
+
+class _CountedConnection:
+    """
+    Соединение транзакции (db.transaction()): запросы на нём учитываются
+    в счётчике update, как и обёртки модуля. Остальное передаётся соединению.
+    """
+
+    __slots__ = ('_conn',)
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    async def _run(self, method: str, *args, **kwargs):
+        start_time = time.perf_counter()
+        try:
+            return await getattr(self._conn, method)(*args, **kwargs)
+        finally:
+            _record_query(time.perf_counter() - start_time)
+
+    async def execute(self, query: str, *args, **kwargs):
+        return await self._run('execute', query, *args, **kwargs)
+
+    async def executemany(self, query: str, args, **kwargs):
+        return await self._run('executemany', query, args, **kwargs)
+
+    async def fetch(self, query: str, *args, **kwargs):
+        return await self._run('fetch', query, *args, **kwargs)
+
+    async def fetchrow(self, query: str, *args, **kwargs):
+        return await self._run('fetchrow', query, *args, **kwargs)
+
+    async def fetchval(self, query: str, *args, **kwargs):
+        return await self._run('fetchval', query, *args, **kwargs)
 
 
-def transaction():
+@contextlib.asynccontextmanager
+async def transaction():
     """
     Возвращает контекстный менеджер транзакции asyncpg.
     Использование:
@@ -235,5 +575,8 @@ def transaction():
             await conn.fetchrow(...)
     Все операции внутри блока выполняются атомарно.
     Если возникает исключение — транзакция откатывается автоматически.
+    Запросы на conn учитываются в счётчике update (QueryStats).
     """
-    return _pool.acquire()
+    async with _pool.acquire() as conn:
+        async with conn.transaction():
+            yield _CountedConnection(conn)
@@ -6,11 +6,10 @@
 
 import os
 import datetime
-import pandas as pd
 import time
 
 import config
-from . import db
+from . import db, queries
 from utils.logger import get_logger, log_event, log_error
 
 logger = get_logger("utils.excel")
@@ -43,7 +42,9 @@ async def add_expense(user_id, amount, category_id, description: str = "", proje
     Добавляет новый расход в БД.
     Если project_id указан, добавляет расход в проект.
     
-    Permission required: ADD_EXPENSE (owner or editor for projects)
+    Permission required: ADD_EXPENSE (owner or editor for projects) — проверяет
+    вызывающий до поиска категорий (handlers.expense._add_expense_batch),
+    чтобы пачка не проверяла права дважды
     
     Args:
         user_id: ID пользователя
@@ -114,8 +115,8 @@ async def add_expense(user_id, amount, category_id, description: str = "", proje
 
     try:
         # 1. Убедимся, что пользователь существует
-        await db.execute(
-            "INSERT INTO users(user_id) VALUES($1) ON CONFLICT (user_id) DO NOTHING",
+        await db.execute_named(
+            queries.ENSURE_USER,
             str(user_id),
         )
         
@@ -145,11 +146,8 @@ async def add_expense(user_id, amount, category_id, description: str = "", proje
             return False
 
         # 3. Вставляем сам расход
-        await db.execute(
-            """
-            INSERT INTO expenses(user_id, project_id, date, time, amount, category_id, description, month)
-            VALUES($1, $2, $3, $4, $5, $6, $7, $8)
-            """,
+        await db.execute_named(
+            queries.INSERT_EXPENSE,
             str(user_id),
             project_id,
             date_val,
@@ -171,6 +169,56 @@ async def add_expense(user_id, amount, category_id, description: str = "", proje
         return False
 
 
+async def add_expenses(user_id, expenses, project_id=None):
+    """
+    Добавляет пачку расходов одной вставкой (executemany в одной транзакции).
+
+    Permission required: ADD_EXPENSE (owner or editor for projects)
+
+    Args:
+        user_id: ID пользователя
+        expenses: Список словарей {'amount', 'category', 'description'}, где category —
+                  категория из categories.get_categories_by_names для этого же scope
+        project_id: ID проекта (опционально)
+
+    Returns:
+        True, если вставлены все расходы; False — если ни одного
+    """
+    start_time = time.time()
+    project_id = _normalize_project_id(project_id)
+
+    # Категории уже найдены в scope пользователя/проекта; проектная категория — только своего проекта
+    for expense in expenses:
+        category = expense['category']
+        if category['project_id'] is not None and category['project_id'] != project_id:
+            log_error(logger, Exception("Category not available for this project"),
+                      "add_expenses_category_project_mismatch", user_id=user_id,
+                      category_id=category['category_id'], category_project_id=category['project_id'],
+                      expense_project_id=project_id)
+            return False
+
+    now = datetime.datetime.now()
+    date_val = now.date()
+    time_val = now.time().replace(microsecond=0)
+    rows = [
+        (str(user_id), project_id, date_val, time_val, float(expense['amount']),
+         int(expense['category']['category_id']), expense['description'] or None, now.month)
+        for expense in expenses
+    ]
+
+    try:
+        await db.execute_named(queries.ENSURE_USER, str(user_id))
+        await db.executemany_named(queries.INSERT_EXPENSE, rows)
+        log_event(logger, "add_expenses_success", user_id=user_id, project_id=project_id,
+                  count=len(rows), total=sum(row[4] for row in rows),
+                  duration=time.time() - start_time)
+        return True
+    except Exception as e:
+        log_error(logger, e, "add_expenses_error", user_id=user_id, project_id=project_id,
+                  count=len(rows), duration=time.time() - start_time)
+        return False
+
+
 async def get_month_expenses(user_id, month=None, year=None, project_id=None):
     """
     Returns expense statistics for the specified month.
@@ -203,30 +251,15 @@ async def get_month_expenses(user_id, month=None, year=None, project_id=None):
         # For projects: get expenses from ALL members
         # For personal: get only user's expenses
         if project_id is not None:
-            rows = await db.fetch(
-                """
-                SELECT e.amount, c.name as category
-                FROM expenses e
-                JOIN categories c ON e.category_id = c.category_id
-                WHERE e.project_id = $1
-                  AND e.month = $2
-                  AND EXTRACT(YEAR FROM e.date) = $3
-                """,
+            rows = await db.fetch_named(
+                queries.MONTH_EXPENSES_PROJECT,
                 project_id,
                 month,
                 year,
             )
         else:
-            rows = await db.fetch(
-                """
-                SELECT e.amount, c.name as category
-                FROM expenses e
-                JOIN categories c ON e.category_id = c.category_id
-                WHERE e.user_id = $1
-                  AND e.month = $2
-                  AND e.project_id IS NULL
-                  AND EXTRACT(YEAR FROM e.date) = $3
-                """,
+            rows = await db.fetch_named(
+                queries.MONTH_EXPENSES_PERSONAL,
                 str(user_id),
                 month,
                 year,
@@ -324,28 +357,15 @@ async def get_category_expenses(user_id, category_id, year=None, project_id=None
         # For projects: get expenses from ALL members
         # For personal: get only user's expenses
         if project_id is not None:
-            rows = await db.fetch(
-                """
-                SELECT amount, month
-                FROM expenses
-                WHERE category_id = $1
-                  AND EXTRACT(YEAR FROM date) = $2
-                  AND project_id = $3
-                """,
+            rows = await db.fetch_named(
+                queries.CATEGORY_EXPENSES_PROJECT,
                 category_id,
                 year,
                 project_id,
             )
         else:
-            rows = await db.fetch(
-                """
-                SELECT amount, month
-                FROM expenses
-                WHERE user_id = $1
-                  AND category_id = $2
-                  AND EXTRACT(YEAR FROM date) = $3
-                  AND project_id IS NULL
-                """,
+            rows = await db.fetch_named(
+                queries.CATEGORY_EXPENSES_PERSONAL,
                 str(user_id),
                 category_id,
                 year,
@@ -441,6 +461,7 @@ async def get_all_expenses(user_id, year=None, project_id=None):
             return None
 
         data = [dict(r) for r in rows]
+        import pandas as pd
         result = pd.DataFrame(data)
         log_event(logger, "get_all_expenses_success", user_id=user_id,
                  year=year, project_id=project_id, rows_count=len(result))
@@ -480,27 +501,14 @@ async def get_day_expenses(user_id, date=None, project_id=None):
         # For projects: get expenses from ALL members
         # For personal: get only user's expenses
         if project_id is not None:
-            rows = await db.fetch(
-                """
-                SELECT e.amount, c.name as category
-                FROM expenses e
-                JOIN categories c ON e.category_id = c.category_id
-                WHERE e.project_id = $1
-                  AND e.date = $2
-                """,
+            rows = await db.fetch_named(
+                queries.DAY_EXPENSES_PROJECT,
                 project_id,
                 target_date,
             )
         else:
-            rows = await db.fetch(
-                """
-                SELECT e.amount, c.name as category
-                FROM expenses e
-                JOIN categories c ON e.category_id = c.category_id
-                WHERE e.user_id = $1
-                  AND e.date = $2
-                  AND e.project_id IS NULL
-                """,
+            rows = await db.fetch_named(
+                queries.DAY_EXPENSES_PERSONAL,
                 str(user_id),
                 target_date,
             )
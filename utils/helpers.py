@@ -2,6 +2,7 @@
 Вспомогательные функции для Telegram-бота анализа расходов
 """
 
+import functools
 import re
 import datetime
 import logging
@@ -19,23 +20,47 @@ def parse_add_command(text):
     if text.startswith('/add '):
         text = text[5:].strip()
     
-    # Пытаемся распарсить сумму и категорию
-    pattern = r'^(\d+(?:\.\d+)?)\s+(\w+)(?:\s+(.+))?$'
-    match = re.match(pattern, text)
+    # Сумма и категория — в первой строке (разделители — пробелы и табы),
+    # следующие строки продолжают описание. Сообщение, где каждая строка —
+    # отдельный расход, разбирает parse_expense_lines (его text_handler пробует первым)
+    first_line, _, rest = text.partition('\n')
+    pattern = r'(\d+(?:\.\d+)?)[ \t]+(\w+)(?:[ \t]+(.+))?'
+    match = re.fullmatch(pattern, first_line.strip())
     
     if match:
         amount = float(match.group(1))
         category = match.group(2).lower()
-        description = match.group(3) if match.group(3) else ""
+        description_lines = [match.group(3) or ""] + [line.strip() for line in rest.splitlines()]
+        description = "\n".join(line for line in description_lines if line)
         
         return {
             'amount': amount,
             'category': category,
             'description': description
         }
-    
+
     return None
 
+
+def parse_expense_lines(text):
+    """
+    Парсит несколько расходов из многострочного сообщения (по одному на строку
+    в формате parse_add_command). Пустые строки пропускаются.
+    Возвращает список расходов или None, если строк меньше двух
+    или хотя бы одна строка не распознана.
+    """
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    if len(lines) < 2:
+        return None
+
+    expenses = []
+    for line in lines:
+        expense = parse_add_command(line)
+        if not expense:
+            return None
+        expenses.append(expense)
+    return expenses
+
 def format_month_expenses(expenses, month=None, year=None):
     """
     Форматирует статистику расходов за месяц в текстовый отчет
@@ -247,10 +272,12 @@ async def add_project_context_to_report(report: str, user_id: int, project_id: i
     return f"📊 Общие расходы\n\n{report}"
 
 
+@functools.lru_cache(maxsize=None)
 def get_main_menu_keyboard():
     """
     Возвращает клавиатуру главного меню.
     Тексты кнопок берутся из config.MAIN_MENU_BUTTONS.
+    ReplyKeyboardMarkup неизменяем, поэтому клавиатура строится один раз.
     """
     import config
     from telegram import ReplyKeyboardMarkup
@@ -263,6 +290,7 @@ def get_main_menu_keyboard():
     return ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
 
 
+@functools.lru_cache(maxsize=None)
 def get_analysis_menu_keyboard():
     """Возвращает клавиатуру подменю «Анализ»."""
     import config
@@ -275,6 +303,7 @@ def get_analysis_menu_keyboard():
     return ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
 
 
+@functools.lru_cache(maxsize=None)
 def get_income_menu_keyboard():
     """Возвращает клавиатуру подменю «Доходы»."""
     import config
@@ -287,6 +316,7 @@ def get_income_menu_keyboard():
     return ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
 
 
+@functools.lru_cache(maxsize=None)
 def get_settings_menu_keyboard():
     """Возвращает клавиатуру подменю «Настройки»."""
     import config
@@ -6,7 +6,7 @@
 import re
 from typing import Optional, List, Dict
 
-from . import db
+from . import db, queries
 from utils.logger import get_logger, log_event, log_error
 
 logger = get_logger("utils.income_categories")
@@ -386,19 +386,24 @@ async def ensure_system_income_categories_exist(user_id: int) -> None:
     import config
 
     try:
-        await db.execute(
-            "INSERT INTO users(user_id) VALUES($1) ON CONFLICT (user_id) DO NOTHING",
+        await db.execute_named(
+            queries.ENSURE_USER,
             str(user_id),
         )
 
-        for category_name in config.DEFAULT_INCOME_CATEGORIES.keys():
-            await create_income_category(
-                user_id=user_id,
-                name=category_name,
-                project_id=None,
-                is_system=True,
-            )
+        # Все недостающие системные категории — одним INSERT ... SELECT unnest(...)
+        row = await db.fetchrow_named(
+            queries.PROVISION_SYSTEM_INCOME_CATEGORIES,
+            str(user_id),
+            [sanitize_category_name(name) for name in config.DEFAULT_INCOME_CATEGORIES.keys()],
+        )
 
-        log_event(logger, "ensure_system_income_categories_success", user_id=user_id)
+        log_event(
+            logger,
+            "ensure_system_income_categories_success",
+            user_id=user_id,
+            inserted=row["inserted"] if row else 0,
+            reactivated=row["reactivated"] if row else 0,
+        )
     except Exception as exc:
         log_error(logger, exc, "ensure_system_income_categories_error", user_id=user_id)
@@ -1,14 +1,15 @@
 """Утилиты для работы с доходами."""
 
 import datetime
-from typing import Optional, Dict
-
-import pandas as pd
+from typing import TYPE_CHECKING, Optional, Dict
 
 from utils import db
 from utils.logger import get_logger, log_error, log_event
 from utils import income_categories
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 logger = get_logger("utils.incomes")
 
 
@@ -196,7 +197,7 @@ async def get_day_incomes(user_id: int, date: Optional[str] = None, project_id:
         return None
 
 
-async def get_all_incomes(user_id: int, year: Optional[int] = None, project_id: Optional[int] = None) -> Optional[pd.DataFrame]:
+async def get_all_incomes(user_id: int, year: Optional[int] = None, project_id: Optional[int] = None) -> Optional["pd.DataFrame"]:
     """Возвращает все доходы за год в DataFrame."""
     year = year or datetime.datetime.now().year
     project_id = _normalize_project_id(project_id)
@@ -251,6 +252,7 @@ async def get_all_incomes(user_id: int, year: Optional[int] = None, project_id:
         if not rows:
             return None
 
+        import pandas as pd
         return pd.DataFrame([dict(row) for row in rows])
     except Exception as exc:
         log_error(logger, exc, "get_all_incomes_error", user_id=user_id, year=year, project_id=project_id)
@@ -0,0 +1,35 @@
+"""
+Отложенный импорт тяжёлых модулей (matplotlib, seaborn, pandas и т.п.).
+
+Модуль регистрируется в sys.modules сразу, а исполняется при первом обращении
+к любому его атрибуту. Так обработчики могут держать ссылку на модуль
+(и тесты — патчить его атрибуты), не платя за импорт при старте бота.
+"""
+import importlib
+import importlib.util
+import sys
+import types
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """
+    Возвращает модуль name, загрузка которого отложена до первого обращения.
+    Если модуль уже импортирован, возвращает его как есть.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+
+    parent, _, child = name.rpartition('.')
+    if parent:
+        setattr(sys.modules[parent], child, module)
+    return module
@@ -1,30 +1,98 @@
 """
 Модуль для структурированного логирования
 """
+import asyncio
+import atexit
+import functools
 import logging
+import logging.handlers
+import os
+import queue
+import random
 import sys
 import json
-from datetime import datetime
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from itertools import islice
 from typing import Optional, Any, Dict
 
+from metrics import (
+    LOG_EVENTS_SUPPRESSED_TOTAL,
+    LOG_QUEUE_SIZE,
+    LOG_RECORDS_DROPPED_TOTAL,
+    OPERATION_DURATION_SECONDS,
+)
+
+
+try:
+    import orjson  # опционально: заметно быстрее stdlib json
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+# Атрибуты, которые LogRecord заполняет в конструкторе. Собираем один раз при импорте:
+# поля из extra добавляются в __dict__ записи уже после них.
+_RECORD_INIT_ATTRS = tuple(logging.LogRecord('', logging.INFO, '', 0, '', None, None).__dict__)
+_RESERVED_RECORD_ATTRS = frozenset(_RECORD_INIT_ATTRS) | frozenset({'message', 'asctime', 'event'})
+
+_BASE_KEYS = frozenset({'timestamp', 'level', 'service', 'event'})
+# Приоритетные поля читаемого формата (показываем первыми)
+_PRIORITY_KEYS = ('request_id', 'user_id', 'status', 'duration_ms', 'error')
+_READABLE_SKIP_KEYS = _BASE_KEYS | frozenset(_PRIORITY_KEYS)
+
+
+def stdlib_json_dumps(data: Dict[str, Any]) -> str:
+    """Сериализация записи стандартным модулем json"""
+    return json.dumps(data, ensure_ascii=False, default=str)
+
+
+if orjson is not None:
+    # datetime/dataclass отдаём в default=str — вывод совпадает со stdlib
+    _ORJSON_OPTIONS = (
+        orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+
+    def orjson_dumps(data: Dict[str, Any]) -> str:
+        """Сериализация записи через orjson с откатом на stdlib для неподдерживаемых значений"""
+        try:
+            return orjson.dumps(data, default=str, option=_ORJSON_OPTIONS).decode('utf-8')
+        except TypeError:
+            return stdlib_json_dumps(data)
+
+    default_json_dumps = orjson_dumps
+    JSON_BACKEND = 'orjson'
+else:
+    default_json_dumps = stdlib_json_dumps
+    JSON_BACKEND = 'json'
+
 
 class StructuredFormatter(logging.Formatter):
     """
     Форматтер для структурированного логирования
     Поддерживает как читаемый, так и JSON формат
+
+    Args:
+        json_format: Выводить JSON (иначе читаемая строка)
+        json_dumps: Функция сериализации dict -> str (по умолчанию orjson, если установлен)
     """
-    def __init__(self, json_format: bool = True):
+    def __init__(self, json_format: bool = True, json_dumps=None):
         super().__init__()
         self.json_format = json_format
+        self.json_dumps = json_dumps or default_json_dumps
     
     def format(self, record: logging.LogRecord) -> str:
-        # Базовые поля
-        timestamp = datetime.utcnow().isoformat() + 'Z'
+        record_dict = record.__dict__
+
+        # Базовые поля (время события, а не форматирования — оно выполняется в фоновом потоке)
+        timestamp = datetime.fromtimestamp(record.created, timezone.utc).replace(tzinfo=None).isoformat() + 'Z'
         level = record.levelname
         service = record.name
-        event = getattr(record, 'event', 'log_message')
+        event = record_dict.get('event', 'log_message')
         
-        # Собираем все дополнительные поля
         log_data: Dict[str, Any] = {
             'timestamp': timestamp,
             'level': level,
@@ -32,51 +100,131 @@ class StructuredFormatter(logging.Formatter):
             'event': event,
         }
         
-        # Добавляем дополнительные поля из record
-        for key, value in record.__dict__.items():
-            if key not in ['name', 'msg', 'args', 'created', 'filename', 'funcName',
-                          'levelname', 'levelno', 'lineno', 'module', 'msecs',
-                          'message', 'pathname', 'process', 'processName',
-                          'relativeCreated', 'thread', 'threadName', 'exc_info',
-                          'exc_text', 'stack_info', 'event']:
-                if value is not None:
-                    log_data[key] = value
+        # Дополнительные поля: пропускаем стандартные атрибуты конструктора LogRecord
+        # без проверки, остальное фильтруем по заранее собранному frozenset
+        reserved = _RESERVED_RECORD_ATTRS
+        for key, value in islice(record_dict.items(), len(_RECORD_INIT_ATTRS), None):
+            if value is not None and key not in reserved:
+                log_data[key] = value
         
         # Форматируем в JSON или читаемый формат
         if self.json_format:
-            return json.dumps(log_data, ensure_ascii=False, default=str)
+            return self.json_dumps(log_data)
+
+        # Читаемый формат
+        parts = [
+            f"[{timestamp}]",
+            f"{level:8}",
+            f"[{service:15}]",
+            f"{event:20}",
+        ]
+
+        extra_fields = [f"{key}={log_data[key]}" for key in _PRIORITY_KEYS if key in log_data]
+        extra_fields.extend(
+            f"{key}={value}" for key, value in log_data.items() if key not in _READABLE_SKIP_KEYS
+        )
+        if extra_fields:
+            parts.append(" ".join(extra_fields))
+
+        # Добавляем основное сообщение если есть
+        if record.getMessage():
+            parts.append("-")
+
+        return " ".join(parts)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler для неблокирующего логирования.
+
+    В потоке event loop только кладёт запись в ограниченную очередь:
+    форматирование и запись в stdout выполняет фоновый QueueListener.
+    При переполненной очереди запись отбрасывается и учитывается в метрике.
+    Если слушатель остановлен (после shutdown_logging), запись выводится синхронно.
+    """
+
+    def __init__(self, log_queue: queue.Queue, target: logging.Handler):
+        super().__init__(log_queue)
+        self.target = target
+        self.listening = False
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Форматирование откладываем до фонового потока
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED_TOTAL.labels(level=record.levelname).inc()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self.listening:
+            super().emit(record)
         else:
-            # Читаемый формат
-            parts = [
-                f"[{timestamp}]",
-                f"{level:8}",
-                f"[{service:15}]",
-                f"{event:20}",
-            ]
-            
-            # Добавляем дополнительные поля
-            extra_fields = []
-            
-            # Приоритетные поля (показываем первыми)
-            priority_keys = ['request_id', 'user_id', 'status', 'duration_ms', 'error']
-            for key in priority_keys:
-                if key in log_data and key not in ['timestamp', 'level', 'service', 'event']:
-                    value = log_data[key]
-                    extra_fields.append(f"{key}={value}")
-            
-            # Остальные поля
-            for key, value in log_data.items():
-                if key not in ['timestamp', 'level', 'service', 'event'] + priority_keys:
-                    extra_fields.append(f"{key}={value}")
-            
-            if extra_fields:
-                parts.append(" ".join(extra_fields))
-            
-            # Добавляем основное сообщение если есть
-            if record.getMessage():
-                parts.append("-")
-            
-            return " ".join(parts)
+            self.target.handle(record)
+
+
+# Конвейеры логирования по формату вывода: json_format -> (handler, listener)
+_pipelines: Dict[bool, tuple] = {}
+_pipelines_lock = threading.Lock()
+
+
+def _get_queue_handler(json_format: bool) -> DroppingQueueHandler:
+    """
+    Возвращает общий QueueHandler для формата, запуская фоновый слушатель при первом вызове
+    """
+    with _pipelines_lock:
+        if json_format in _pipelines:
+            return _pipelines[json_format][0]
+
+        import config
+
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setFormatter(StructuredFormatter(json_format=json_format))
+
+        log_queue = queue.Queue(maxsize=getattr(config, 'LOG_QUEUE_MAX_SIZE', 10000))
+        queue_handler = DroppingQueueHandler(log_queue, stream_handler)
+        listener = logging.handlers.QueueListener(log_queue, stream_handler)
+        listener.start()
+        queue_handler.listening = True
+
+        LOG_QUEUE_SIZE.set_function(
+            lambda: sum(h.queue.qsize() for h, _ in _pipelines.values())
+        )
+        _pipelines[json_format] = (queue_handler, listener)
+        return queue_handler
+
+
+def _disable_listeners_after_fork() -> None:
+    # В дочернем процессе фоновых потоков нет — пишем синхронно
+    for queue_handler, _ in _pipelines.values():
+        queue_handler.listening = False
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_disable_listeners_after_fork)
+
+
+def shutdown_logging() -> None:
+    """
+    Дописывает накопленные в очереди записи и останавливает фоновые слушатели.
+    После остановки логи выводятся синхронно в вызывающем потоке.
+    """
+    with _pipelines_lock:
+        for queue_handler, listener in _pipelines.values():
+            if queue_handler.listening:
+                queue_handler.listening = False
+                listener.stop()
+                try:
+                    queue_handler.target.flush()
+                except (ValueError, OSError):
+                    # Поток вывода уже закрыт (например, при завершении интерпретатора)
+                    pass
+
+
+# Потоки слушателей — демоны; дописываем очередь и при обычном выходе из процесса
+atexit.register(shutdown_logging)
 
 
 def get_logger(service: str, json_format: Optional[bool] = None) -> logging.Logger:
@@ -101,15 +249,8 @@ def get_logger(service: str, json_format: Optional[bool] = None) -> logging.Logg
         import config
         json_format = getattr(config, 'JSON_LOG_FORMAT', False)
     
-    # Создаем форматтер
-    formatter = StructuredFormatter(json_format=json_format)
-    
-    # Создаем handler для вывода в консоль
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setFormatter(formatter)
-    
-    # Настраиваем логгер
-    logger.addHandler(handler)
+    # Запись в консоль идёт через очередь и фоновый поток
+    logger.addHandler(_get_queue_handler(bool(json_format)))
     
     # Устанавливаем уровень логирования
     import config
@@ -122,6 +263,71 @@ def get_logger(service: str, json_format: Optional[bool] = None) -> logging.Logg
     return logger
 
 
+class EventLimit:
+    """
+    Правило сэмплирования и ограничения частоты для одного события.
+
+    Args:
+        sample_rate: Доля сохраняемых событий (0..1)
+        max_per_second: Максимум событий в секунду (None — без ограничения)
+    """
+    __slots__ = ('sample_rate', 'max_per_second', '_window', '_count')
+
+    def __init__(self, sample_rate: float = 1.0, max_per_second: Optional[int] = None):
+        self.sample_rate = sample_rate
+        self.max_per_second = max_per_second
+        self._window = 0
+        self._count = 0
+
+    def check(self) -> Optional[str]:
+        """Возвращает причину подавления события или None, если событие нужно записать"""
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return 'sampled'
+        if self.max_per_second is not None:
+            window = int(time.monotonic())
+            if window != self._window:
+                self._window = window
+                self._count = 0
+            if self._count >= self.max_per_second:
+                return 'rate_limited'
+            self._count += 1
+        return None
+
+
+_event_limits: Optional[Dict[str, EventLimit]] = None
+
+
+def configure_event_limits(limits: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+    """
+    Задаёт таблицу сэмплирования/лимитов событий.
+    Без аргумента берётся config.LOG_EVENT_LIMITS.
+    """
+    global _event_limits
+    if limits is None:
+        import config
+        limits = getattr(config, 'LOG_EVENT_LIMITS', {})
+    _event_limits = {event: EventLimit(**rule) for event, rule in limits.items()}
+
+
+def _suppress_event(event: str, extra: Optional[Dict[str, Any]] = None) -> bool:
+    """
+    Применяет правило события из таблицы лимитов.
+    Подавленные события учитываются в метрике log_events_suppressed_total.
+    """
+    if _event_limits is None:
+        configure_event_limits()
+    rule = _event_limits.get(event)
+    if rule is None:
+        return False
+    reason = rule.check()
+    if reason is not None:
+        LOG_EVENTS_SUPPRESSED_TOTAL.labels(event=event, reason=reason).inc()
+        return True
+    if extra is not None and rule.sample_rate < 1.0:
+        extra['sample_rate'] = rule.sample_rate
+    return False
+
+
 def log_event(
     logger: logging.Logger,
     event: str,
@@ -143,7 +349,13 @@ def log_event(
         duration_ms: Длительность операции в миллисекундах
         **kwargs: Дополнительные поля для лога
     """
+    # Уровень отключён — не собираем extra
+    if not logger.isEnabledFor(level):
+        return
+
     extra = {'event': event}
+    if _suppress_event(event, extra):
+        return
     
     if request_id is not None:
         extra['request_id'] = request_id
@@ -173,6 +385,9 @@ def log_command(
         request_id: ID запроса
         **kwargs: Дополнительные поля
     """
+    if not logger.isEnabledFor(logging.INFO):
+        return
+
     extra = {
         'event': 'command_executed',
         'command': command,
@@ -240,6 +455,9 @@ def log_database_operation(
         request_id: ID запроса
         **kwargs: Дополнительные поля (query, rows_returned и т.д.)
     """
+    if not logger.isEnabledFor(logging.INFO):
+        return
+
     duration_ms = duration * 1000 if duration is not None else None
     
     extra = {
@@ -247,6 +465,8 @@ def log_database_operation(
         'action': operation,
         'status': 'success',
     }
+    if _suppress_event('database_operation', extra):
+        return
     
     if table is not None:
         extra['table'] = table
@@ -290,37 +510,113 @@ def log_performance(
     )
 
 
-def measure_time(func):
+class measure_time:
     """
-    Декоратор для измерения времени выполнения функции
+    Измеряет длительность операции и пишет её в гистограмму operation_duration_seconds.
+
+    Работает как декоратор (sync и async функций, в том числе sync-рендеров,
+    выполняемых в ThreadPoolExecutor) и как контекстный менеджер.
+    Время считается через time.perf_counter().
+
+    Использование:
+        @measure_time
+        def _render_pie_chart(...): ...
+
+        @measure_time("perform_export", logger=logger, slow_threshold=2.0)
+        async def perform_export(...): ...
+
+        with measure_time("month_pie_chart") as timer:
+            path = await visualization.create_monthly_pie_chart(...)
+        log_event(logger, "chart_sent", duration=timer.duration)
+
+        Внутри функции под декоратором её таймер доступен через measure_time.current():
+        timer.elapsed для логов, timer.status = 'error' для перехваченных ошибок.
+
+    Args:
+        operation: Имя операции (label в метрике); по умолчанию module.qualname функции
+        logger: Логгер для медленных вызовов (через log_performance)
+        slow_threshold: Порог в секундах; вызовы дольше логируются, если задан logger
+        **log_fields: Дополнительные поля для лога медленного вызова
+
+    В отдельных процессах метрики видны только при multiprocess-режиме prometheus_client
+    (PROMETHEUS_MULTIPROC_DIR); в потоках работают без настройки.
     """
-    import functools
-    import time
-    
-    @functools.wraps(func)
-    async def async_wrapper(*args, **kwargs):
-        start_time = time.time()
-        try:
-            result = await func(*args, **kwargs)
-            duration = time.time() - start_time
-            return result
-        except Exception as e:
-            duration = time.time() - start_time
-            raise
-    
-    @functools.wraps(func)
-    def sync_wrapper(*args, **kwargs):
-        start_time = time.time()
-        try:
-            result = func(*args, **kwargs)
-            duration = time.time() - start_time
-            return result
-        except Exception as e:
-            duration = time.time() - start_time
-            raise
-    
-    import asyncio
-    if asyncio.iscoroutinefunction(func):
-        return async_wrapper
-    else:
+
+    _current: ContextVar[Optional['measure_time']] = ContextVar("measure_time_current", default=None)
+
+    def __new__(cls, operation=None, **kwargs):
+        if callable(operation):
+            # Вызов без скобок: @measure_time
+            return cls(**kwargs)(operation)
+        return super().__new__(cls)
+
+    def __init__(self, operation: Optional[str] = None, *, logger: Optional[logging.Logger] = None,
+                 slow_threshold: Optional[float] = None, **log_fields):
+        self.operation = operation
+        self.logger = logger
+        self.slow_threshold = slow_threshold
+        self.log_fields = log_fields
+        self.status = 'success'
+        self.duration: Optional[float] = None
+        self._start: Optional[float] = None
+        self._token = None
+
+    @property
+    def elapsed(self) -> float:
+        """Время в секундах с начала измерения (для логов внутри блока)"""
+        if self._start is None:
+            return 0.0
+        return time.perf_counter() - self._start
+
+    @classmethod
+    def current(cls) -> Optional['measure_time']:
+        """Самый внутренний активный таймер текущего контекста (None вне измерения)"""
+        return cls._current.get()
+
+    def __enter__(self) -> 'measure_time':
+        self.status = 'success'
+        self.duration = None
+        self._start = time.perf_counter()
+        self._token = self._current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self._current.reset(self._token)
+        if exc_type is not None:
+            self.status = 'error'
+        self._finish()
+        return False
+
+    def _finish(self) -> None:
+        self.duration = time.perf_counter() - self._start
+        operation = self.operation or 'unknown'
+        OPERATION_DURATION_SECONDS.labels(operation=operation, status=self.status).observe(self.duration)
+        if (self.logger is not None and self.slow_threshold is not None
+                and self.duration >= self.slow_threshold):
+            log_performance(self.logger, operation, self.duration, status=self.status,
+                            slow=True, slow_threshold=self.slow_threshold, **self.log_fields)
+
+    def _child(self) -> 'measure_time':
+        # Отдельный таймер на каждый вызов: декоратор может выполняться конкурентно
+        return measure_time(self.operation, logger=self.logger,
+                            slow_threshold=self.slow_threshold, **self.log_fields)
+
+    def _decorate(self, func):
+        if self.operation is None:
+            self.operation = f"{func.__module__}.{func.__qualname__}"
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with self._child():
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def sync_wrapper(*args, **kwargs):
+            with self._child():
+                return func(*args, **kwargs)
         return sync_wrapper
+
+    def __call__(self, func):
+        return self._decorate(func)
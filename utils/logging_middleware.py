@@ -1,9 +1,13 @@
 """
 Middleware для логирования всех входящих обновлений
 """
+import logging
 import uuid
 from telegram import Update
 from telegram.ext import ContextTypes, TypeHandler
+import config
+from metrics import UPDATE_DB_QUERIES, UPDATE_DB_SECONDS, current_handler
+from utils import db
 from utils.logger import get_logger, log_event
 
 logger = get_logger("telegram.updates")
@@ -21,6 +25,10 @@ async def log_update(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
     
     # Сохраняем в context для доступа из всех обработчиков
     context.user_data['request_id'] = request_id
+
+    # Новый подсчёт обращений к БД для этого update (см. log_update_stats)
+    db.begin_query_stats()
+    current_handler.set(None)
     
     user_id = update.effective_user.id if update.effective_user else None
     
@@ -55,5 +63,37 @@ async def log_update(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
         )
 
 
+async def log_update_stats(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    Завершает обработку update: пишет число запросов к БД и суммарное время БД
+    в гистограммы по обработчику и логирует итог (WARNING, если запросов
+    не меньше UPDATE_DB_QUERY_WARNING_THRESHOLD — признак N+1).
+    """
+    stats = db.current_query_stats()
+    if stats is None:
+        return
+
+    handler = current_handler.get() or "unhandled"
+    UPDATE_DB_QUERIES.labels(handler=handler).observe(stats.count)
+    UPDATE_DB_SECONDS.labels(handler=handler).observe(stats.duration)
+
+    too_many = stats.count >= config.UPDATE_DB_QUERY_WARNING_THRESHOLD
+    log_event(
+        logger,
+        "update_db_stats",
+        level=logging.WARNING if too_many else logging.DEBUG,
+        request_id=context.user_data.get('request_id') if context.user_data is not None else None,
+        status="warning" if too_many else "success",
+        user_id=update.effective_user.id if update.effective_user else None,
+        handler=handler,
+        db_queries=stats.count,
+        db_time_ms=round(stats.duration * 1000, 2),
+    )
+
+
 # Создаем handler для всех обновлений
 LoggingHandler = TypeHandler(Update, log_update)
+
+# Группа, выполняемая после всех обработчиков: итоги update по БД
+UPDATE_STATS_GROUP = 100
+UpdateStatsHandler = TypeHandler(Update, log_update_stats)
@@ -0,0 +1,255 @@
+"""
+Transactional outbox для уведомлений фоновых задач.
+
+Задачи планировщика (постоянные расходы и доходы, бюджет) не отправляют
+сообщения сами: add_notifications пишет их в notification_outbox на том же
+соединении и в той же транзакции, что и изменение данных. Если транзакция
+откатилась — сообщения нет; если процесс упал после коммита — сообщение
+дождётся отправки в таблице.
+
+Доставкой занимается отдельная задача (start_outbox_drainer): забирает
+строки пачками, собирает сообщения одного чата в дайджест, отправляет через
+очередь utils.notification_queue (ограничение скорости, RetryAfter)
+и удаляет доставленные. Пока идёт проход планировщика (notification_pass),
+drainer не берёт строки его источника, чтобы всё, что проход записал, ушло
+в чат одним сообщением; уведомления других источников (например,
+немедленная проверка бюджета после расхода) доставляются без задержки.
+Гарантия — at-least-once: при падении между отправкой и удалением
+сообщение будет отправлено повторно после истечения аренды. При штатной
+остановке (stop_outbox_drainer) текущая пачка дожидается результатов
+отправки и удаляется, новые пачки не берутся.
+"""
+
+import asyncio
+import contextlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from telegram.constants import MessageLimit
+
+import config
+from metrics import NOTIFICATION_DIGEST_MESSAGES
+from utils import db
+from utils.logger import get_logger, log_event, log_error
+from utils.notification_queue import deliver_notification
+
+logger = get_logger("utils.notification_outbox")
+
+_drainer_task: Optional[asyncio.Task] = None
+_wakeup: Optional[asyncio.Event] = None
+# Источники, чьи проходы планировщика сейчас идут: source -> число проходов
+_passes_running: Dict[str, int] = {}
+# Остановка запрошена: drainer заканчивает текущую пачку и выходит
+_stopping = False
+
+
+async def add_notifications(conn, messages: Iterable[Tuple[int, str]], source: str) -> None:
+    """
+    Записывает уведомления в outbox на соединении conn (внутри транзакции вызывающего).
+
+    Args:
+        conn: Соединение из db.transaction()
+        messages: Пары (chat_id, текст)
+        source: Источник уведомления (budget, recurring_expense, ...) — метка метрик
+    """
+    rows = [(int(chat_id), text, source) for chat_id, text in messages]
+    if not rows:
+        return
+    await conn.executemany(
+        """
+        INSERT INTO notification_outbox(chat_id, text, source)
+        VALUES ($1, $2, $3)
+        """,
+        rows,
+    )
+
+
+def wake_drainer() -> None:
+    """Будит задачу доставки сразу после коммита, не дожидаясь интервала опроса"""
+    if _wakeup is not None:
+        _wakeup.set()
+
+
+@contextlib.asynccontextmanager
+async def notification_pass(source: str):
+    """
+    Проход планировщика: пока он идёт, drainer не забирает строки с этим source,
+    а по окончании сразу будится — уведомления прохода уходят дайджестами.
+
+    Args:
+        source: Источник, с которым проход пишет уведомления (add_notifications)
+    """
+    _passes_running[source] = _passes_running.get(source, 0) + 1
+    try:
+        yield
+    finally:
+        _passes_running[source] -= 1
+        if not _passes_running[source]:
+            del _passes_running[source]
+        wake_drainer()
+
+
+def _digest_text(texts: List[str]) -> str:
+    if len(texts) == 1:
+        return texts[0]
+    return f"🔔 Уведомлений: {len(texts)}\n\n" + "\n\n".join(texts)
+
+
+def _fit_text(text: str) -> str:
+    """Обрезает одно уведомление до лимита Telegram: длиннее его не отправить"""
+    if len(text) <= MessageLimit.MAX_TEXT_LENGTH:
+        return text
+    return text[:MessageLimit.MAX_TEXT_LENGTH - 1] + "…"
+
+
+def _build_digests(rows) -> List[Tuple[int, str, str, List[int]]]:
+    """
+    Группирует строки outbox по чату в порядке записи.
+    Возвращает (chat_id, текст, source, id строк); дайджест длиннее лимита
+    Telegram делится на несколько сообщений, одно слишком длинное уведомление
+    обрезается.
+    """
+    by_chat: Dict[int, list] = {}
+    for row in sorted(rows, key=lambda r: r['id']):
+        row = {**row, 'text': _fit_text(row['text'])}
+        by_chat.setdefault(row['chat_id'], []).append(row)
+
+    digests = []
+    for chat_id, chat_rows in by_chat.items():
+        chunk: list = []
+        for row in chat_rows:
+            texts = [r['text'] for r in chunk] + [row['text']]
+            if chunk and len(_digest_text(texts)) > MessageLimit.MAX_TEXT_LENGTH:
+                digests.append(_digest(chat_id, chunk))
+                chunk = []
+            chunk.append(row)
+        digests.append(_digest(chat_id, chunk))
+    return digests
+
+
+def _digest(chat_id: int, rows: list) -> Tuple[int, str, str, List[int]]:
+    sources = {r['source'] for r in rows}
+    source = sources.pop() if len(sources) == 1 else "digest"
+    NOTIFICATION_DIGEST_MESSAGES.observe(len(rows))
+    return chat_id, _digest_text([r['text'] for r in rows]), source, [r['id'] for r in rows]
+
+
+async def drain_outbox(bot, batch_size: int = None) -> int:
+    """
+    Доставляет накопленные уведомления пачками, пока они есть.
+    Возвращает число доставленных уведомлений (строк outbox).
+    """
+    batch_size = batch_size or config.NOTIFY_OUTBOX_BATCH_SIZE
+    delivered_total = 0
+
+    while True:
+        # Строки берутся в аренду: параллельный или упавший drainer их не дублирует
+        # до истечения NOTIFY_OUTBOX_LEASE_SECONDS. Берутся все готовые строки
+        # чатов из первых batch_size строк, чтобы чат получил один дайджест.
+        # Строки источников с идущим проходом планировщика ждут его окончания
+        rows = await db.fetch(
+            """
+            UPDATE notification_outbox
+            SET available_at = now() + make_interval(secs => $3)
+            WHERE id IN (
+                SELECT id FROM notification_outbox
+                WHERE available_at <= now() AND attempts < $2
+                  AND source <> ALL($4::text[])
+                  AND chat_id IN (
+                      SELECT chat_id FROM notification_outbox
+                      WHERE available_at <= now() AND attempts < $2
+                        AND source <> ALL($4::text[])
+                      ORDER BY id
+                      LIMIT $1
+                  )
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING id, chat_id, text, source
+            """,
+            batch_size, config.NOTIFY_OUTBOX_MAX_ATTEMPTS, config.NOTIFY_OUTBOX_LEASE_SECONDS,
+            list(_passes_running),
+        )
+        if not rows:
+            break
+
+        digests = _build_digests(rows)
+        results = await asyncio.gather(*(
+            deliver_notification(bot, chat_id, text, source=source)
+            for chat_id, text, source, _ in digests
+        ))
+        delivered = [i for digest, ok in zip(digests, results) if ok for i in digest[3]]
+        failed = [i for digest, ok in zip(digests, results) if not ok for i in digest[3]]
+
+        if delivered:
+            await db.execute(
+                "DELETE FROM notification_outbox WHERE id = ANY($1::bigint[])",
+                delivered,
+            )
+        if failed:
+            await db.execute(
+                """
+                UPDATE notification_outbox
+                SET attempts = attempts + 1,
+                    available_at = now() + make_interval(secs => $2)
+                WHERE id = ANY($1::bigint[])
+                """,
+                failed, config.NOTIFY_OUTBOX_RETRY_SECONDS,
+            )
+
+        delivered_total += len(delivered)
+        log_event(logger, "outbox_batch_drained", claimed=len(rows), messages=len(digests),
+                  delivered=len(delivered), failed=len(failed))
+        if len(rows) < batch_size or _stopping:
+            break
+
+    return delivered_total
+
+
+async def _drain_loop(bot, interval: float) -> None:
+    while not _stopping:
+        try:
+            await drain_outbox(bot)
+        except Exception as e:
+            log_error(logger, e, "outbox_drain_error")
+        try:
+            await asyncio.wait_for(_wakeup.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+        _wakeup.clear()
+
+
+def start_outbox_drainer(bot) -> None:
+    """Запускает задачу доставки: опрос каждые NOTIFY_OUTBOX_POLL_SECONDS и по wake_drainer()"""
+    global _drainer_task, _wakeup, _stopping
+    if _drainer_task is None or _drainer_task.done():
+        _stopping = False
+        _wakeup = asyncio.Event()
+        _drainer_task = asyncio.get_running_loop().create_task(
+            _drain_loop(bot, config.NOTIFY_OUTBOX_POLL_SECONDS), name="notification_outbox_drainer"
+        )
+    log_event(logger, "outbox_drainer_started",
+              poll_seconds=config.NOTIFY_OUTBOX_POLL_SECONDS,
+              batch_size=config.NOTIFY_OUTBOX_BATCH_SIZE)
+
+
+async def stop_outbox_drainer(timeout: float = None) -> None:
+    """
+    Останавливает задачу доставки: новые строки не берутся, текущая пачка
+    дожидается результатов отправки (не дольше timeout) и удаляется из outbox —
+    иначе после перезапуска она ушла бы повторно. Невыданные строки остаются в таблице.
+    Вызывать до stop_notification_queue: пачку доставляет очередь.
+    """
+    global _drainer_task, _wakeup, _stopping
+    timeout = config.NOTIFY_DRAIN_TIMEOUT if timeout is None else timeout
+    if _drainer_task is not None:
+        _stopping = True
+        _wakeup.set()
+        done, _ = await asyncio.wait({_drainer_task}, timeout=timeout)
+        if not done:
+            log_event(logger, "outbox_drainer_stop_timeout", status="warning", timeout=timeout)
+            _drainer_task.cancel()
+            try:
+                await _drainer_task
+            except asyncio.CancelledError:
+                pass
+        _drainer_task = None
+        _wakeup = None
@@ -0,0 +1,317 @@
+"""
+Очередь исходящих уведомлений фоновых задач (бюджет, постоянные расходы и доходы).
+
+Задачи планировщика не отправляют сообщения сами, а кладут их в очередь
+и сразу продолжают работу. Сообщения отправляют несколько воркеров с
+ограничением скорости token bucket: общий лимит бота и лимит на чат.
+Сообщение в чат, исчерпавший свой лимит, откладывается таймером и
+возвращается в очередь к своему сроку — воркеры не спят на одном чате,
+пока остальные чаты ждут.
+RetryAfter (flood control) приостанавливает всех отправителей на указанное
+Telegram время, после чего сообщение отправляется повторно. Повторы после
+ошибок тоже откладываются таймером и заново проходят лимит чата.
+
+Метрики отдаются через общий endpoint start_http_server (см. metrics.py).
+"""
+
+import asyncio
+import datetime
+from typing import Dict, Hashable, Optional, Tuple
+
+from telegram.error import BadRequest, Forbidden, NetworkError, RetryAfter
+
+import config
+from metrics import (
+    NOTIFICATION_QUEUE_DEPTH,
+    NOTIFICATION_RETRIES_TOTAL,
+    NOTIFICATIONS_DROPPED_TOTAL,
+    NOTIFICATIONS_FAILED_TOTAL,
+    NOTIFICATIONS_SENT_TOTAL,
+)
+from utils.logger import get_logger, log_event, log_error
+
+logger = get_logger("utils.notification_queue")
+
+# Сколько корзин чатов держать, прежде чем удалить простаивающие
+_CHAT_BUCKETS_PRUNE_AT = 10_000
+
+_queue: Optional["NotificationQueue"] = None
+
+
+class TokenBucket:
+    """
+    Token bucket с резервированием: reserve() сразу забирает токен и возвращает,
+    сколько секунд подождать до отправки. Уходя в минус, корзина выдаёт
+    задержки строго по порядку вызовов, поэтому блокировки не нужны.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated: Optional[float] = None
+
+    def _refill(self, now: float) -> None:
+        if self._updated is not None:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, now: float) -> float:
+        """Забирает токен; возвращает задержку (секунды) до момента, когда он доступен"""
+        self._refill(now)
+        self._tokens -= 1
+        return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def idle(self, now: float) -> bool:
+        """Корзина полна — её можно удалить без потери ограничения"""
+        self._refill(now)
+        return self._tokens >= self.capacity
+
+
+def _retry_after_seconds(error: RetryAfter) -> float:
+    value = error.retry_after
+    if isinstance(value, datetime.timedelta):
+        return value.total_seconds()
+    return float(value)
+
+
+class NotificationQueue:
+    """Ограниченная очередь сообщений и пул воркеров, отправляющих их через bot.send_message"""
+
+    def __init__(self, bot, senders: int = None, maxsize: int = None,
+                 global_rate: float = None, chat_rate: float = None,
+                 chat_burst: float = None, max_retries: int = None):
+        self.bot = bot
+        self.senders = senders or config.NOTIFY_SENDERS
+        self.max_retries = config.NOTIFY_MAX_RETRIES if max_retries is None else max_retries
+        global_rate = global_rate or config.NOTIFY_GLOBAL_RATE
+        self.chat_rate = chat_rate or config.NOTIFY_CHAT_RATE
+        self.chat_burst = chat_burst or config.NOTIFY_CHAT_BURST
+        self.maxsize = config.NOTIFY_QUEUE_MAXSIZE if maxsize is None else maxsize
+        # Сама очередь без ограничения: отложенные сообщения возвращаются в неё
+        # без QueueFull, лимит maxsize проверяется в _put вместе с отложенными
+        self._queue: asyncio.Queue = asyncio.Queue()
+        # Отложенные сообщения чатов, исчерпавших лимит: таймер -> сообщение
+        self._deferred: Dict[asyncio.TimerHandle, tuple] = {}
+        self._global_bucket = TokenBucket(global_rate, global_rate)
+        self._chat_buckets: Dict[Hashable, TokenBucket] = {}
+        self._paused_until = 0.0
+        self._workers: list = []
+        NOTIFICATION_QUEUE_DEPTH.set_function(self.depth)
+
+    def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._workers = [
+            loop.create_task(self._worker(), name=f"notification_sender_{i}")
+            for i in range(self.senders)
+        ]
+
+    def depth(self) -> int:
+        """Сообщений в очереди, включая отложенные по лимиту чата"""
+        return self._queue.qsize() + len(self._deferred)
+
+    def enqueue(self, chat_id, text: str, source: str, **kwargs) -> bool:
+        """Кладёт сообщение в очередь; при переполнении сообщение отбрасывается"""
+        return self._put(source, chat_id, text, kwargs, None)
+
+    def submit(self, chat_id, text: str, source: str, **kwargs) -> Optional[asyncio.Future]:
+        """
+        Как enqueue, но возвращает future с результатом доставки (True/False).
+        None — очередь переполнена и сообщение не принято.
+        """
+        future = asyncio.get_running_loop().create_future()
+        return future if self._put(source, chat_id, text, kwargs, future) else None
+
+    def _put(self, source: str, chat_id, text: str, kwargs: dict,
+             future: Optional[asyncio.Future]) -> bool:
+        if self.maxsize > 0 and self.depth() >= self.maxsize:
+            NOTIFICATIONS_DROPPED_TOTAL.labels(source=source, reason="queue_full").inc()
+            log_event(logger, "notification_dropped", status="warning",
+                      source=source, chat_id=chat_id, reason="queue_full")
+            return False
+        # Последние элементы — зарезервирован ли уже слот в лимите чата (см. _worker)
+        # и номер попытки отправки
+        self._queue.put_nowait((source, chat_id, text, kwargs, future, False, 0))
+        return True
+
+    def _defer(self, delay: float, item: tuple) -> None:
+        """
+        Возвращает сообщение в очередь через delay секунд. Сообщение остаётся
+        незавершённым для join(): task_done вызывается только после отправки.
+        """
+        loop = asyncio.get_running_loop()
+        handle = loop.call_later(delay, lambda: self._release(handle))
+        self._deferred[handle] = item
+
+    def _release(self, handle: asyncio.TimerHandle) -> None:
+        item = self._deferred.pop(handle, None)
+        if item is not None:
+            # put_nowait увеличивает счётчик незавершённых, а сообщение уже учтено
+            self._queue.put_nowait(item)
+            self._queue.task_done()
+
+    async def stop(self, timeout: float = None) -> None:
+        """Дожидается отправки очереди (не дольше timeout) и останавливает воркеров"""
+        timeout = config.NOTIFY_DRAIN_TIMEOUT if timeout is None else timeout
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        remaining = []
+        for handle, item in self._deferred.items():
+            handle.cancel()
+            remaining.append(item)
+        self._deferred.clear()
+        while not self._queue.empty():
+            remaining.append(self._queue.get_nowait())
+            self._queue.task_done()
+
+        dropped = 0
+        for source, *_, future, _reserved, _attempt in remaining:
+            _resolve(future, False)
+            NOTIFICATIONS_DROPPED_TOTAL.labels(source=source, reason="shutdown").inc()
+            dropped += 1
+        if dropped:
+            log_event(logger, "notification_queue_stopped", status="warning", dropped=dropped)
+
+    def _chat_bucket(self, chat_id, now: float) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self._chat_buckets) >= _CHAT_BUCKETS_PRUNE_AT:
+                self._chat_buckets = {
+                    key: b for key, b in self._chat_buckets.items() if not b.idle(now)
+                }
+            bucket = self._chat_buckets[chat_id] = TokenBucket(self.chat_rate, self.chat_burst)
+        return bucket
+
+    async def _wait_for_slot(self) -> None:
+        """Ждёт общий лимит бота и паузу после RetryAfter"""
+        loop = asyncio.get_running_loop()
+        delay = max(self._global_bucket.reserve(loop.time()), self._paused_until - loop.time())
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._queue.get()
+            source, chat_id, text, kwargs, future, reserved, attempt = item
+            if not reserved:
+                # Резервируем слот чата сразу: задержки выдаются по порядку,
+                # поэтому отложенные сообщения одного чата не перемешиваются
+                now = loop.time()
+                delay = self._chat_bucket(chat_id, now).reserve(now)
+                if delay > 0:
+                    self._defer(delay, (source, chat_id, text, kwargs, future, True, attempt))
+                    continue
+            delivered, retry_in = False, None
+            try:
+                delivered, retry_in = await self._deliver(source, chat_id, text, kwargs, attempt)
+            except Exception as e:
+                log_error(logger, e, "notification_worker_error", source=source)
+            finally:
+                if retry_in is not None:
+                    # Повтор ждёт таймером, а не в воркере, и снова проходит лимит чата
+                    self._defer(retry_in, (source, chat_id, text, kwargs, future, False, attempt + 1))
+                else:
+                    self._queue.task_done()
+                    _resolve(future, delivered)
+
+    async def _deliver(self, source: str, chat_id, text: str, kwargs: dict,
+                       attempt: int) -> Tuple[bool, Optional[float]]:
+        """
+        Одна попытка отправки. Возвращает (доставлено, через сколько секунд
+        повторить); None вместо задержки — повторов больше не будет.
+        """
+        loop = asyncio.get_running_loop()
+        await self._wait_for_slot()
+        try:
+            await self.bot.send_message(chat_id=chat_id, text=text, **kwargs)
+            NOTIFICATIONS_SENT_TOTAL.labels(source=source).inc()
+            return True, None
+        except RetryAfter as e:
+            # Flood control касается всего бота — ставим на паузу всех отправителей
+            retry_in = _retry_after_seconds(e)
+            self._paused_until = max(self._paused_until, loop.time() + retry_in)
+            error, reason = e, "RetryAfter"
+        except (Forbidden, BadRequest) as e:
+            # Бот заблокирован или сообщение некорректно — повтор не поможет
+            error, reason = e, None
+        except NetworkError as e:
+            retry_in = min(2 ** attempt, 30)
+            error, reason = e, "NetworkError"
+        except Exception as e:
+            error, reason = e, None
+
+        if reason is not None and attempt < self.max_retries:
+            NOTIFICATION_RETRIES_TOTAL.labels(source=source, reason=reason).inc()
+            return False, retry_in
+
+        NOTIFICATIONS_FAILED_TOTAL.labels(source=source, error=error.__class__.__name__).inc()
+        log_error(logger, error, "notification_send_failed",
+                  source=source, chat_id=chat_id, attempts=attempt + 1)
+        return False, None
+
+
+def _resolve(future: Optional[asyncio.Future], delivered: bool) -> None:
+    if future is not None and not future.done():
+        future.set_result(delivered)
+
+
+async def _send_now(bot, chat_id, text: str, source: str, **kwargs) -> bool:
+    """Отправка без очереди; ошибка только логируется"""
+    try:
+        await bot.send_message(chat_id=chat_id, text=text, **kwargs)
+        NOTIFICATIONS_SENT_TOTAL.labels(source=source).inc()
+        return True
+    except Exception as e:
+        NOTIFICATIONS_FAILED_TOTAL.labels(source=source, error=e.__class__.__name__).inc()
+        log_error(logger, e, "notification_send_failed", source=source, chat_id=chat_id, attempts=1)
+        return False
+
+
+async def send_notification(bot, chat_id, text: str, source: str, **kwargs) -> None:
+    """
+    Отправляет уведомление фоновой задачи через очередь.
+    Пока очередь не запущена (скрипты, тесты), отправляет сразу;
+    ошибка отправки только логируется.
+    """
+    if _queue is not None:
+        _queue.enqueue(chat_id, text, source, **kwargs)
+        return
+    await _send_now(bot, chat_id, text, source, **kwargs)
+
+
+async def deliver_notification(bot, chat_id, text: str, source: str, **kwargs) -> bool:
+    """
+    Отправляет уведомление через очередь и дожидается результата.
+    Возвращает True, если сообщение доставлено.
+    """
+    if _queue is not None:
+        future = _queue.submit(chat_id, text, source, **kwargs)
+        return await future if future is not None else False
+    return await _send_now(bot, chat_id, text, source, **kwargs)
+
+
+def start_notification_queue(bot) -> None:
+    """Запускает очередь и воркеров отправки"""
+    global _queue
+    if _queue is None:
+        _queue = NotificationQueue(bot)
+        _queue.start()
+    log_event(logger, "notification_queue_started",
+              senders=_queue.senders, global_rate=config.NOTIFY_GLOBAL_RATE,
+              chat_rate=config.NOTIFY_CHAT_RATE, maxsize=config.NOTIFY_QUEUE_MAXSIZE)
+
+
+async def stop_notification_queue() -> None:
+    """Досылает очередь и останавливает воркеров"""
+    global _queue
+    if _queue is not None:
+        queue, _queue = _queue, None
+        await queue.stop()
@@ -3,6 +3,7 @@ Role-based access control for shared projects.
 Defines permissions for different user roles in projects.
 """
 
+import logging
 from typing import Optional
 from typing import Set
 from enum import Enum
@@ -108,7 +109,7 @@ async def has_permission(
         # Get user's role in the project
         role = await projects.get_user_role_in_project(user_id, project_id)
         
-        log_event(logger, "permission_check_debug",
+        log_event(logger, "permission_check_debug", level=logging.DEBUG,
                  user_id=user_id, project_id=project_id,
                  role=role, permission=permission.value)
         
@@ -122,11 +123,13 @@ async def has_permission(
         role_perms = ROLE_PERMISSIONS.get(role, set())
         has_perm = permission in role_perms
         
-        log_event(logger, "permission_check_result",
-                 user_id=user_id, project_id=project_id,
-                 role=role, permission=permission.value,
-                 has_permission=has_perm,
-                 role_permissions=[p.value for p in role_perms])
+        # Список прав роли собираем только если DEBUG включён
+        if logger.isEnabledFor(logging.DEBUG):
+            log_event(logger, "permission_check_result", level=logging.DEBUG,
+                     user_id=user_id, project_id=project_id,
+                     role=role, permission=permission.value,
+                     has_permission=has_perm,
+                     role_permissions=[p.value for p in role_perms])
         
         if not has_perm:
             log_event(logger, "permission_denied_insufficient_role",
@@ -0,0 +1,143 @@
+"""
+Профилирование работающего бота без отладчика.
+
+- SamplingProfiler: сэмплирующий профайлер всех потоков процесса (поток event loop,
+  пул рендеринга, слушатель логов). Раз в interval снимает стеки через
+  sys._current_frames() и агрегирует их в collapsed-формат
+  ("поток;модуль:функция;... N"), который понимают flamegraph.pl и speedscope.
+- memory_diff: разница двух снимков tracemalloc за заданный интервал —
+  для поиска роста памяти в долгоживущих контейнерах.
+"""
+
+import asyncio
+import linecache
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Optional
+
+MAX_PROFILE_SECONDS = 60
+DEFAULT_SAMPLE_INTERVAL = 0.005
+
+# Одновременно допускается только одно профилирование. Lock создаётся
+# в работающем loop: на Python 3.9 он привязывается к loop при создании
+_profile_lock: Optional[asyncio.Lock] = None
+
+
+def _lock() -> asyncio.Lock:
+    global _profile_lock
+    if _profile_lock is None:
+        _profile_lock = asyncio.Lock()
+    return _profile_lock
+
+
+def is_running() -> bool:
+    """Выполняется ли сейчас профилирование"""
+    return _profile_lock is not None and _profile_lock.locked()
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get('__name__', code.co_filename)
+    return f"{module}:{code.co_name}"
+
+
+class SamplingProfiler:
+    """Сэмплирующий профайлер: фоновый поток периодически снимает стеки всех потоков"""
+
+    def __init__(self, interval: float = DEFAULT_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.sample(exclude=own_id)
+
+    def sample(self, exclude: Optional[int] = None) -> None:
+        """Снимает стеки всех потоков (кроме exclude) и добавляет их в агрегат"""
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == exclude:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            stack.append(names.get(thread_id, str(thread_id)))
+            self.stacks[';'.join(reversed(stack))] += 1
+        self.samples += 1
+
+    def collapsed(self) -> str:
+        """Результат в collapsed-stack формате (по одной строке на уникальный стек)"""
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+async def profile_cpu(seconds: float, interval: float = DEFAULT_SAMPLE_INTERVAL) -> SamplingProfiler:
+    """Профилирует процесс seconds секунд, не блокируя event loop"""
+    seconds = min(max(seconds, 0.1), MAX_PROFILE_SECONDS)
+    async with _lock():
+        profiler = SamplingProfiler(interval)
+        profiler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            # join занимает не больше одного interval
+            profiler.stop()
+    return profiler
+
+
+def _format_memory_diff(stats, limit: int) -> str:
+    lines = []
+    for stat in stats[:limit]:
+        frame = stat.traceback[0]
+        lines.append(
+            f"{frame.filename}:{frame.lineno}: {stat.size_diff / 1024:+.1f} KiB "
+            f"(итого {stat.size / 1024:.1f} KiB, {stat.count_diff:+d} блоков)"
+        )
+        source = linecache.getline(frame.filename, frame.lineno).strip()
+        if source:
+            lines.append(f"    {source}")
+    return '\n'.join(lines) + '\n'
+
+
+async def memory_diff(seconds: float, limit: int = 30) -> str:
+    """
+    Снимает два снимка tracemalloc с интервалом seconds и возвращает
+    топ строк кода по приросту памяти. Если tracemalloc не был включён,
+    он включается на время замера (учитываются только новые выделения).
+    """
+    seconds = min(max(seconds, 0.1), MAX_PROFILE_SECONDS)
+    loop = asyncio.get_running_loop()
+    async with _lock():
+        started_here = not tracemalloc.is_tracing()
+        if started_here:
+            tracemalloc.start()
+        try:
+            # Снимок обходит все трассируемые блоки — делаем его вне event loop
+            before = await loop.run_in_executor(None, tracemalloc.take_snapshot)
+            started = time.monotonic()
+            await asyncio.sleep(seconds)
+            after = await loop.run_in_executor(None, tracemalloc.take_snapshot)
+            elapsed = time.monotonic() - started
+        finally:
+            if started_here:
+                tracemalloc.stop()
+
+    stats = await loop.run_in_executor(None, after.compare_to, before, 'lineno')
+    header = f"tracemalloc diff за {elapsed:.1f} с, топ {limit} по приросту\n\n"
+    return header + _format_memory_diff(stats, limit)
@@ -5,11 +5,11 @@
 
 import os
 import datetime
-import pandas as pd
+import logging
 import secrets
 import config
 from typing import Optional, Dict
-from . import db
+from . import db, queries
 from utils.logger import get_logger, log_event, log_error
 
 from telegram import Update
@@ -40,8 +40,8 @@ async def create_project(user_id: int, project_name: str) -> dict:
     Create a new project. The creator becomes the owner.
     Owner is added to project_members for consistency (optional but recommended).
     """
-    await db.execute(
-        "INSERT INTO users(user_id) VALUES($1) ON CONFLICT (user_id) DO NOTHING",
+    await db.execute_named(
+        queries.ENSURE_USER,
         str(user_id),
     )
     
@@ -145,15 +145,8 @@ async def get_project_by_id(user_id: int, project_id: int) -> Optional[dict]:
     Возвращает проект по ID, если пользователь имеет к нему доступ
     (является владельцем или участником в project_members).
     """
-    row = await db.fetchrow(
-        """
-        SELECT p.project_id, p.project_name, p.created_date,
-               p.user_id as owner_id,
-               pm.role
-        FROM projects p
-        JOIN project_members pm ON pm.project_id = p.project_id AND pm.user_id = $1
-        WHERE p.project_id = $2 AND p.deleted_at IS NULL
-        """,
+    row = await db.fetchrow_named(
+        queries.GET_PROJECT_BY_ID,
         str(user_id), project_id
     )
     if not row:
@@ -202,13 +195,8 @@ async def is_project_member(user_id: int, project_id: int) -> bool:
     Проверяет, имеет ли пользователь доступ к проекту
     (является владельцем или участником в project_members).
     """
-    row = await db.fetchrow(
-        """
-        SELECT 1
-        FROM projects p
-        JOIN project_members pm ON pm.project_id = p.project_id AND pm.user_id = $1
-        WHERE p.project_id = $2 AND p.deleted_at IS NULL
-        """,
+    row = await db.fetchrow_named(
+        queries.IS_PROJECT_MEMBER,
         str(user_id), project_id
     )
     return row is not None
@@ -220,31 +208,19 @@ async def get_user_role_in_project(user_id: int, project_id: int) -> Optional[st
     """
     from utils.logger import log_event
     
-    row = await db.fetchrow(
-        """
-        SELECT 
-            p.user_id as owner_id,
-            pm.user_id as member_id,
-            pm.role as member_role,
-            CASE 
-                WHEN p.user_id = $1 THEN 'owner'
-                WHEN pm.role IS NOT NULL THEN pm.role
-                ELSE NULL 
-            END as role
-        FROM projects p
-        LEFT JOIN project_members pm ON p.project_id = pm.project_id AND pm.user_id = $1
-        WHERE p.project_id = $2 AND p.deleted_at IS NULL
-        """,
+    row = await db.fetchrow_named(
+        queries.GET_USER_ROLE_IN_PROJECT,
         str(user_id), project_id
     )
 
-    log_event(logger, "get_user_role_in_project_debug",
-             user_id=user_id, project_id=project_id,
-             row_found=row is not None,
-             owner_id=row['owner_id'] if row else None,
-             member_id=row['member_id'] if row else None,
-             member_role=row['member_role'] if row else None,
-             computed_role=row['role'] if row else None)
+    if logger.isEnabledFor(logging.DEBUG):
+        log_event(logger, "get_user_role_in_project_debug", level=logging.DEBUG,
+                 user_id=user_id, project_id=project_id,
+                 row_found=row is not None,
+                 owner_id=row['owner_id'] if row else None,
+                 member_id=row['member_id'] if row else None,
+                 member_role=row['member_role'] if row else None,
+                 computed_role=row['role'] if row else None)
     
     return row['role'] if row else None
 
@@ -278,8 +254,8 @@ async def set_active_project(user_id: int, project_id: Optional[int]) -> dict:
     """
     Set user's active project. Validates that user has access to the project.
     """
-    await db.execute(
-        "INSERT INTO users(user_id) VALUES($1) ON CONFLICT (user_id) DO NOTHING",
+    await db.execute_named(
+        queries.ENSURE_USER,
         str(user_id),
     )
     
@@ -310,8 +286,8 @@ async def set_active_project(user_id: int, project_id: Optional[int]) -> dict:
 
 
 async def get_active_project(user_id: int) -> Optional[dict]:
-    row = await db.fetchrow(
-        "SELECT active_project_id FROM users WHERE user_id = $1",
+    row = await db.fetchrow_named(
+        queries.GET_ACTIVE_PROJECT_ID,
         str(user_id)
     )
     if not row or row['active_project_id'] is None:
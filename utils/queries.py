@@ -0,0 +1,257 @@
+"""
+Каталог именованных SQL-запросов горячего пути.
+Каждый запрос подготавливается один раз на соединение при его создании
+(см. utils.db.init_pool) и выполняется по имени через db.*_named.
+Текст запросов хранится только здесь.
+"""
+
+# ── Пользователи ─────────────────────────────────────────────
+ENSURE_USER = "ensure_user"
+GET_ACTIVE_PROJECT_ID = "get_active_project_id"
+
+# ── Проекты и роли ───────────────────────────────────────────
+GET_USER_ROLE_IN_PROJECT = "get_user_role_in_project"
+GET_PROJECT_BY_ID = "get_project_by_id"
+IS_PROJECT_MEMBER = "is_project_member"
+
+# ── Категории ────────────────────────────────────────────────
+CATEGORIES_FOR_PROJECT = "categories_for_project"
+CATEGORIES_PERSONAL = "categories_personal"
+CATEGORY_BY_ID_FOR_USER = "category_by_id_for_user"
+CATEGORY_BY_ID_ONLY = "category_by_id_only"
+PROVISION_SYSTEM_CATEGORIES = "provision_system_categories"
+PROVISION_SYSTEM_INCOME_CATEGORIES = "provision_system_income_categories"
+
+# ── Расходы ──────────────────────────────────────────────────
+INSERT_EXPENSE = "insert_expense"
+MONTH_EXPENSES_PROJECT = "month_expenses_project"
+MONTH_EXPENSES_PERSONAL = "month_expenses_personal"
+DAY_EXPENSES_PROJECT = "day_expenses_project"
+DAY_EXPENSES_PERSONAL = "day_expenses_personal"
+CATEGORY_EXPENSES_PROJECT = "category_expenses_project"
+CATEGORY_EXPENSES_PERSONAL = "category_expenses_personal"
+
+
+STATEMENTS = {
+    ENSURE_USER: """
+        INSERT INTO users(user_id) VALUES($1) ON CONFLICT (user_id) DO NOTHING
+    """,
+    GET_ACTIVE_PROJECT_ID: """
+        SELECT active_project_id FROM users WHERE user_id = $1
+    """,
+
+    GET_USER_ROLE_IN_PROJECT: """
+        SELECT
+            p.user_id as owner_id,
+            pm.user_id as member_id,
+            pm.role as member_role,
+            CASE
+                WHEN p.user_id = $1 THEN 'owner'
+                WHEN pm.role IS NOT NULL THEN pm.role
+                ELSE NULL
+            END as role
+        FROM projects p
+        LEFT JOIN project_members pm ON p.project_id = pm.project_id AND pm.user_id = $1
+        WHERE p.project_id = $2 AND p.deleted_at IS NULL
+    """,
+    GET_PROJECT_BY_ID: """
+        SELECT p.project_id, p.project_name, p.created_date,
+               p.user_id as owner_id,
+               pm.role
+        FROM projects p
+        JOIN project_members pm ON pm.project_id = p.project_id AND pm.user_id = $1
+        WHERE p.project_id = $2 AND p.deleted_at IS NULL
+    """,
+    IS_PROJECT_MEMBER: """
+        SELECT 1
+        FROM projects p
+        JOIN project_members pm ON pm.project_id = p.project_id AND pm.user_id = $1
+        WHERE p.project_id = $2 AND p.deleted_at IS NULL
+    """,
+
+    CATEGORIES_FOR_PROJECT: """
+        WITH deduplicated AS (
+            SELECT DISTINCT ON (LOWER(c.name))
+                   c.category_id, c.name, c.is_system, c.is_active,
+                   c.project_id, c.created_at, c.user_id
+            FROM categories c
+            WHERE c.is_active = TRUE
+              AND (
+                c.project_id = $1
+                OR (c.project_id IS NULL AND c.user_id = (
+                    SELECT user_id FROM projects WHERE project_id = $1
+                ))
+              )
+            ORDER BY LOWER(c.name),
+                     CASE WHEN c.project_id = $1 THEN 0 ELSE 1 END,
+                     c.is_system DESC
+        )
+        SELECT * FROM deduplicated
+        ORDER BY is_system DESC, name ASC
+    """,
+    CATEGORIES_PERSONAL: """
+        SELECT category_id, name, is_system, is_active, project_id, created_at, user_id
+        FROM categories
+        WHERE user_id = $1
+          AND is_active = TRUE
+          AND project_id IS NULL
+        ORDER BY is_system DESC, name ASC
+    """,
+    CATEGORY_BY_ID_FOR_USER: """
+        SELECT c.category_id, c.name, c.is_system, c.is_active, c.project_id, c.created_at
+        FROM categories c
+        WHERE c.category_id = $1
+          AND c.is_active = TRUE
+          AND (
+              c.user_id = $2  -- User owns the category
+              OR c.project_id IS NULL  -- Global category (accessible to all)
+              OR EXISTS (
+                  -- User is a member of the category's project
+                  SELECT 1 FROM projects p
+                  LEFT JOIN project_members pm ON p.project_id = pm.project_id AND pm.user_id = $2
+                  WHERE p.project_id = c.project_id
+                    AND p.deleted_at IS NULL
+                    AND (p.user_id = $2 OR pm.user_id = $2)
+              )
+          )
+    """,
+    CATEGORY_BY_ID_ONLY: """
+        SELECT category_id, name, is_system, is_active, project_id, created_at
+        FROM categories
+        WHERE category_id = $1 AND is_active = TRUE
+    """,
+    # Одним запросом: реактивирует удалённые системные категории из списка $2
+    # и вставляет недостающие. Активные дубли отсекает уникальный индекс.
+    PROVISION_SYSTEM_CATEGORIES: """
+        WITH defaults AS (
+            SELECT unnest($2::text[]) AS name
+        ),
+        reactivated AS (
+            UPDATE categories c
+            SET is_active = TRUE, is_system = TRUE
+            FROM (
+                SELECT DISTINCT ON (LOWER(i.name)) i.category_id
+                FROM categories i
+                JOIN defaults d ON LOWER(i.name) = LOWER(d.name)
+                WHERE i.user_id = $1
+                  AND i.project_id IS NULL
+                  AND i.is_active = FALSE
+                  AND NOT EXISTS (
+                      SELECT 1 FROM categories a
+                      WHERE a.user_id = $1
+                        AND a.project_id IS NULL
+                        AND a.is_active = TRUE
+                        AND LOWER(a.name) = LOWER(i.name)
+                  )
+                ORDER BY LOWER(i.name), i.category_id DESC
+            ) r
+            WHERE c.category_id = r.category_id
+            RETURNING c.name
+        ),
+        inserted AS (
+            INSERT INTO categories(user_id, project_id, name, is_system, is_active, created_at)
+            SELECT $1, NULL, d.name, TRUE, TRUE, CURRENT_TIMESTAMP
+            FROM defaults d
+            WHERE NOT EXISTS (
+                SELECT 1 FROM reactivated r WHERE LOWER(r.name) = LOWER(d.name)
+            )
+            ON CONFLICT DO NOTHING
+            RETURNING category_id
+        )
+        SELECT (SELECT COUNT(*) FROM inserted) AS inserted,
+               (SELECT COUNT(*) FROM reactivated) AS reactivated
+    """,
+    PROVISION_SYSTEM_INCOME_CATEGORIES: """
+        WITH defaults AS (
+            SELECT name, LOWER(REGEXP_REPLACE(BTRIM(name), '\\s+', ' ', 'g')) AS normalized
+            FROM unnest($2::text[]) AS name
+        ),
+        reactivated AS (
+            UPDATE income_categories c
+            SET is_active = TRUE, is_system = TRUE, name = r.name
+            FROM (
+                SELECT DISTINCT ON (d.normalized) i.income_category_id, d.name, d.normalized
+                FROM income_categories i
+                JOIN defaults d
+                  ON LOWER(REGEXP_REPLACE(BTRIM(i.name), '\\s+', ' ', 'g')) = d.normalized
+                WHERE i.user_id = $1
+                  AND i.project_id IS NULL
+                  AND i.is_active = FALSE
+                  AND NOT EXISTS (
+                      SELECT 1 FROM income_categories a
+                      WHERE a.user_id = $1
+                        AND a.project_id IS NULL
+                        AND a.is_active = TRUE
+                        AND LOWER(REGEXP_REPLACE(BTRIM(a.name), '\\s+', ' ', 'g')) = d.normalized
+                  )
+                ORDER BY d.normalized, i.income_category_id DESC
+            ) r
+            WHERE c.income_category_id = r.income_category_id
+            RETURNING r.normalized
+        ),
+        inserted AS (
+            INSERT INTO income_categories(user_id, project_id, name, is_system, is_active, created_at)
+            SELECT $1, NULL, d.name, TRUE, TRUE, CURRENT_TIMESTAMP
+            FROM defaults d
+            WHERE NOT EXISTS (
+                SELECT 1 FROM reactivated r WHERE r.normalized = d.normalized
+            )
+            ON CONFLICT DO NOTHING
+            RETURNING income_category_id
+        )
+        SELECT (SELECT COUNT(*) FROM inserted) AS inserted,
+               (SELECT COUNT(*) FROM reactivated) AS reactivated
+    """,
+
+    INSERT_EXPENSE: """
+        INSERT INTO expenses(user_id, project_id, date, time, amount, category_id, description, month)
+        VALUES($1, $2, $3, $4, $5, $6, $7, $8)
+    """,
+    MONTH_EXPENSES_PROJECT: """
+        SELECT e.amount, c.name as category
+        FROM expenses e
+        JOIN categories c ON e.category_id = c.category_id
+        WHERE e.project_id = $1
+          AND e.month = $2
+          AND EXTRACT(YEAR FROM e.date) = $3
+    """,
+    MONTH_EXPENSES_PERSONAL: """
+        SELECT e.amount, c.name as category
+        FROM expenses e
+        JOIN categories c ON e.category_id = c.category_id
+        WHERE e.user_id = $1
+          AND e.month = $2
+          AND e.project_id IS NULL
+          AND EXTRACT(YEAR FROM e.date) = $3
+    """,
+    DAY_EXPENSES_PROJECT: """
+        SELECT e.amount, c.name as category
+        FROM expenses e
+        JOIN categories c ON e.category_id = c.category_id
+        WHERE e.project_id = $1
+          AND e.date = $2
+    """,
+    DAY_EXPENSES_PERSONAL: """
+        SELECT e.amount, c.name as category
+        FROM expenses e
+        JOIN categories c ON e.category_id = c.category_id
+        WHERE e.user_id = $1
+          AND e.date = $2
+          AND e.project_id IS NULL
+    """,
+    CATEGORY_EXPENSES_PROJECT: """
+        SELECT amount, month
+        FROM expenses
+        WHERE category_id = $1
+          AND EXTRACT(YEAR FROM date) = $2
+          AND project_id = $3
+    """,
+    CATEGORY_EXPENSES_PERSONAL: """
+        SELECT amount, month
+        FROM expenses
+        WHERE user_id = $1
+          AND category_id = $2
+          AND EXTRACT(YEAR FROM date) = $3
+          AND project_id IS NULL
+    """,
+}
@@ -14,6 +14,7 @@ from typing import Optional
 
 from utils import db
 from utils.logger import get_logger, log_event, log_error
+from utils import notification_outbox, recurring_scheduler
 
 logger = get_logger("utils.recurring")
 
@@ -289,6 +290,7 @@ async def create_rule(
                 rule_id,
             )
 
+        recurring_scheduler.reschedule(next_run_at)
         log_event(logger, "recurring_rule_created",
                   user_id=user_id, rule_id=rule_id, frequency_type=frequency_type,
                   initial_expense_created=(start_date <= today), next_run_at=str(next_run_at))
@@ -430,6 +432,7 @@ async def resume_rule(rule_id: int, user_id: str) -> bool:
         )
         updated = result != "UPDATE 0"
         if updated:
+            recurring_scheduler.reschedule(next_run)
             log_event(logger, "recurring_rule_resumed",
                       rule_id=rule_id, user_id=user_id, next_run=str(next_run))
         return updated
@@ -494,6 +497,7 @@ async def update_rule_schedule(
         if result == "UPDATE 0":
             return None
 
+        recurring_scheduler.reschedule(next_run)
         log_event(
             logger,
             "recurring_rule_schedule_updated",
@@ -515,7 +519,7 @@ async def update_rule_schedule(
 async def process_recurring_expenses(bot) -> None:
     """
     Основная функция планировщика постоянных расходов.
-    Запускается каждые 5 минут через APScheduler (настройка в main.py).
+    Запускается utils.recurring_scheduler при наступлении ближайшего next_run_at.
 
     Алгоритм:
     1. Выбрать все активные правила с next_run_at <= now (UTC)
@@ -523,118 +527,117 @@ async def process_recurring_expenses(bot) -> None:
        a. Проверить idempotency: нет ли уже расхода с этим rule_id за сегодня
        b. Создать расход напрямую через SQL (без excel.add_expense — у воркера
           системные права, permission check не нужен)
-       c. Отправить уведомление пользователю
-       d. Вычислить следующий next_run_at и обновить правило
-    3. Логировать итоги
+       c. Вычислить следующий next_run_at и обновить правило
+       d. Записать уведомление в notification_outbox
+       (b–d — одной транзакцией; сообщение отправляет drainer outbox)
+    3. Логировать итоги; по окончании прохода drainer outbox отправит
+       уведомления — по одному дайджесту на чат
 
     Важно:
     - Если воркер не работал несколько дней, пропущенные периоды НЕ backfill-ятся —
       только один расход за текущий день, затем next_run_at обновляется вперёд
     - Все datetime — naive UTC (как в остальном проекте)
     """
-    now = datetime.datetime.utcnow()
-    today = now.date()
-    current_time = now.time().replace(microsecond=0)
-
-    try:
-        # Выбираем только активные правила, чей срок пришёл
-        rules = await db.fetch(
-            """
-            SELECT rr.*, c.name AS category_name
-            FROM recurring_rules rr
-            JOIN categories c ON c.category_id = rr.category_id
-            WHERE rr.status = 'active' AND rr.next_run_at <= $1
-            """,
-            now,
-        )
-    except Exception as e:
-        log_error(logger, e, "recurring_scheduler_fetch_error")
-        return
-
-    if not rules:
-        return
-
-    processed = 0
-    skipped = 0
-    errors = 0
-
-    for row in rules:
-        rule = dict(row)
-        rule_id = rule['id']
+    async with notification_outbox.notification_pass("recurring_expense"):
+        now = datetime.datetime.utcnow()
+        today = now.date()
+        current_time = now.time().replace(microsecond=0)
 
         try:
-            # --- Проверка идемпотентности ---
-            # Не создаём дубль, если расход за сегодня уже есть
-            already_created = await db.fetchval(
-                """
-                SELECT 1 FROM expenses
-                WHERE recurring_rule_id = $1 AND date = $2
-                LIMIT 1
-                """,
-                rule_id, today,
-            )
-            if already_created:
-                skipped += 1
-                continue
-
-            # --- Создаём расход ---
-            await db.execute(
+            # Выбираем только активные правила, чей срок пришёл
+            rules = await db.fetch(
                 """
-                INSERT INTO expenses
-                    (user_id, project_id, date, time, amount, category_id,
-                     description, month, source_type, recurring_rule_id, created_by_system)
-                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, 'recurring', $9, TRUE)
+                SELECT rr.*, c.name AS category_name
+                FROM recurring_rules rr
+                JOIN categories c ON c.category_id = rr.category_id
+                WHERE rr.status = 'active' AND rr.next_run_at <= $1
                 """,
-                rule['user_id'],
-                rule['project_id'],
-                today,
-                current_time,
-                float(rule['amount']),
-                rule['category_id'],
-                rule['comment'] or None,
-                today.month,
-                rule_id,
+                now,
             )
+        except Exception as e:
+            log_error(logger, e, "recurring_scheduler_fetch_error")
+            return
 
-            # --- Уведомляем пользователя ---
-            freq_text = format_frequency(rule)
-            cat_name = rule.get('category_name', '')
-            comment_text = rule['comment'] or cat_name
-            try:
-                await bot.send_message(
-                    chat_id=rule['user_id'],
-                    text=(
-                        f"🔁 Добавлен постоянный расход:\n"
-                        f"💰 {rule['amount']} — {comment_text}\n"
-                        f"📅 {freq_text}"
-                    ),
-                )
-            except Exception as notify_err:
-                # Ошибка уведомления не должна отменять создание расхода
-                log_error(logger, notify_err, "recurring_notify_error",
-                          rule_id=rule_id, user_id=rule['user_id'])
-
-            # --- Обновляем next_run_at ---
-            next_run = calculate_next_run(rule, now)
-            await db.execute(
-                """
-                UPDATE recurring_rules
-                SET next_run_at = $1, updated_at = now()
-                WHERE id = $2
-                """,
-                next_run, rule_id,
-            )
+        if not rules:
+            return
 
-            processed += 1
-            log_event(logger, "recurring_expense_created",
-                      rule_id=rule_id, user_id=rule['user_id'],
-                      amount=rule['amount'], next_run=str(next_run))
+        processed = 0
+        skipped = 0
+        errors = 0
 
-        except Exception as e:
-            errors += 1
-            log_error(logger, e, "recurring_rule_process_error",
-                      rule_id=rule_id, user_id=rule.get('user_id'))
+        for row in rules:
+            rule = dict(row)
+            rule_id = rule['id']
 
-    log_event(logger, "recurring_scheduler_done",
-              processed=processed, skipped=skipped, errors=errors,
-              total=len(rules))
+            try:
+                # --- Проверка идемпотентности ---
+                # Не создаём дубль, если расход за сегодня уже есть
+                already_created = await db.fetchval(
+                    """
+                    SELECT 1 FROM expenses
+                    WHERE recurring_rule_id = $1 AND date = $2
+                    LIMIT 1
+                    """,
+                    rule_id, today,
+                )
+                if already_created:
+                    skipped += 1
+                    continue
+
+                freq_text = format_frequency(rule)
+                cat_name = rule.get('category_name', '')
+                comment_text = rule['comment'] or cat_name
+                next_run = calculate_next_run(rule, now)
+
+                # --- Расход, next_run_at и уведомление — одной транзакцией ---
+                # Уведомление пишется в outbox: если транзакция откатится, его не будет,
+                # а отправкой занимается notification_outbox, не задерживая воркер
+                async with db.transaction() as conn:
+                    await conn.execute(
+                        """
+                        INSERT INTO expenses
+                            (user_id, project_id, date, time, amount, category_id,
+                             description, month, source_type, recurring_rule_id, created_by_system)
+                        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, 'recurring', $9, TRUE)
+                        """,
+                        rule['user_id'],
+                        rule['project_id'],
+                        today,
+                        current_time,
+                        float(rule['amount']),
+                        rule['category_id'],
+                        rule['comment'] or None,
+                        today.month,
+                        rule_id,
+                    )
+                    await conn.execute(
+                        """
+                        UPDATE recurring_rules
+                        SET next_run_at = $1, updated_at = now()
+                        WHERE id = $2
+                        """,
+                        next_run, rule_id,
+                    )
+                    await notification_outbox.add_notifications(
+                        conn,
+                        [(rule['user_id'], (
+                            f"🔁 Добавлен постоянный расход:\n"
+                            f"💰 {rule['amount']} — {comment_text}\n"
+                            f"📅 {freq_text}"
+                        ))],
+                        source="recurring_expense",
+                    )
+
+                processed += 1
+                log_event(logger, "recurring_expense_created",
+                          rule_id=rule_id, user_id=rule['user_id'],
+                          amount=rule['amount'], next_run=str(next_run))
+
+            except Exception as e:
+                errors += 1
+                log_error(logger, e, "recurring_rule_process_error",
+                          rule_id=rule_id, user_id=rule.get('user_id'))
+
+        log_event(logger, "recurring_scheduler_done",
+                  processed=processed, skipped=skipped, errors=errors,
+                  total=len(rules))
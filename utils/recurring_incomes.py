@@ -5,6 +5,7 @@ from typing import Optional
 
 from utils import db
 from utils.logger import get_logger, log_event, log_error
+from utils import notification_outbox, recurring_scheduler
 from utils import recurring as recurring_utils
 
 logger = get_logger("utils.recurring_incomes")
@@ -84,6 +85,7 @@ async def create_rule(
                 rule_id,
             )
 
+        recurring_scheduler.reschedule(next_run_at)
         return rule_id
     except Exception as exc:
         log_error(logger, exc, "create_recurring_income_rule_error", user_id=user_id)
@@ -206,7 +208,10 @@ async def resume_rule(rule_id: int, user_id: str) -> bool:
             rule_id,
             user_id,
         )
-        return result != "UPDATE 0"
+        resumed = result != "UPDATE 0"
+        if resumed:
+            recurring_scheduler.reschedule(next_run)
+        return resumed
     except Exception as exc:
         log_error(logger, exc, "resume_recurring_income_rule_error", rule_id=rule_id, user_id=user_id)
         return False
@@ -214,84 +219,84 @@ async def resume_rule(rule_id: int, user_id: str) -> bool:
 
 async def process_recurring_incomes(bot) -> None:
     """Планировщик автогенерации фактических записей доходов по активным правилам."""
-    now = datetime.datetime.utcnow()
-    today = now.date()
-
-    try:
-        rules = await db.fetch(
-            """
-            SELECT rr.*, c.name AS category_name
-            FROM recurring_incomes rr
-            JOIN income_categories c ON c.income_category_id = rr.income_category_id
-            WHERE rr.status = 'active'
-              AND rr.next_run_at <= $1
-            """,
-            now,
-        )
-    except Exception as exc:
-        log_error(logger, exc, "process_recurring_incomes_fetch_error")
-        return
-
-    for row in rules:
-        rule = dict(row)
-        rule_id = rule["id"]
+    async with notification_outbox.notification_pass("recurring_income"):
+        now = datetime.datetime.utcnow()
+        today = now.date()
 
         try:
-            already_created = await db.fetchval(
-                """
-                SELECT 1
-                FROM incomes
-                WHERE recurring_income_id = $1
-                  AND income_date = $2
-                LIMIT 1
-                """,
-                rule_id,
-                today,
-            )
-            if already_created:
-                continue
-
-            await db.execute(
+            rules = await db.fetch(
                 """
-                INSERT INTO incomes(
-                    user_id, amount, income_category_id, project_id,
-                    description, month, income_date, recurring_income_id, created_by_system
-                )
-                VALUES($1, $2, $3, $4, $5, $6, $7, $8, TRUE)
+                SELECT rr.*, c.name AS category_name
+                FROM recurring_incomes rr
+                JOIN income_categories c ON c.income_category_id = rr.income_category_id
+                WHERE rr.status = 'active'
+                  AND rr.next_run_at <= $1
                 """,
-                rule["user_id"],
-                float(rule["amount"]),
-                rule["income_category_id"],
-                rule["project_id"],
-                rule["comment"] or None,
-                today.month,
-                today,
-                rule_id,
+                now,
             )
+        except Exception as exc:
+            log_error(logger, exc, "process_recurring_incomes_fetch_error")
+            return
 
-            next_run = recurring_utils.calculate_next_run(rule, now)
-            await db.execute(
-                """
-                UPDATE recurring_incomes
-                SET next_run_at = $1,
-                    updated_at = NOW()
-                WHERE id = $2
-                """,
-                next_run,
-                rule_id,
-            )
+        for row in rules:
+            rule = dict(row)
+            rule_id = rule["id"]
 
             try:
-                await bot.send_message(
-                    chat_id=rule["user_id"],
-                    text=(
-                        "🔁 Добавлен постоянный доход:\n"
-                        f"💰 {rule['amount']} — {rule['comment'] or rule.get('category_name', 'Доход')}"
-                    ),
+                already_created = await db.fetchval(
+                    """
+                    SELECT 1
+                    FROM incomes
+                    WHERE recurring_income_id = $1
+                      AND income_date = $2
+                    LIMIT 1
+                    """,
+                    rule_id,
+                    today,
                 )
-            except Exception as notify_error:
-                log_error(logger, notify_error, "process_recurring_incomes_notify_error", rule_id=rule_id)
+                if already_created:
+                    continue
 
-            log_event(logger, "recurring_income_created", rule_id=rule_id, user_id=rule["user_id"])
-        except Exception as exc:
-            log_error(logger, exc, "process_recurring_income_rule_error", rule_id=rule_id)
+                next_run = recurring_utils.calculate_next_run(rule, now)
+                text = (
+                    "🔁 Добавлен постоянный доход:\n"
+                    f"💰 {rule['amount']} — {rule['comment'] or rule.get('category_name', 'Доход')}"
+                )
+
+                # Доход, сдвиг next_run_at и уведомление (outbox) — одной транзакцией;
+                # отправкой занимается notification_outbox, воркер её не ждёт
+                async with db.transaction() as conn:
+                    await conn.execute(
+                        """
+                        INSERT INTO incomes(
+                            user_id, amount, income_category_id, project_id,
+                            description, month, income_date, recurring_income_id, created_by_system
+                        )
+                        VALUES($1, $2, $3, $4, $5, $6, $7, $8, TRUE)
+                        """,
+                        rule["user_id"],
+                        float(rule["amount"]),
+                        rule["income_category_id"],
+                        rule["project_id"],
+                        rule["comment"] or None,
+                        today.month,
+                        today,
+                        rule_id,
+                    )
+                    await conn.execute(
+                        """
+                        UPDATE recurring_incomes
+                        SET next_run_at = $1,
+                            updated_at = NOW()
+                        WHERE id = $2
+                        """,
+                        next_run,
+                        rule_id,
+                    )
+                    await notification_outbox.add_notifications(
+                        conn, [(rule["user_id"], text)], source="recurring_income"
+                    )
+
+                log_event(logger, "recurring_income_created", rule_id=rule_id, user_id=rule["user_id"])
+            except Exception as exc:
+                log_error(logger, exc, "process_recurring_income_rule_error", rule_id=rule_id)
@@ -0,0 +1,144 @@
+"""
+Планировщик постоянных расходов и доходов по ближайшему сроку.
+
+Вместо опроса каждые 5 минут задача спит до ближайшего next_run_at среди
+активных правил recurring_rules и recurring_incomes, затем запускает
+process_recurring_expenses / process_recurring_incomes и снова узнаёт
+ближайший срок. Пока ничего не наступило, запросов к БД нет.
+
+Когда правило создаётся, возобновляется или меняет расписание
+(create_rule / resume_rule / update_rule_schedule), вызывается reschedule():
+если новый срок раньше текущего, задача просыпается раньше.
+Без запущенного планировщика (скрипты, тесты) reschedule ничего не делает.
+
+Все datetime — naive UTC, как в utils.recurring.
+"""
+
+import asyncio
+import datetime
+from typing import Optional, Tuple
+
+import config
+from utils import db
+from utils.logger import get_logger, log_event, log_error
+
+logger = get_logger("utils.recurring_scheduler")
+
+_task: Optional[asyncio.Task] = None
+_wakeup: Optional[asyncio.Event] = None
+# Момент, до которого спит задача (naive UTC)
+_armed_until: Optional[datetime.datetime] = None
+
+
+def reschedule(next_run_at: Optional[datetime.datetime]) -> None:
+    """Будит планировщик, если next_run_at раньше момента, до которого он спит"""
+    global _armed_until
+    if _wakeup is None or next_run_at is None:
+        return
+    if _armed_until is None or next_run_at < _armed_until:
+        _armed_until = next_run_at
+        _wakeup.set()
+
+
+async def _next_deadline(now: datetime.datetime) -> Tuple[Optional[datetime.datetime], bool]:
+    """
+    Ближайший будущий next_run_at среди активных правил и признак того,
+    что есть просроченные правила (не обработанные прошлым проходом).
+    """
+    row = await db.fetchrow(
+        """
+        SELECT
+            LEAST(
+                (SELECT MIN(next_run_at) FROM recurring_rules
+                 WHERE status = 'active' AND next_run_at > $1),
+                (SELECT MIN(next_run_at) FROM recurring_incomes
+                 WHERE status = 'active' AND next_run_at > $1)
+            ) AS next_due,
+            EXISTS (SELECT 1 FROM recurring_rules
+                    WHERE status = 'active' AND next_run_at <= $1)
+            OR EXISTS (SELECT 1 FROM recurring_incomes
+                       WHERE status = 'active' AND next_run_at <= $1) AS overdue
+        """,
+        now,
+    )
+    return row['next_due'], row['overdue']
+
+
+def _plan_deadline(now: datetime.datetime, next_due: Optional[datetime.datetime],
+                   overdue: bool) -> datetime.datetime:
+    """
+    Момент следующего прохода. Просроченные правила (проход их пропустил —
+    ошибка или запись за сегодня уже есть) повторяются не чаще
+    RECURRING_SCHEDULER_RETRY_SECONDS, а без правил задача всё равно
+    просыпается раз в RECURRING_SCHEDULER_MAX_SLEEP_SECONDS — на случай
+    правок в БД в обход бота.
+    """
+    deadline = now + datetime.timedelta(seconds=config.RECURRING_SCHEDULER_MAX_SLEEP_SECONDS)
+    if next_due is not None:
+        deadline = min(deadline, next_due)
+    if overdue:
+        deadline = min(deadline, now + datetime.timedelta(seconds=config.RECURRING_SCHEDULER_RETRY_SECONDS))
+    return deadline
+
+
+async def _sleep_until_armed() -> None:
+    """Спит до _armed_until; reschedule может сдвинуть срок раньше"""
+    while True:
+        timeout = (_armed_until - datetime.datetime.utcnow()).total_seconds()
+        if timeout <= 0:
+            return
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            return
+        _wakeup.clear()
+
+
+async def _run(bot) -> None:
+    global _armed_until
+    from utils.recurring import process_recurring_expenses
+    from utils.recurring_incomes import process_recurring_incomes
+
+    while True:
+        try:
+            await process_recurring_expenses(bot)
+            await process_recurring_incomes(bot)
+            now = datetime.datetime.utcnow()
+            next_due, overdue = await _next_deadline(now)
+            deadline = _plan_deadline(now, next_due, overdue)
+        except Exception as e:
+            log_error(logger, e, "recurring_scheduler_error")
+            deadline = datetime.datetime.utcnow() + datetime.timedelta(
+                seconds=config.RECURRING_SCHEDULER_RETRY_SECONDS
+            )
+
+        # reschedule() во время прохода мог выставить срок раньше вычисленного
+        _armed_until = deadline if _armed_until is None else min(deadline, _armed_until)
+        log_event(logger, "recurring_scheduler_armed", next_run=str(_armed_until))
+        await _sleep_until_armed()
+        _armed_until = None
+
+
+def start_recurring_scheduler(bot) -> None:
+    """Запускает задачу планировщика; первый проход — сразу при старте"""
+    global _task, _wakeup
+    if _task is None or _task.done():
+        _wakeup = asyncio.Event()
+        _task = asyncio.get_running_loop().create_task(_run(bot), name="recurring_scheduler")
+    log_event(logger, "recurring_scheduler_started",
+              max_sleep_seconds=config.RECURRING_SCHEDULER_MAX_SLEEP_SECONDS,
+              retry_seconds=config.RECURRING_SCHEDULER_RETRY_SECONDS)
+
+
+async def stop_recurring_scheduler() -> None:
+    """Останавливает задачу планировщика"""
+    global _task, _wakeup, _armed_until
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
+        _wakeup = None
+        _armed_until = None
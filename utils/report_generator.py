@@ -24,6 +24,8 @@ import seaborn as sns
 
 from utils import excel
 from utils import incomes as income_utils
+from utils.logger import measure_time
+from utils.runtime_monitor import render_executor
 import config
 
 logger = logging.getLogger(__name__)
@@ -1295,6 +1297,7 @@ def _page_income_overview(
 
 # ─── Главная синхронная функция рендеринга ────────────────────────────────────
 
+@measure_time("render_full_report")
 def _render_full_report(df: pd.DataFrame, income_df: pd.DataFrame, today: datetime.date, save_path: str):
     """Рендерит все страницы PDF синхронно. Вызывается в ThreadPoolExecutor."""
     _set_style()
@@ -1389,6 +1392,6 @@ async def generate_pdf_report(user_id, project_id=None) -> Optional[str]:
 
     loop = asyncio.get_event_loop()
     return await loop.run_in_executor(
-        None,
+        render_executor(),
         functools.partial(_render_full_report, df_all, income_all, today, save_path),
     )
@@ -0,0 +1,124 @@
+"""
+Мониторинг event loop: задержка планирования, число asyncio-задач
+и очередь пула потоков, в котором выполняется рендеринг (matplotlib, Excel, PDF).
+
+Метрики отдаются через общий endpoint start_http_server (см. metrics.py).
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+from typing import Optional
+
+import config
+from metrics import (
+    EVENT_LOOP_LAG_SECONDS,
+    EVENT_LOOP_TASKS,
+    EXECUTOR_ACTIVE_TASKS,
+    EXECUTOR_PENDING_TASKS,
+)
+from utils.logger import get_logger, log_event
+
+logger = get_logger("utils.runtime_monitor")
+
+_monitor_task: Optional[asyncio.Task] = None
+_render_executor: Optional["InstrumentedThreadPoolExecutor"] = None
+
+
+class InstrumentedThreadPoolExecutor(concurrent.futures.ThreadPoolExecutor):
+    """
+    ThreadPoolExecutor, считающий ожидающие и выполняющиеся задачи
+    в метриках executor_pending_tasks / executor_active_tasks.
+    """
+
+    def __init__(self, name: str, max_workers: Optional[int] = None):
+        super().__init__(max_workers=max_workers, thread_name_prefix=name)
+        self.name = name
+        self._counts_lock = threading.Lock()
+        self.pending = 0
+        self.active = 0
+        EXECUTOR_PENDING_TASKS.labels(executor=name).set_function(lambda: self.pending)
+        EXECUTOR_ACTIVE_TASKS.labels(executor=name).set_function(lambda: self.active)
+
+    def submit(self, fn, /, *args, **kwargs):
+        with self._counts_lock:
+            self.pending += 1
+        try:
+            return super().submit(self._run, fn, *args, **kwargs)
+        except BaseException:
+            with self._counts_lock:
+                self.pending -= 1
+            raise
+
+    def _run(self, fn, *args, **kwargs):
+        with self._counts_lock:
+            self.pending -= 1
+            self.active += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._counts_lock:
+                self.active -= 1
+
+
+def render_executor() -> InstrumentedThreadPoolExecutor:
+    """
+    Отдельный пул для рендеринга (графики, Excel, PDF); создаётся при первом обращении.
+    Executor по умолчанию не заменяется: getaddrinfo, asyncio.to_thread и прочие
+    run_in_executor(None, ...) не делят с рендерингом RENDER_EXECUTOR_MAX_WORKERS потоков.
+    """
+    global _render_executor
+    if _render_executor is None:
+        _render_executor = InstrumentedThreadPoolExecutor(
+            "render", max_workers=config.RENDER_EXECUTOR_MAX_WORKERS
+        )
+    return _render_executor
+
+
+async def monitor_event_loop(interval: float = None, warning_threshold: float = None) -> None:
+    """
+    Периодически засыпает на interval и измеряет, насколько позже loop нас разбудил.
+    Задержка показывает, сколько времени loop был занят синхронной работой.
+    """
+    interval = interval if interval is not None else config.EVENT_LOOP_MONITOR_INTERVAL
+    if warning_threshold is None:
+        warning_threshold = config.EVENT_LOOP_LAG_WARNING_SECONDS
+    loop = asyncio.get_running_loop()
+
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - started - interval)
+        EVENT_LOOP_LAG_SECONDS.observe(lag)
+        tasks = len(asyncio.all_tasks(loop))
+        EVENT_LOOP_TASKS.set(tasks)
+        if lag >= warning_threshold:
+            log_event(logger, "event_loop_lag", status="warning", lag_ms=round(lag * 1000, 1),
+                      tasks=tasks)
+
+
+def start_runtime_monitors() -> None:
+    """Создаёт пул рендеринга и запускает замер задержки loop"""
+    global _monitor_task
+    loop = asyncio.get_running_loop()
+    render_executor()
+    if _monitor_task is None or _monitor_task.done():
+        _monitor_task = loop.create_task(monitor_event_loop(), name="event_loop_monitor")
+    log_event(logger, "runtime_monitors_started",
+              interval=config.EVENT_LOOP_MONITOR_INTERVAL,
+              executor_workers=config.RENDER_EXECUTOR_MAX_WORKERS)
+
+
+async def stop_runtime_monitors() -> None:
+    """Останавливает задачу мониторинга и дожидается завершения рендеринга"""
+    global _monitor_task, _render_executor
+    if _monitor_task is not None:
+        _monitor_task.cancel()
+        try:
+            await _monitor_task
+        except asyncio.CancelledError:
+            pass
+        _monitor_task = None
+    if _render_executor is not None:
+        executor, _render_executor = _render_executor, None
+        await asyncio.to_thread(executor.shutdown)
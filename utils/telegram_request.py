@@ -0,0 +1,70 @@
+"""
+Инструментированный HTTP-транспорт Bot API.
+
+Подключается в Application.builder().request(...) и оборачивает каждый вызов
+(send_message, reply_text, reply_photo, reply_document, getUpdates и т.д.):
+задержка по методу, размер запроса, классы ошибок и RetryAfter (flood control).
+"""
+
+import time
+from typing import Optional
+
+import httpx
+from telegram.error import RetryAfter, TelegramError
+from telegram.request import HTTPXRequest, RequestData
+
+from metrics import (
+    TELEGRAM_API_ERRORS_TOTAL,
+    TELEGRAM_API_LATENCY_SECONDS,
+    TELEGRAM_API_PAYLOAD_BYTES,
+    TELEGRAM_API_RETRY_AFTER_TOTAL,
+)
+from utils.logger import get_logger, log_event
+
+logger = get_logger("utils.telegram_request")
+
+
+async def _record_payload_size(request: httpx.Request) -> None:
+    """
+    Хук httpx: размер тела, которое действительно уходит в Bot API, по Content-Length.
+    Тело уже закодировано httpx, повторно ничего не сериализуется; потоковые
+    запросы без Content-Length не учитываются.
+    """
+    size = request.headers.get('content-length')
+    if size is not None:
+        method = request.url.path.rsplit('/', 1)[-1]
+        TELEGRAM_API_PAYLOAD_BYTES.labels(method=method).observe(int(size))
+
+
+class InstrumentedHTTPXRequest(HTTPXRequest):
+    """HTTPXRequest, записывающий метрики Bot API для каждого вызова"""
+
+    def __init__(self, *args, httpx_kwargs: Optional[dict] = None, **kwargs):
+        httpx_kwargs = dict(httpx_kwargs or {})
+        event_hooks = {key: list(hooks) for key, hooks in httpx_kwargs.get('event_hooks', {}).items()}
+        event_hooks.setdefault('request', []).append(_record_payload_size)
+        httpx_kwargs['event_hooks'] = event_hooks
+        super().__init__(*args, httpx_kwargs=httpx_kwargs, **kwargs)
+
+    async def post(self, url: str, request_data: Optional[RequestData] = None, *args, **kwargs):
+        method = url.rsplit('/', 1)[-1]
+
+        status = 'success'
+        start = time.perf_counter()
+        try:
+            return await super().post(url, request_data, *args, **kwargs)
+        except RetryAfter as e:
+            status = 'error'
+            TELEGRAM_API_ERRORS_TOTAL.labels(method=method, error='RetryAfter').inc()
+            TELEGRAM_API_RETRY_AFTER_TOTAL.labels(method=method).inc()
+            log_event(logger, "telegram_flood_control", status="warning",
+                      method=method, retry_after=str(e.retry_after))
+            raise
+        except TelegramError as e:
+            status = 'error'
+            TELEGRAM_API_ERRORS_TOTAL.labels(method=method, error=e.__class__.__name__).inc()
+            raise
+        finally:
+            TELEGRAM_API_LATENCY_SECONDS.labels(method=method, status=status).observe(
+                time.perf_counter() - start
+            )
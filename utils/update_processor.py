@@ -0,0 +1,86 @@
+"""
+Конкурентная обработка обновлений с сохранением порядка внутри одного пользователя.
+
+Обновления разных пользователей обрабатываются параллельно (не больше
+max_concurrent_updates одновременно), а обновления одного пользователя —
+строго по очереди, в порядке поступления: на этом держатся ConversationHandler
+и context.user_data.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Dict, Hashable, Optional
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+from metrics import UPDATE_USER_QUEUE_DEPTH, UPDATES_WAITING
+
+
+def _ordering_key(update: object) -> Optional[Hashable]:
+    """Ключ очереди: пользователь, иначе чат; None — порядок не важен"""
+    if not isinstance(update, Update):
+        return None
+    if update.effective_user is not None:
+        return ('user', update.effective_user.id)
+    if update.effective_chat is not None:
+        return ('chat', update.effective_chat.id)
+    return None
+
+
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    """
+    Процессор обновлений для Application.builder().concurrent_updates(...).
+
+    Сначала ждём свою очередь у пользователя (asyncio.Lock честный — FIFO),
+    и только потом занимаем общий слот конкурентности, чтобы ожидающие
+    обновления одного пользователя не держали слоты других.
+    """
+
+    def __init__(self, max_concurrent_updates: int):
+        super().__init__(max_concurrent_updates)
+        self._locks: Dict[Hashable, asyncio.Lock] = {}
+        self._depth: Dict[Hashable, int] = {}
+
+    async def process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        key = _ordering_key(update)
+        if key is None:
+            await super().process_update(update, coroutine)
+            return
+
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        depth = self._depth.get(key, 0) + 1
+        self._depth[key] = depth
+        UPDATE_USER_QUEUE_DEPTH.observe(depth)
+        UPDATES_WAITING.inc()
+        waiting = True
+
+        try:
+            async with lock:
+                UPDATES_WAITING.dec()
+                waiting = False
+                await super().process_update(update, coroutine)
+        finally:
+            if waiting:
+                UPDATES_WAITING.dec()
+            depth = self._depth[key] - 1
+            if depth:
+                self._depth[key] = depth
+            else:
+                # Очередь пользователя пуста — не храним lock бесконечно
+                del self._depth[key]
+                del self._locks[key]
+
+    def queue_depth(self, user_id: int) -> int:
+        """Число обновлений пользователя в обработке и в ожидании"""
+        return self._depth.get(('user', user_id), 0)
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        await coroutine
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
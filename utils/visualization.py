@@ -18,6 +18,8 @@ import datetime
 import logging
 from utils import excel
 from utils import incomes as income_utils
+from utils.logger import measure_time
+from utils.runtime_monitor import render_executor
 import config
 
 logger = logging.getLogger(__name__)
@@ -86,6 +88,7 @@ def _get_colors(categories: list) -> list:
 # Синхронные функции рендеринга (выполняются в ThreadPoolExecutor)
 # ---------------------------------------------------------------------------
 
+@measure_time("render_pie_chart")
 def _render_pie_chart(raw_names: list, amounts: list, total: float,
                       month: int, year: int, save_path: str) -> str:
     """Синхронный рендеринг donut-диаграммы. Вызывается через run_in_executor."""
@@ -196,6 +199,7 @@ def _render_pie_chart(raw_names: list, amounts: list, total: float,
     return save_path
 
 
+@measure_time("render_bar_chart")
 def _render_bar_chart(months_labels: list, amounts: list, year: int,
                       save_path: str) -> str:
     """Синхронный рендеринг столбчатой диаграммы по месяцам."""
@@ -238,6 +242,7 @@ def _render_bar_chart(months_labels: list, amounts: list, year: int,
     return save_path
 
 
+@measure_time("render_trend_chart")
 def _render_trend_chart(months_labels: list, amounts: list, category: str,
                         line_color: str, year: int, save_path: str) -> str:
     """Синхронный рендеринг линейного графика тренда по категории."""
@@ -276,6 +281,7 @@ def _render_trend_chart(months_labels: list, amounts: list, category: str,
     return save_path
 
 
+@measure_time("render_distribution_chart")
 def _render_distribution_chart(raw_names: list, amounts_vals: list,
                                 year: int, save_path: str) -> str:
     """Синхронный рендеринг горизонтальной столбчатой диаграммы распределения."""
@@ -365,7 +371,7 @@ async def create_monthly_pie_chart(user_id, month=None, year=None, save_path=Non
 
     loop = asyncio.get_event_loop()
     return await loop.run_in_executor(
-        None,
+        render_executor(),
         functools.partial(_render_pie_chart, raw_names, amounts, total, month, year, save_path)
     )
 
@@ -393,11 +399,12 @@ async def create_category_trend_chart(user_id, category, year=None, save_path=No
 
     loop = asyncio.get_event_loop()
     return await loop.run_in_executor(
-        None,
+        render_executor(),
         functools.partial(_render_trend_chart, months_labels, amounts, category, line_color, year, save_path)
     )
 
 
+@measure_time("render_budget_comparison_chart")
 def _render_budget_comparison_chart(budget_by_month: dict, spending_by_month: dict,
                                      year: int, save_path: str) -> str:
     """Синхронный рендеринг диаграммы «Бюджет vs. расходы по месяцам»."""
@@ -506,7 +513,7 @@ async def create_budget_comparison_chart(user_id, year=None, save_path=None, pro
 
     loop = asyncio.get_event_loop()
     return await loop.run_in_executor(
-        None,
+        render_executor(),
         functools.partial(
             _render_budget_comparison_chart,
             budget_by_month, spending_by_month, year, save_path,
@@ -545,11 +552,12 @@ async def create_category_distribution_chart(user_id, year=None, save_path=None)
 
     loop = asyncio.get_event_loop()
     return await loop.run_in_executor(
-        None,
+        render_executor(),
         functools.partial(_render_distribution_chart, raw_names, amounts_vals, year, save_path)
     )
 
 
+@measure_time("render_income_vs_expense_chart")
 def _render_income_vs_expense_chart(months_labels: list, income_amounts: list, expense_amounts: list, year: int, save_path: str) -> str:
     """Синхронный рендер сравнительного графика доходов и расходов по месяцам."""
     fig, ax = plt.subplots(figsize=(12, 6))
@@ -650,7 +658,7 @@ async def create_income_distribution_chart(user_id, year=None, save_path=None, p
 
     loop = asyncio.get_event_loop()
     return await loop.run_in_executor(
-        None,
+        render_executor(),
         functools.partial(_render_distribution_chart, raw_names, amounts_vals, year, save_path),
     )
 
@@ -676,6 +684,6 @@ async def create_income_vs_expense_chart(user_id, year=None, save_path=None, pro
 
     loop = asyncio.get_event_loop()
     return await loop.run_in_executor(
-        None,
+        render_executor(),
         functools.partial(_render_income_vs_expense_chart, months_labels, income_amounts, expense_amounts, year, save_path),
     )
@@ -0,0 +1,116 @@
+"""
+Webhook-транспорт: обновления приходят POST-запросами на локальный aiohttp-сервер
+(за reverse proxy) и кладутся в application.update_queue — дальше их обрабатывает
+тот же Application, что и при polling.
+
+Маршруты:
+    POST config.WEBHOOK_PATH — Update JSON от Telegram
+    GET  /healthz            — проверка живости для proxy/оркестратора
+
+Локальная проверка без Telegram (WEBHOOK_URL пуст):
+    BOT_MODE=webhook python main.py
+    curl -X POST localhost:8080/telegram -H 'Content-Type: application/json' \\
+         -d '{"update_id": 1, "message": {...}}'
+"""
+
+import asyncio
+import json
+import signal
+from typing import Awaitable, Callable, Optional
+
+from aiohttp import web
+from telegram import Update
+from telegram.ext import Application
+
+import config
+from utils.logger import get_logger, log_event, log_error
+
+logger = get_logger("utils.webhook")
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+HEALTH_PATH = "/healthz"
+
+_APPLICATION_KEY = web.AppKey("application", Application)
+_SECRET_KEY = web.AppKey("secret_token", str)
+
+
+async def _handle_update(request: web.Request) -> web.Response:
+    application = request.app[_APPLICATION_KEY]
+    secret = request.app[_SECRET_KEY]
+    if secret and request.headers.get(SECRET_HEADER) != secret:
+        log_event(logger, "webhook_forbidden", status="rejected", remote=request.remote)
+        return web.Response(status=403)
+
+    try:
+        data = await request.json()
+        update = Update.de_json(data, application.bot)
+    except (json.JSONDecodeError, ValueError, TypeError, KeyError) as e:
+        log_error(logger, e, "webhook_bad_update", remote=request.remote)
+        return web.Response(status=400)
+
+    await application.update_queue.put(update)
+    return web.Response(status=200)
+
+
+async def _handle_health(request: web.Request) -> web.Response:
+    application = request.app[_APPLICATION_KEY]
+    return web.json_response({
+        "status": "ok" if application.running else "starting",
+        "pending_updates": application.update_queue.qsize(),
+    })
+
+
+def build_web_app(application: Application, path: str = None, secret_token: str = None) -> web.Application:
+    """Создаёт aiohttp-приложение с маршрутами webhook и health"""
+    app = web.Application()
+    app[_APPLICATION_KEY] = application
+    app[_SECRET_KEY] = config.WEBHOOK_SECRET_TOKEN if secret_token is None else secret_token
+    app.router.add_post(path or config.WEBHOOK_PATH, _handle_update)
+    app.router.add_get(HEALTH_PATH, _handle_health)
+    return app
+
+
+async def run_webhook(
+    application: Application,
+    on_startup: Optional[Callable[[Application], Awaitable[None]]] = None,
+    on_shutdown: Optional[Callable[[Application], Awaitable[None]]] = None,
+) -> None:
+    """
+    Запускает Application в webhook-режиме до SIGINT/SIGTERM.
+    post_init/post_stop вызываются только run_polling/run_webhook PTB,
+    поэтому хуки запуска и остановки передаются явно.
+    """
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+
+    async with application:
+        if on_startup is not None:
+            await on_startup(application)
+
+        if config.WEBHOOK_URL:
+            await application.bot.set_webhook(
+                url=config.WEBHOOK_URL + config.WEBHOOK_PATH,
+                secret_token=config.WEBHOOK_SECRET_TOKEN or None,
+                allowed_updates=Update.ALL_TYPES,
+                drop_pending_updates=True,
+            )
+        await application.start()
+
+        runner = web.AppRunner(build_web_app(application), access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, config.WEBHOOK_LISTEN, config.WEBHOOK_PORT)
+        await site.start()
+        log_event(logger, "webhook_started", status="success",
+                  listen=config.WEBHOOK_LISTEN, port=config.WEBHOOK_PORT,
+                  path=config.WEBHOOK_PATH, registered=bool(config.WEBHOOK_URL))
+
+        try:
+            await stop_event.wait()
+        finally:
+            await runner.cleanup()
+            await application.stop()
+            if on_shutdown is not None:
+                await on_shutdown(application)
+            log_event(logger, "webhook_stopped", status="success")